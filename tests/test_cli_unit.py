@@ -2,12 +2,18 @@
 
 from __future__ import annotations
 
-from typing import List
+from typing import List, Optional
 
+import io
 import os
 import pytest
 
+from ytpm.adapters.session import Session
 from ytpm.cli.main import run
+from ytpm.core.config import Config, ReapConfig
+from ytpm.core.gitstatus import GitStatus
+from ytpm.core.manager import ItemResult
+from ytpm.core.projects import Project, ScanStats
 
 
 class FakeManager:
@@ -16,28 +22,107 @@ class FakeManager:
     """
 
     def __init__(self) -> None:
-        self.sessions: List[str] = []
+        self.sessions: List[Session] = []
         self.create_calls: list[tuple[str, str]] = []
-        self.goto_calls: list[tuple[str, str]] = []
+        self.goto_calls: list[tuple[str, Optional[str]]] = []
         self.kill_calls: list[str] = []
+        self.scan_calls: list[bool] = []
+        self.apply_calls: list[tuple] = []
+        self.snapshot_calls: list[tuple] = []
+        self.projects: List[Project] = []
+        self.git: dict[str, GitStatus] = {}
+        self.usage_calls = 0
+        self.config = Config()
+        self.reap_calls: list[tuple] = []
 
     # Methods expected by CLI
-    def list_sessions(self) -> List[str]:
+    def list_sessions(self) -> List[Session]:
         return self.sessions
 
     def create_session(self, name: str, cwd: str) -> None:
         self.create_calls.append((name, cwd))
 
-    def goto_session(self, name: str, cwd: str) -> None:
+    def goto_session(self, name: str, cwd: Optional[str] = None) -> None:
         self.goto_calls.append((name, cwd))
 
     def kill_session(self, name: str) -> None:
         self.kill_calls.append(name)
 
+    def create_sessions(self, sessions) -> List[ItemResult]:
+        sessions = list(sessions)
+        self.create_calls += sessions
+        return [ItemResult(name, name != "bad", "" if name != "bad" else "boom") for name, _ in sessions]
+
+    def kill_sessions(self, names) -> List[ItemResult]:
+        self.kill_calls += names
+        return [ItemResult(name, True) for name in names]
+
+    def match_sessions(self, patterns, exclude=()) -> List[str]:
+        import fnmatch
+
+        return [
+            s.name
+            for s in self.sessions
+            if any(fnmatch.fnmatchcase(s.name, p) for p in patterns)
+            and not any(fnmatch.fnmatchcase(s.name, p) for p in exclude)
+        ]
+
+    def apply_workspace(self, sessions=None, prune: bool = False, dry_run: bool = False):
+        from ytpm.core.workspace import Plan
+
+        self.apply_calls.append((sessions, prune, dry_run))
+        plan = Plan()
+        plan.change("create", "session", "api", "~/api")
+        plan.change("rename", "window", "api:zsh", "-> editor")
+        return plan
+
+    def save_snapshot(self, path=None, scrollback: bool = False):
+        from ytpm.core.snapshot import SavedPane, SavedSession, SavedWindow
+
+        self.snapshot_calls.append(("save", path, scrollback))
+        return [SavedSession("api", [SavedWindow("w", "", True, [SavedPane("/a"), SavedPane("/b")])])]
+
+    def restore_snapshot(self, path=None, dry_run: bool = False):
+        from ytpm.core.workspace import Plan
+
+        self.snapshot_calls.append(("restore", path, dry_run))
+        plan = Plan()
+        plan.change("create", "session", "api", "1 windows, 2 panes")
+        return plan
+
+    def git_statuses(self, paths):
+        return [(path, self.git.get(path)) for path in paths]
+
+    def reap_sessions(self, policy=None, dry_run: bool = False):
+        from ytpm.core.reap import Reaped
+
+        self.reap_calls.append((policy, dry_run))
+        return [Reaped("old", "idle for 9h"), Reaped("stuck", "idle for 8h", False, "boom")]
+
+    def with_real_clients(self, sessions):
+        return sessions
+
+    def session_usage(self):
+        from ytpm.core.usage import SessionUsage
+
+        self.usage_calls += 1
+        return [
+            SessionUsage("db", 1, 2, rss=3 << 30, cpu_time=4000.0, cpu_percent=1.5),
+            SessionUsage("web", 2, 9, rss=300 << 20, cpu_time=75.25, cpu_percent=87.0),
+            SessionUsage("notes", 1, 1, rss=900 << 10),
+        ]
+
+    def scan_projects(self, full: bool = False) -> ScanStats:
+        self.scan_calls.append(full)
+        return ScanStats(projects=len(self.projects), dirs=10, rescanned=2, seconds=0.01)
+
+    def list_projects(self) -> List[Project]:
+        return self.projects
+
 
 def test_ls_prints_sessions_in_order(capsys: pytest.CaptureFixture[str]):
     manager = FakeManager()
-    manager.sessions = ["b", "a"]
+    manager.sessions = [Session("b"), Session("a")]
 
     exit_code = run(["ls"], manager)
 
@@ -48,6 +133,188 @@ def test_ls_prints_sessions_in_order(capsys: pytest.CaptureFixture[str]):
     assert lines == ["b", "a"]
 
 
+def test_ls_long_shows_session_details(capsys: pytest.CaptureFixture[str]):
+    manager = FakeManager()
+    manager.sessions = [
+        Session("web", attached=1, windows=3, path="/src/web"),
+        Session("db", windows=1, path="/src/db"),
+    ]
+
+    exit_code = run(["ls", "--long"], manager)
+
+    lines = capsys.readouterr().out.splitlines()
+    assert exit_code == 0
+    assert lines[0].split() == ["web", "3w", "attached", "/src/web"]
+    assert lines[1].split() == ["db", "1w", "detached", "/src/db"]
+
+    manager.git = {"/src/web": GitStatus("main", dirty=True, ahead=2)}
+    run(["ls", "-l"], manager)
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split() == ["web", "3w", "attached", "main*", "+2", "/src/web"]
+    assert lines[1].split() == ["db", "1w", "detached", "/src/db"]
+    assert lines[0].index("/src") == lines[1].index("/src")
+
+
+def test_ls_json_ndjson_and_format(capsys: pytest.CaptureFixture[str]):
+    import json
+
+    manager = FakeManager()
+    manager.sessions = [
+        Session("web", "$1", attached=1, windows=3, activity=200, path="/src/web"),
+        Session("db", "$2", windows=1, activity=100, path="/src/db"),
+    ]
+
+    run(["ls", "--json"], manager)
+    records = json.loads(capsys.readouterr().out)
+    assert records[0] == {
+        "name": "web",
+        "id": "$1",
+        "attached": 1,
+        "windows": 3,
+        "activity": 200,
+        "created": 0,
+        "path": "/src/web",
+        "server": "",
+    }
+    assert [r["name"] for r in records] == ["web", "db"]
+
+    run(["ls", "--ndjson"], manager)
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line)["path"] for line in lines] == ["/src/web", "/src/db"]
+
+    run(["ls", "--format", r"{name}\t{path}\t{activity}"], manager)
+    assert capsys.readouterr().out == "web\t/src/web\t200\ndb\t/src/db\t100\n"
+
+    assert run(["ls", "--format", "{nope}"], manager) == 1
+    assert "unknown field 'nope'" in capsys.readouterr().err
+
+
+def test_ls_filters_and_sorts(capsys: pytest.CaptureFixture[str]):
+    import time
+
+    now = time.time()
+    manager = FakeManager()
+    manager.sessions = [
+        Session("b", attached=1, activity=int(now - 3 * 3600)),
+        Session("c", activity=int(now - 60)),
+        Session("a", activity=int(now - 30 * 3600)),
+    ]
+
+    run(["ls", "--attached"], manager)
+    assert capsys.readouterr().out.split() == ["b"]
+
+    run(["ls", "--idle-for", "2h"], manager)
+    assert capsys.readouterr().out.split() == ["b", "a"]
+    run(["ls", "--idle-for", "1d2h"], manager)
+    assert capsys.readouterr().out.split() == ["a"]
+
+    run(["ls", "--sort", "activity"], manager)
+    assert capsys.readouterr().out.split() == ["c", "b", "a"]
+    run(["ls", "--sort", "name"], manager)
+    assert capsys.readouterr().out.split() == ["a", "b", "c"]
+
+    with pytest.raises(SystemExit):
+        run(["ls", "--idle-for", "2 hours"], manager)
+    assert "invalid duration" in capsys.readouterr().err
+    with pytest.raises(SystemExit):
+        run(["ls", "--json", "--long"], manager)
+
+
+def test_a_reader_that_goes_away_ends_ls_quietly(monkeypatch, tmp_path, capsys):
+    import sys
+
+    from ytpm.cli import main as cli
+
+    class ClosedPipe(io.StringIO):
+        def write(self, text):
+            raise BrokenPipeError(32, "Broken pipe")
+
+        def fileno(self):
+            return sink.fileno()
+
+    manager = FakeManager()
+    manager.sessions = [Session("web")]
+    with open(tmp_path / "sink", "w") as sink:
+        monkeypatch.setattr(sys, "stdout", ClosedPipe())
+        monkeypatch.setattr(cli, "_main", lambda argv: run(argv, manager))
+
+        with pytest.raises(SystemExit) as exc:
+            cli.main(["ls"])
+    assert exc.value.code == 1
+    assert capsys.readouterr().err == ""
+
+
+def test_top_prints_session_usage_busiest_first(capsys: pytest.CaptureFixture[str]):
+    manager = FakeManager()
+
+    exit_code = run(["top", "-n", "2", "-d", "0"], manager)
+
+    frames = capsys.readouterr().out.split("\n\n")
+    assert exit_code == 0
+    # One sample to measure CPU% from, then one per refresh.
+    assert manager.usage_calls == 3 and len(frames) == 2
+    lines = frames[0].splitlines()
+    assert lines[0].split() == ["SESSION", "PANES", "PROCS", "CPU%", "CPU", "TIME", "RSS"]
+    assert lines[1].split() == ["web", "2", "9", "87.0", "1:15.25", "300.0M"]
+    assert lines[2].split() == ["db", "1", "2", "1.5", "1:06:40", "3.0G"]
+    assert lines[3].split() == ["notes", "1", "1", "-", "0:00.00", "900.0K"]
+
+    run(["top", "-n", "1", "-d", "0", "--sort", "name"], manager)
+    names = [line.split()[0] for line in capsys.readouterr().out.splitlines()[1:]]
+    assert names == ["db", "notes", "web"]
+
+
+def test_reap_combines_config_and_options(monkeypatch, capsys: pytest.CaptureFixture[str]):
+    manager = FakeManager()
+    manager.config.reap = ReapConfig(idle="8h", protect=["main"], patterns=["x-*"])
+
+    exit_code = run(["reap", "--max-sessions", "5", "--protect", "notes", "--match", "*"], manager)
+
+    captured = capsys.readouterr()
+    assert exit_code == 1
+    assert manager.reap_calls == [
+        (ReapConfig(idle="8h", max_sessions=5, patterns=["*"], protect=["main", "notes"]), False)
+    ]
+    assert captured.out.splitlines() == ["- old  idle for 9h", "- stuck  idle for 8h"]
+    assert "Error: stuck: boom" in captured.err and "reaped 1 of 2 sessions" in captured.err
+
+    assert run(["reap", "-n", "--idle", "1h"], manager) == 0
+    policy, dry_run = manager.reap_calls[-1]
+    assert (policy.idle_seconds(), policy.protect, policy.patterns, dry_run) == (
+        3600,
+        ["main"],
+        ["x-*"],
+        True,
+    )
+    assert "2 session(s) to reap" in capsys.readouterr().err
+
+    with pytest.raises(SystemExit):
+        run(["reap", "--idle", "2 hours"], manager)
+    assert "invalid duration" in capsys.readouterr().err
+
+    manager.config.reap = ReapConfig()
+    assert run(["reap"], manager) == 1
+    assert "nothing to reap by" in capsys.readouterr().err
+
+
+def test_reap_every_keeps_going_until_interrupted(monkeypatch, capsys):
+    import time
+
+    manager = FakeManager()
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 3:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(time, "sleep", sleep)
+
+    assert run(["reap", "--idle", "8h", "--every", "10m"], manager) == 0
+    assert len(manager.reap_calls) == 3 and sleeps == [600.0] * 3
+
+
 def test_new_calls_manager_create_with_default_cwd(monkeypatch: pytest.MonkeyPatch):
     manager = FakeManager()
 
@@ -72,15 +339,23 @@ def test_new_uses_path_if_provided(tmp_path,):
     assert manager.create_calls == [("proj", str(path))]
 
 
-def test_goto_calls_manager_goto_with_default_cwd(monkeypatch: pytest.MonkeyPatch):
+def test_goto_leaves_default_cwd_to_manager():
     manager = FakeManager()
 
-    monkeypatch.chdir("/tmp")
-
     exit_code = run(["goto", "proj"], manager)
 
+    # Manager picks the project's directory or the current one.
     assert exit_code == 0
-    assert manager.goto_calls == [("proj", os.getcwd())]
+    assert manager.goto_calls == [("proj", None)]
+
+
+def test_goto_uses_path_if_provided(tmp_path):
+    manager = FakeManager()
+
+    exit_code = run(["goto", "proj", "--path", str(tmp_path)], manager)
+
+    assert exit_code == 0
+    assert manager.goto_calls == [("proj", str(tmp_path))]
 
 
 def test_kill_calls_manager_kill():
@@ -90,3 +365,111 @@ def test_kill_calls_manager_kill():
 
     assert exit_code == 0
     assert manager.kill_calls == ["proj"]
+
+
+def test_new_from_stdin_creates_all_in_one_call(monkeypatch, tmp_path, capsys):
+    manager = FakeManager()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("sys.stdin", io.StringIO("# sessions\napi ~/src/api\n\nweb\tsrc/my web\ndocs\n"))
+
+    exit_code = run(["new", "-"], manager)
+
+    assert exit_code == 0
+    assert manager.create_calls == [
+        ("api", os.path.expanduser("~/src/api")),
+        ("web", str(tmp_path / "src" / "my web")),
+        ("docs", str(tmp_path)),
+    ]
+    assert "created 3 of 3 sessions" in capsys.readouterr().err
+
+
+def test_new_from_file_reports_failures(tmp_path, capsys):
+    manager = FakeManager()
+    listing = tmp_path / "sessions.txt"
+    listing.write_text("good /tmp\nbad /tmp\n")
+
+    exit_code = run(["new", "--from", str(listing)], manager)
+
+    assert exit_code == 1
+    err = capsys.readouterr().err
+    assert "Error: bad: boom" in err
+    assert "created 1 of 2 sessions" in err
+
+
+def test_kill_patterns_and_all_except():
+    manager = FakeManager()
+    manager.sessions = [Session(n) for n in ("web-1", "web-2", "api", "main")]
+
+    assert run(["kill", "web-*"], manager) == 0
+    assert manager.kill_calls == ["web-1", "web-2"]
+
+    manager.kill_calls = []
+    assert run(["kill", "--all-except", "main", "--all-except", "web-?"], manager) == 0
+    assert manager.kill_calls == ["api"]
+
+
+def test_scan_runs_incremental_scan_and_lists(capsys: pytest.CaptureFixture[str]):
+    manager = FakeManager()
+    manager.projects = [Project("web", "/src/web")]
+
+    exit_code = run(["scan", "--list"], manager)
+
+    captured = capsys.readouterr()
+    assert exit_code == 0
+    assert manager.scan_calls == [False]
+    assert captured.out.splitlines() == ["web\t/src/web"]
+    assert "1 projects" in captured.err
+
+
+def test_scan_full():
+    manager = FakeManager()
+
+    assert run(["scan", "--full"], manager) == 0
+    assert manager.scan_calls == [True]
+
+
+def test_apply_prints_the_plan(tmp_path, capsys: pytest.CaptureFixture[str]):
+    manager = FakeManager()
+    path = tmp_path / "ws.toml"
+    path.write_text('[[sessions]]\nname = "api"\n')
+
+    assert run(["apply"], manager) == 0
+    assert run(["apply", str(path), "--dry-run", "--prune"], manager) == 0
+
+    out = capsys.readouterr().out.splitlines()
+    assert out[:2] == ["+ session api  ~/api", "~ window api:zsh  -> editor"]
+    assert manager.apply_calls[0] == (None, False, False)
+    sessions, prune, dry_run = manager.apply_calls[1]
+    assert [s.name for s in sessions] == ["api"] and prune and dry_run
+
+    assert run(["apply", str(tmp_path / "missing.toml")], manager) == 1
+
+
+def test_save_and_restore(tmp_path, capsys: pytest.CaptureFixture[str]):
+    manager = FakeManager()
+    path = tmp_path / "snap.jsonl.gz"
+
+    assert run(["save", str(path), "--scrollback"], manager) == 0
+    assert run(["restore", str(path), "-n"], manager) == 0
+
+    captured = capsys.readouterr()
+    assert f"saved 1 sessions (1 windows, 2 panes) to {path}" in captured.err
+    assert captured.out == "+ session api  1 windows, 2 panes\n"
+    assert manager.snapshot_calls == [("save", path, True), ("restore", path, True)]
+
+
+def test_server_options_switch_to_a_multi_server_manager(monkeypatch, tmp_path, capsys):
+    manager = FakeManager()
+    servers = FakeManager()
+    servers.sessions = [Session("work:api", server="work")]
+    calls = []
+    manager.on_servers = lambda sockets: calls.append(sockets) or servers  # type: ignore[attr-defined]
+    monkeypatch.setattr("ytpm.adapters.server.live_servers", lambda: [f"{tmp_path}/work", f"{tmp_path}/play"])
+
+    assert run(["-L", "work", "--all-servers", "ls"], manager) == 0
+    assert calls == [["work", f"{tmp_path}/play"]]
+    assert capsys.readouterr().out == "work:api\n"
+
+    monkeypatch.setattr("ytpm.adapters.server.live_servers", lambda: [])
+    assert run(["--all-servers", "ls"], manager) == 1
+    assert "no tmux server is running" in capsys.readouterr().err
@@ -0,0 +1,199 @@
+# tests/test_daemon_unit.py
+
+import asyncio
+import os
+import socket
+import threading
+from typing import List
+
+import pytest
+
+from ytpm.adapters.batch import SequentialBatch
+from ytpm.adapters.server import server_socket
+from ytpm.adapters.session import Session
+from ytpm.core.frecency import FrecencyStore
+from ytpm.core.projects import ProjectIndex
+from ytpm.daemon import protocol
+from ytpm.daemon.client import forward, private_dirs
+from ytpm.daemon.server import Daemon, DaemonError, DaemonManager
+
+
+class FakeAdapter:
+    """In-memory stand-in for TmuxAdapter that counts list queries."""
+
+    def __init__(self, sessions: List[str]) -> None:
+        self.sessions = set(sessions)
+        self.list_calls = 0
+
+    def list_sessions(self) -> List[Session]:
+        self.list_calls += 1
+        return [Session(name, f"${i}") for i, name in enumerate(sorted(self.sessions))]
+
+    def create_session(self, name: str, cwd: str) -> None:
+        self.sessions.add(name)
+
+    def kill_session(self, name: str) -> None:
+        self.sessions.discard(name)
+
+    def session_exists(self, name: str) -> bool:
+        return name in self.sessions
+
+    def batch(self) -> SequentialBatch:
+        return SequentialBatch(self)
+
+
+class FakeSubscriber:
+    connected = True
+
+    def discount(self, sessions: List[Session]) -> List[Session]:
+        return sessions
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return DaemonManager(
+        adapter=FakeAdapter(["api", "web"]),
+        projects=ProjectIndex(tmp_path / "projects.json", tmp_path / "state.json"),
+        frecency=FrecencyStore(tmp_path / "frecency.json"),
+    )
+
+
+def request(argv, **extra):
+    return {
+        "version": protocol.PROTOCOL_VERSION,
+        "argv": argv,
+        "cwd": os.getcwd(),
+        "server": server_socket(),
+        "inside_tmux": True,
+        **extra,
+    }
+
+
+def test_frames_round_trip():
+    a, b = socket.socketpair()
+    with a, b:
+        protocol.send(a, {"argv": ["ls"], "text": "é" * 1000})
+        assert protocol.recv(b) == {"argv": ["ls"], "text": "é" * 1000}
+
+
+def test_requests_run_like_the_cli(manager):
+    daemon = Daemon(manager, live_updates=False)
+
+    assert daemon.handle(request(["ls"])) == {"code": 0, "stdout": "api\nweb\n", "stderr": ""}
+    assert daemon.handle(request(["new", "db"]))["code"] == 0
+    assert daemon.handle(request(["ls"]))["stdout"] == "api\ndb\nweb\n"
+
+    bad = daemon.handle(request(["ls", "--bogus"]))
+    assert bad["code"] == 2
+    assert "unrecognized arguments" in bad["stderr"]
+
+
+def test_goto_prepares_the_session_and_leaves_the_switch_to_the_client(manager, tmp_path):
+    daemon = Daemon(manager, live_updates=False)
+
+    reply = daemon.handle(request(["goto", "new"], cwd=str(tmp_path)))
+    assert reply["goto"] == "new"
+    assert "new" in manager.adapter.sessions
+    assert manager.frecency.score("new") > 0
+    assert "goto" not in daemon.handle(request(["ls"]))
+
+
+def test_other_versions_and_servers_fall_back(manager):
+    daemon = Daemon(manager, live_updates=False)
+
+    assert daemon.handle(request(["ls"], version=0)) == {"fallback": True}
+    assert daemon.handle(request(["ls"], server="/tmp/other")) == {"fallback": True}
+
+
+def test_session_list_is_reused_until_something_changes(manager):
+    manager.subscriber = FakeSubscriber()  # type: ignore[assignment]
+
+    manager.list_sessions()
+    manager.list_sessions()
+    assert manager.adapter.list_calls == 1
+
+    manager.kill_session("api")
+    assert [s.name for s in manager.list_sessions()] == ["web"]
+    manager.invalidate()  # what a tmux notification does
+    manager.list_sessions()
+    assert manager.adapter.list_calls == 3
+
+
+def test_bulk_changes_drop_the_session_list(manager, tmp_path):
+    manager.adapter.sessions = {"a", "xa", "xb"}
+    daemon = Daemon(manager, live_updates=False)
+    manager.subscriber = FakeSubscriber()  # type: ignore[assignment]
+
+    assert daemon.handle(request(["ls"]))["stdout"] == "a\nxa\nxb\n"
+    reply = daemon.handle(request(["kill", "x*"]))
+    assert reply["code"] == 0 and "killed 2 of 2 sessions" in reply["stderr"]
+    assert daemon.handle(request(["ls"]))["stdout"] == "a\n"
+
+    (tmp_path / "new.txt").write_text("b\nc\n")
+    assert daemon.handle(request(["new", "--from", str(tmp_path / "new.txt")]))["code"] == 0
+    assert daemon.handle(request(["ls"]))["stdout"] == "a\nb\nc\n"
+
+
+def test_client_talks_to_a_running_daemon(manager, tmp_path, monkeypatch, capsys):
+    path = str(tmp_path / "run" / "daemon.sock")
+    monkeypatch.setenv("YTPM_SOCKET", path)
+    monkeypatch.delenv("YTPM_NO_DAEMON", raising=False)
+
+    # Commands the daemon doesn't serve, or no daemon at all: run in-process.
+    assert forward(["scan"]) is None
+    assert forward(["ls"]) is None
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    daemon = Daemon(manager, path=path, live_updates=False)
+    asyncio.run_coroutine_threadsafe(daemon.start(), loop).result()
+    try:
+        assert forward(["ls"]) == 0
+        assert capsys.readouterr().out == "api\nweb\n"
+        assert forward(["kill", "api"]) == 0
+        assert "api" not in manager.adapter.sessions
+
+        # The client builds the tmux command for goto itself.
+        execs = []
+        monkeypatch.setattr(os, "execvp", lambda file, args: execs.append(args))
+        assert forward(["goto", "web"]) == 0
+        verb = "switch-client" if "TMUX" in os.environ else "attach-session"
+        assert execs == [["tmux", verb, "-t", "=web"]]
+    finally:
+        asyncio.run_coroutine_threadsafe(daemon.stop(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    assert not os.path.exists(path)
+    assert forward(["ls"]) is None
+
+
+def test_sockets_others_could_have_put_there_are_not_used(manager, tmp_path, monkeypatch, capsys):
+    monkeypatch.delenv("YTPM_NO_DAEMON", raising=False)
+    monkeypatch.delenv("YTPM_SOCKET", raising=False)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path / "run"))
+    path = str(tmp_path / "run" / "ytpm" / "daemon.sock")
+    assert private_dirs(path) == [str(tmp_path / "run"), str(tmp_path / "run" / "ytpm")]
+
+    # A directory anyone may write to: the daemon won't listen there...
+    os.makedirs(tmp_path / "run" / "ytpm")
+    os.chmod(tmp_path / "run", 0o1777)
+    with pytest.raises(DaemonError, match="accessible to other users"):
+        asyncio.run(Daemon(manager, path=path, live_updates=False).start())
+
+    # ... and a socket found there isn't trusted, whoever listens on it.
+    planted = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    planted.bind(path)
+    planted.listen()
+    try:
+        assert forward(["ls"]) is None
+        assert "not using the daemon socket" in capsys.readouterr().err
+        os.chmod(tmp_path / "run", 0o700)
+        os.chmod(tmp_path / "run" / "ytpm", 0o700)
+        os.chmod(path, 0o666)
+        assert forward(["ls"]) is None
+        assert "daemon.sock: accessible to other users" in capsys.readouterr().err
+    finally:
+        planted.close()
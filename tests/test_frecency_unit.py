@@ -0,0 +1,67 @@
+# tests/test_frecency_unit.py
+
+import json
+
+import pytest
+
+from ytpm.core.frecency import FrecencyStore
+
+DAY = 24 * 3600
+
+
+@pytest.fixture
+def store(tmp_path):
+    return FrecencyStore(tmp_path / "frecency.json", half_life=DAY)
+
+
+def test_unvisited_names_score_zero(store):
+    assert store.score("nope") == 0.0
+    assert store.scores(["a", "b"]) == {"a": 0.0, "b": 0.0}
+
+
+def test_visits_add_up_and_decay(store):
+    store.visit("a", now=0)
+    store.visit("a", now=0)
+
+    assert store.score("a", now=0) == pytest.approx(2.0)
+    assert store.score("a", now=DAY) == pytest.approx(1.0)
+    store.visit("a", now=DAY)
+    assert store.score("a", now=DAY) == pytest.approx(2.0)
+
+
+def test_recent_visit_outranks_old_frequent_ones(store):
+    for _ in range(3):
+        store.visit("old", now=0)
+    store.visit("new", now=3 * DAY)
+
+    # old: 3 / 8 = 0.375 at t=3d; new: 1.
+    assert store.rank(["x", "old", "new", "y"]) == ["new", "old", "x", "y"]
+
+
+def test_store_is_shared_through_the_file(store, tmp_path):
+    store.visit("a", now=0)
+    other = FrecencyStore(store.path, half_life=DAY)
+
+    assert other.score("a", now=0) == pytest.approx(1.0)
+    other.visit("b", now=0)
+    assert store.scores(["a", "b"], now=0) == {"a": pytest.approx(1.0), "b": pytest.approx(1.0)}
+
+
+def test_compaction_keeps_the_best_entries(tmp_path):
+    store = FrecencyStore(tmp_path / "frecency.json", half_life=DAY, max_entries=4)
+    for i in range(6):
+        store.visit(f"s{i}", now=i * DAY)
+
+    entries = json.loads(store.path.read_text())["entries"]
+    assert sorted(entries) == ["s2", "s3", "s4", "s5"]
+
+
+def test_forget_and_corrupt_file(store):
+    store.visit("a", now=0)
+    store.forget("a")
+    assert store.score("a", now=0) == 0.0
+
+    store.path.write_text("{not json")
+    assert store.score("a") == 0.0
+    store.visit("a", now=0)
+    assert store.score("a", now=0) == pytest.approx(1.0)
@@ -0,0 +1,50 @@
+# tests/test_fuzzy_benchmark.py
+#
+# Micro-benchmark for the TUI filter: typing a query one key at a time over
+# 10k candidates must stay well inside a 60Hz frame (~16ms) per keystroke.
+#
+# The timings are always printed (pytest -s) but only asserted with
+# YTPM_BENCH=1: they depend on the machine and on what else it is doing.
+
+import os
+import random
+import time
+
+from ytpm.core.fuzzy import FuzzyIndex
+
+FRAME_MS = 1000 / 60
+
+BENCH = bool(os.environ.get("YTPM_BENCH"))
+
+WORDS = (
+    "api web core db auth ytpm tmux infra build deploy service client "
+    "server data ml frontend backend docs tools lib"
+).split()
+
+
+def candidates(n: int = 10_000) -> list[str]:
+    rng = random.Random(42)
+    return [
+        f"{rng.choice(WORDS)}-{rng.choice(WORDS)}/{rng.choice(WORDS)}{rng.randint(0, 999)}"
+        for _ in range(n)
+    ]
+
+
+def keystroke_times_ms(names: list[str], query: str) -> list[float]:
+    index = FuzzyIndex(names)
+    times = []
+    for n in range(1, len(query) + 1):
+        started = time.perf_counter()
+        index.search(query[:n])
+        times.append((time.perf_counter() - started) * 1000)
+    return times
+
+
+def test_fuzzy_filter_keystroke_latency():
+    names = candidates()
+    for query in ("ytpmcore", "apiweb", "deploysrv"):
+        # Best of a few runs, to keep scheduler noise out of the number.
+        worst = min(max(keystroke_times_ms(names, query)) for _ in range(3))
+        print(f"fuzzy 10k '{query}': worst keystroke {worst:.2f}ms")
+        if BENCH:
+            assert worst < FRAME_MS, f"'{query}' took {worst:.2f}ms on one keystroke"
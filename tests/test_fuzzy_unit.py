@@ -0,0 +1,74 @@
+# tests/test_fuzzy_unit.py
+
+from ytpm.core.fuzzy import FuzzyIndex, char_mask, score
+
+
+def test_score_requires_subsequence():
+    assert score("ytpm-core", "ytc") is not None
+    assert score("ytpm-core", "cty") is None
+
+
+def test_score_prefers_tight_and_word_start_matches():
+    # Consecutive beats spread out.
+    assert score("core", "cor") > score("c_o_r_e", "cor")
+    # Matching the start of a word beats matching mid-word.
+    assert score("web-api", "api") > score("webxapi", "api")
+
+
+def test_char_mask_rejects_missing_characters():
+    assert char_mask("abc") & char_mask("ac") == char_mask("ac")
+    assert char_mask("abc") & char_mask("az") != char_mask("az")
+
+
+def test_index_ranks_best_match_first_and_is_case_insensitive():
+    index = FuzzyIndex(["backend-db", "DB", "docs-builder"])
+
+    assert index.filter("db") == ["DB", "backend-db", "docs-builder"]
+
+
+def test_empty_query_keeps_original_order():
+    index = FuzzyIndex(["b", "a", "c"])
+
+    assert index.filter("") == ["b", "a", "c"]
+
+
+def test_incremental_search_matches_fresh_search():
+    names = [f"{a}-{b}" for a in ("api", "web", "core", "ytpm") for b in ("db", "ui", "cli")]
+    incremental = FuzzyIndex(names)
+    query = "ytpmcli"
+
+    for n in range(1, len(query) + 1):
+        assert incremental.search(query[:n]) == FuzzyIndex(names).search(query[:n])
+
+    # Backspace reuses what was computed on the way in.
+    for n in range(len(query) - 1, 0, -1):
+        assert incremental.search(query[:n]) == FuzzyIndex(names).search(query[:n])
+
+    # A different query after that starts over correctly.
+    assert incremental.filter("webui") == FuzzyIndex(names).filter("webui")
+
+
+def test_boosts_break_ties_but_not_clear_wins():
+    index = FuzzyIndex(["api", "app", "zap-pad"], boosts={"app": 4.0, "zap-pad": 4.0})
+
+    # "api" and "app" match "ap" equally; the boost decides.
+    assert index.filter("ap")[:2] == ["app", "api"]
+    # A much tighter match still beats a boosted loose one.
+    assert index.filter("app")[0] == "app"
+    assert index.filter("pa") == ["zap-pad"]
+
+
+def test_buckets_find_what_scoring_every_candidate_finds():
+    names = ["Api-db", "web/ui", "a.b", "core_cli", "x:y", "ytpm", "b-a", "é-web"]
+    boosts = {"web/ui": 1.5}
+
+    def brute(query):
+        hits = [(i, score(n.lower(), query)) for i, n in enumerate(names)]
+        ranked = [(i, s + boosts.get(names[i], 0.0)) for i, s in hits if s is not None]
+        return sorted(ranked, key=lambda hit: -hit[1])
+
+    index = FuzzyIndex(names, boosts=boosts)
+    for query in ("a", "b", "/", ".", ":", "é", "-", "w", "z", "ab", "wb", "é-w", "cli"):
+        # One character at a time fills buckets the fresh multi-character
+        # searches then start from.
+        assert index.search(query) == brute(query), query
@@ -0,0 +1,147 @@
+# tests/test_gitstatus_unit.py
+
+import os
+import shutil
+import subprocess
+import threading
+import time
+
+import pytest
+
+from ytpm.core.gitstatus import GitStatus, GitStatusCache, find_git_dir, parse_status
+
+needs_git = pytest.mark.skipif(shutil.which("git") is None, reason="git not available")
+
+
+def git(cwd, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def repo(tmp_path):
+    path = tmp_path / "repo"
+    path.mkdir()
+    git(path, "init", "-q", "-b", "main")
+    (path / "a.txt").write_text("a\n")
+    git(path, "add", "a.txt")
+    git(path, "commit", "-q", "-m", "first")
+    return path
+
+
+class CountingCache(GitStatusCache):
+    """Counts (and optionally slows down) git runs."""
+
+    def __init__(self, *args, delay: float = 0.0, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.runs = []
+        self.delay = delay
+        self.running = 0
+        self.most_running = 0
+        self._lock = threading.Lock()
+
+    def _run_git(self, path):
+        with self._lock:
+            self.runs.append(path)
+            self.running += 1
+            self.most_running = max(self.most_running, self.running)
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+            return super()._run_git(path)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+def test_porcelain_output_is_parsed():
+    output = (
+        "# branch.oid 1234567890abcdef\n"
+        "# branch.head main\n"
+        "# branch.upstream origin/main\n"
+        "# branch.ab +2 -1\n"
+        "? new.txt\n"
+    )
+    assert parse_status(output) == GitStatus("main", True, 2, 1)
+    assert parse_status("# branch.oid 1234567890abcdef\n# branch.head (detached)\n") == (
+        GitStatus("(1234567)")
+    )
+    assert GitStatus("main", True, 2, 1).describe() == "main* +2 -1"
+
+
+@needs_git
+def test_git_dir_is_found_from_subdirectories_and_worktrees(repo, tmp_path):
+    (repo / "sub" / "deeper").mkdir(parents=True)
+    assert find_git_dir(str(repo / "sub" / "deeper")) == str(repo / ".git")
+
+    git(repo, "worktree", "add", "-q", str(tmp_path / "wt"))
+    assert find_git_dir(str(tmp_path / "wt")) == str(repo / ".git" / "worktrees" / "wt")
+    assert find_git_dir("/") is None
+
+
+@needs_git
+def test_unchanged_repositories_are_answered_without_git(repo, tmp_path):
+    cache = CountingCache(tmp_path / "git.json")
+
+    assert list(cache.statuses([str(repo)])) == [(str(repo), GitStatus("main"))]
+    assert list(cache.statuses([str(repo)])) == [(str(repo), GitStatus("main"))]
+    # Another process reads the same file.
+    other = CountingCache(tmp_path / "git.json")
+    assert list(other.statuses([str(repo)])) == [(str(repo), GitStatus("main"))]
+    assert len(cache.runs) == 1 and other.runs == []
+
+    # Staging touches the index.
+    (repo / "a.txt").write_text("b\n")
+    git(repo, "add", "a.txt")
+    assert list(cache.statuses([str(repo)])) == [(str(repo), GitStatus("main", dirty=True))]
+    assert len(cache.runs) == 2
+
+    # Unstaged edits don't; the ttl catches them.
+    git(repo, "commit", "-q", "-m", "second")
+    list(cache.statuses([str(repo)]))
+    (repo / "a.txt").write_text("c\n")
+    cache.ttl = 0
+    assert list(cache.statuses([str(repo)])) == [(str(repo), GitStatus("main", dirty=True))]
+
+
+@needs_git
+def test_repositories_are_looked_up_in_a_bounded_pool(repo, tmp_path):
+    repos = []
+    for i in range(6):
+        path = tmp_path / f"r{i}"
+        shutil.copytree(repo, path)
+        repos.append(str(path))
+    plain = tmp_path / "plain"
+    plain.mkdir()
+    cache = CountingCache(tmp_path / "git.json", delay=0.2, max_workers=3)
+
+    start = time.perf_counter()
+    results = dict(cache.statuses([str(plain), *repos]))
+    elapsed = time.perf_counter() - start
+
+    assert results[str(plain)] is None
+    assert all(results[r] == GitStatus("main") for r in repos)
+    assert sorted(cache.runs) == repos
+    assert cache.most_running == 3
+    # Two rounds of three, not six in a row.
+    assert elapsed < 6 * 0.2
+
+
+@needs_git
+def test_a_consumer_that_stops_early_keeps_what_finished(repo, tmp_path):
+    cache = CountingCache(tmp_path / "git.json")
+    other = tmp_path / "other"
+    shutil.copytree(repo, other)
+
+    stream = cache.statuses([str(repo), str(other)])
+    first, _ = next(stream)
+    stream.close()
+
+    assert os.path.exists(tmp_path / "git.json")
+    again = CountingCache(tmp_path / "git.json")
+    list(again.statuses([first]))
+    assert again.runs == []
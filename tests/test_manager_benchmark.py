@@ -0,0 +1,233 @@
+# tests/test_manager_benchmark.py
+#
+# Latency of Manager and CLI operations for 10, 100 and 1000 sessions, on
+# two backends: an in-memory adapter (ytpm's own overhead) and a real tmux
+# server on a private socket (tmux -L), so the user's server is never
+# touched.
+#
+# By default only the scenarios' results are checked and the timings
+# printed. With YTPM_BENCH=1, timings are compared with
+# tests/baselines/manager_benchmark.json. They are stored in units of a
+# small pure-Python calibration workload timed on the same run, so the
+# baselines carry over between fast and slow machines; a metric fails when
+# it is more than the backend's threshold times its baseline.
+#
+#   YTPM_BENCH=1         fail on timings beyond the baselines
+#   YTPM_BENCH_FULL=1    also run real tmux with 1000 sessions (slow)
+#   YTPM_BENCH_UPDATE=1  rewrite the baselines from this run
+#   YTPM_BENCH_OUT=FILE  write this run's results as JSON
+
+import gc
+import io
+import json
+import os
+import shutil
+import subprocess
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import pytest
+
+from ytpm.adapters.batch import SequentialBatch
+from ytpm.adapters.session import Session
+from ytpm.adapters.tmux import TmuxAdapter
+from ytpm.cli.main import run
+from ytpm.core.frecency import FrecencyStore
+from ytpm.core.manager import Manager
+from ytpm.core.projects import ProjectIndex
+
+BASELINES = Path(__file__).resolve().parent / "baselines" / "manager_benchmark.json"
+
+SIZES = (10, 100, 1000)
+
+# Allowed slowdown against the baseline, per backend. Real tmux also
+# measures process spawns and the server, which are noisier.
+THRESHOLDS = {"memory": 2.5, "tmux": 3.0}
+
+# Metrics faster than this (in calibration units, ~1% of it) are only
+# compared against the floor; below it, timer noise dominates.
+FLOOR = 0.01
+
+# Repetitions of each latency measurement; the best is kept, as timeit
+# does: slower runs measure whatever else the machine was doing.
+REPEAT = 7
+
+BENCH = bool(os.environ.get("YTPM_BENCH"))
+FULL = bool(os.environ.get("YTPM_BENCH_FULL"))
+
+results: Dict[str, Dict[str, Dict[str, float]]] = {}
+
+
+class MemoryAdapter:
+    """In-memory tmux with the cost profile of a list: O(n) listings."""
+
+    def __init__(self) -> None:
+        self.sessions: Dict[str, Session] = {}
+        self._next_id = 0
+
+    def list_sessions(self) -> List[Session]:
+        return list(self.sessions.values())
+
+    def session_exists(self, name: str) -> bool:
+        return name in self.sessions
+
+    def create_session(self, name: str, cwd: str) -> None:
+        if name in self.sessions:
+            raise RuntimeError(f"duplicate session: {name}")
+        self._next_id += 1
+        self.sessions[name] = Session(name, f"${self._next_id}", windows=1, path=cwd)
+
+    def kill_session(self, name: str) -> None:
+        if self.sessions.pop(name, None) is None:
+            raise RuntimeError(f"can't find session: {name}")
+
+    def attach(self, name: str) -> None:
+        pass
+
+    def switch_client(self, name: str) -> None:
+        pass
+
+    def set_hooks(self, events, command: str, index: int) -> None:
+        pass
+
+    def batch(self) -> SequentialBatch:
+        return SequentialBatch(self)
+
+
+def calibration_ms() -> float:
+    """Time of a fixed, allocation-heavy Python workload (best of 5)."""
+
+    def workload() -> None:
+        rows = [f"session-{i:05d}\t{i * 7 % 1000}" for i in range(20_000)]
+        rows.sort(key=lambda r: r.split("\t")[1])
+
+    return min(timed_ms(workload) for _ in range(5))
+
+
+def timed_ms(fn: Callable[[], object]) -> float:
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1000
+
+
+def best_ms(fn: Callable[[], object]) -> float:
+    gc.collect()
+    return min(timed_ms(fn) for _ in range(REPEAT))
+
+
+@pytest.fixture(scope="module")
+def calibration() -> float:
+    return calibration_ms()
+
+
+@pytest.fixture
+def tmux_server(tmp_path):
+    """A throw-away tmux server on its own socket, killed afterwards."""
+    if shutil.which("tmux") is None:
+        pytest.skip("tmux not available")
+    name = f"ytpm-bench-{os.getpid()}-{os.urandom(3).hex()}"
+    conf = tmp_path / "tmux.conf"
+    conf.write_text("set -g default-shell /bin/sh\n")
+    subprocess.run(
+        ["tmux", "-L", name, "-f", str(conf), "new-session", "-d", "-s", "bench-base"],
+        check=True,
+    )
+    try:
+        yield name
+    finally:
+        subprocess.run(["tmux", "-L", name, "kill-server"], capture_output=True)
+
+
+def make_manager(adapter, tmp_path) -> Manager:
+    return Manager(
+        adapter=adapter,
+        projects=ProjectIndex(tmp_path / "projects.json", tmp_path / "state.json"),
+        frecency=FrecencyStore(tmp_path / "frecency.json"),
+    )
+
+
+def measure(manager: Manager, n: int, cwd: str) -> Dict[str, float]:
+    """Run every scenario against `manager` with n sessions."""
+    names = [f"bench-{i:04d}" for i in range(n)]
+    metrics: Dict[str, float] = {}
+
+    metrics["create_sessions_ms"] = timed_ms(
+        lambda: manager.create_sessions([(name, cwd) for name in names])
+    )
+    assert len(manager.match_sessions(["bench-0*"])) == n
+
+    metrics["list_sessions_ms"] = best_ms(manager.list_sessions)
+    metrics["cli_ls_ms"] = best_ms(lambda: _cli(["ls", "--long"], manager))
+    # goto's path for a session that already exists, minus the switch.
+    metrics["create_existing_ms"] = best_ms(lambda: manager.create_session(names[n // 2], cwd))
+    metrics["match_sessions_ms"] = best_ms(lambda: manager.match_sessions(["bench-00*"]))
+
+    metrics["kill_sessions_ms"] = timed_ms(lambda: manager.kill_sessions(names))
+    assert manager.match_sessions(["bench-0*"]) == []
+    return metrics
+
+
+def _cli(argv: List[str], manager: Manager) -> None:
+    with redirect_stdout(io.StringIO()):
+        assert run(argv, manager) == 0
+
+
+def check(backend: str, n: int, metrics: Dict[str, float], calibration: float) -> None:
+    """Record the run and compare it with the baseline."""
+    units = {key: round(value / calibration, 4) for key, value in metrics.items()}
+    results.setdefault(backend, {})[str(n)] = units
+    for key, value in metrics.items():
+        bulk = key in ("create_sessions_ms", "kill_sessions_ms")
+        per_session = f" ({value / n * 1000:.0f}us/session)" if bulk else ""
+        print(f"{backend:>6} n={n:<5} {key:<20} {value:9.2f}ms{per_session}")
+
+    # Wall time depends on the machine and its load: only compared on request.
+    if os.environ.get("YTPM_BENCH_UPDATE") or not BENCH:
+        return
+    baseline = _load_baselines().get(backend, {}).get(str(n), {})
+    limit = THRESHOLDS[backend]
+    slower = {
+        key: f"{units[key] / base:.1f}x"
+        for key, base in baseline.items()
+        if key in units and units[key] > max(base, FLOOR) * limit
+    }
+    assert not slower, f"{backend} n={n} regressed beyond {limit}x its baseline: {slower}"
+
+
+def _load_baselines() -> Dict[str, Dict[str, Dict[str, float]]]:
+    try:
+        return json.loads(BASELINES.read_text())["results"]
+    except FileNotFoundError:
+        return {}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def save_results():
+    yield
+    report = {"units": "multiples of calibration_ms()", "results": results}
+    out = os.environ.get("YTPM_BENCH_OUT")
+    if out:
+        Path(out).write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+    if os.environ.get("YTPM_BENCH_UPDATE") and results:
+        merged = _load_baselines()
+        for backend, sizes in results.items():
+            merged.setdefault(backend, {}).update(sizes)
+        report["results"] = merged
+        BASELINES.parent.mkdir(exist_ok=True)
+        BASELINES.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+@pytest.mark.parametrize("n", SIZES)
+def test_memory_backend(n, tmp_path, calibration):
+    manager = make_manager(MemoryAdapter(), tmp_path)
+    check("memory", n, measure(manager, n, str(tmp_path)), calibration)
+
+
+@pytest.mark.parametrize("n", SIZES)
+def test_tmux_backend(n, tmp_path, tmux_server, calibration):
+    if n >= 1000 and not FULL:
+        pytest.skip("set YTPM_BENCH_FULL=1 to benchmark 1000 real tmux sessions")
+    manager = make_manager(TmuxAdapter(socket_name=tmux_server), tmp_path)
+    check("tmux", n, measure(manager, n, str(tmp_path)), calibration)
@@ -1,10 +1,23 @@
 # tests/test_manager_unit.py
 
+import asyncio
+import os
 from typing import List
 
 import pytest
 
-from ytpm.core.manager import Manager
+from ytpm.adapters.batch import SequentialBatch
+from ytpm.adapters.session import Session
+from ytpm.core.frecency import FrecencyStore
+from ytpm.core.manager import AsyncManager, Manager, SessionCache
+from ytpm.core.projects import Project
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    """Keep visit history and caches out of the real XDG dirs."""
+    monkeypatch.setenv("XDG_STATE_HOME", str(tmp_path / "state"))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
 
 
 class FakeAdapter:
@@ -20,18 +33,24 @@ class FakeAdapter:
         # Track calls for attach/switch so we can assert behavior
         self.attach_calls: list[str] = []
         self.switch_calls: list[str] = []
+        self.batch_calls = 0
+        self.list_calls = 0
+        self.hook_calls: list[tuple] = []
+        self.cwds: dict[str, str] = {}
 
     # --- methods that mimic TmuxAdapter ---
 
-    def list_sessions(self) -> List[str]:
-        return sorted(self.sessions)
+    def list_sessions(self) -> List[Session]:
+        self.list_calls += 1
+        return [Session(name) for name in sorted(self.sessions)]
 
     def session_exists(self, name: str) -> bool:
         return name in self.sessions
 
     def create_session(self, name: str, cwd: str) -> None:
-        # We don't care about cwd here; just track the session name
+        # Track the session name, and where it was started
         self.sessions.add(name)
+        self.cwds[name] = cwd
 
     def attach(self, name: str) -> None:
         self.attach_calls.append(name)
@@ -42,6 +61,13 @@ class FakeAdapter:
     def kill_session(self, name: str) -> None:
         self.sessions.discard(name)
 
+    def set_hooks(self, events, command: str, index: int) -> None:
+        self.hook_calls.append((tuple(events), command, index))
+
+    def batch(self) -> SequentialBatch:
+        self.batch_calls += 1
+        return SequentialBatch(self)
+
 
 def test_list_sessions_returns_adapter_sessions():
     fake = FakeAdapter()
@@ -50,7 +76,7 @@ def test_list_sessions_returns_adapter_sessions():
     manager = Manager(adapter=fake)
     sessions = manager.list_sessions()
 
-    assert sessions == ["a", "b"]
+    assert [s.name for s in sessions] == ["a", "b"]
 
 
 def test_create_session_does_not_duplicate_existing():
@@ -104,6 +130,216 @@ def test_goto_session_inside_tmux_creates_and_switches(monkeypatch: pytest.Monke
     assert fake.attach_calls == []
 
 
+class FakeProjects:
+    def __init__(self, projects: List[Project]) -> None:
+        self.projects = projects
+
+    def find(self, name: str):
+        return next((p for p in self.projects if p.name == name), None)
+
+
+def test_goto_session_without_cwd_uses_project_path(monkeypatch: pytest.MonkeyPatch):
+    fake = FakeAdapter()
+    projects = FakeProjects([Project("proj", "/src/proj")])
+    manager = Manager(adapter=fake, projects=projects)  # type: ignore[arg-type]
+    monkeypatch.setattr(manager, "_inside_tmux", lambda: True)
+
+    manager.goto_session("proj")
+
+    assert fake.cwds == {"proj": "/src/proj"}
+
+
+def test_goto_session_without_cwd_or_project_uses_current_dir(monkeypatch: pytest.MonkeyPatch):
+    fake = FakeAdapter()
+    manager = Manager(adapter=fake, projects=FakeProjects([]))  # type: ignore[arg-type]
+    monkeypatch.setattr(manager, "_inside_tmux", lambda: True)
+    monkeypatch.chdir("/tmp")
+
+    manager.goto_session("proj")
+
+    assert fake.cwds == {"proj": os.getcwd()}
+
+
+def test_goto_session_records_visits_and_list_ranks_by_them(
+    tmp_path, monkeypatch: pytest.MonkeyPatch
+):
+    fake = FakeAdapter()
+    fake.sessions = {"a", "b", "c"}
+    frecency = FrecencyStore(tmp_path / "frecency.json")
+    manager = Manager(adapter=fake, frecency=frecency)
+    monkeypatch.setattr(manager, "_inside_tmux", lambda: True)
+
+    manager.goto_session("c", "/tmp")
+    manager.goto_session("c", "/tmp")
+    manager.goto_session("b", "/tmp")
+
+    assert [s.name for s in manager.list_sessions()] == ["c", "b", "a"]
+    assert manager.frecency_scores(["a"]) == {"a": 0.0}
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Stands in for the tmux server's socket file."""
+    path = tmp_path / "tmux.sock"
+    path.touch()
+    return path
+
+
+def cached_manager(fake, tmp_path, server, ttl=60.0):
+    # A fresh Manager per call, like separate ytpm processes.
+    cache = SessionCache(
+        tmp_path / "sessions.json", tmp_path / "sessions.gen", ttl=ttl, server=str(server)
+    )
+    return Manager(adapter=fake, cache=cache)
+
+
+def test_cached_sessions_are_shared_until_a_hook_fires(tmp_path, server):
+    fake = FakeAdapter()
+    fake.sessions = {"a", "b"}
+
+    assert [s.name for s in cached_manager(fake, tmp_path, server).list_sessions()] == ["a", "b"]
+    assert [s.name for s in cached_manager(fake, tmp_path, server).list_sessions()] == ["a", "b"]
+    assert fake.list_calls == 1
+    assert len(fake.hook_calls) == 1
+    events, command, index = fake.hook_calls[0]
+    assert "session-created" in events and "sessions.gen" in command
+
+    # What the installed hook does when tmux creates a session.
+    fake.sessions.add("c")
+    with open(tmp_path / "sessions.gen", "a") as f:
+        f.write(".")
+    assert [s.name for s in cached_manager(fake, tmp_path, server).list_sessions()] == ["a", "b", "c"]
+    assert fake.list_calls == 2
+    assert len(fake.hook_calls) == 1
+
+
+def test_cache_expires_and_follows_server_restarts(tmp_path, server):
+    fake = FakeAdapter()
+    fake.sessions = {"a"}
+
+    cached_manager(fake, tmp_path, server, ttl=0.0).list_sessions()
+    cached_manager(fake, tmp_path, server, ttl=0.0).list_sessions()
+    assert fake.list_calls == 2
+
+    # A new server is a new socket file; our hooks died with the old one.
+    restarted = tmp_path / "new.sock"
+    restarted.touch()
+    os.replace(restarted, server)
+    cached_manager(fake, tmp_path, server).list_sessions()
+    assert fake.list_calls == 3
+    assert len(fake.hook_calls) == 2
+
+
+def test_existence_checks_use_the_snapshot(tmp_path, server):
+    fake = FakeAdapter()
+    fake.sessions = {"a"}
+    manager = cached_manager(fake, tmp_path, server)
+    manager.list_sessions()
+
+    assert manager.session_exists("a")
+    assert not manager.session_exists("zzz")
+    manager.create_session("a", "/tmp")
+    manager.kill_session("zzz")
+    assert fake.batch_calls == 0
+
+    # Our own changes invalidate the snapshot right away.
+    manager.kill_session("a")
+    assert fake.batch_calls == 1
+    assert manager.list_sessions() == []
+    assert fake.list_calls == 2
+
+
+def test_no_server_means_no_cache(tmp_path):
+    fake = FakeAdapter()
+    manager = cached_manager(fake, tmp_path, tmp_path / "missing.sock")
+
+    manager.list_sessions()
+    manager.list_sessions()
+    assert fake.list_calls == 2
+    assert fake.hook_calls == []
+
+
+def test_bulk_create_and_kill_use_one_batch_each():
+    fake = FakeAdapter()
+    fake.sessions = {"keep", "old-1"}
+    manager = Manager(adapter=fake)
+
+    results = manager.create_sessions([(f"s{i}", f"/src/{i}") for i in range(50)])
+    assert all(r.ok for r in results) and len(results) == 50
+    assert fake.batch_calls == 1
+    assert fake.cwds["s7"] == "/src/7"
+
+    names = manager.match_sessions(["s*", "old-*"], exclude=["s1*"])
+    results = manager.kill_sessions(names)
+    assert all(r.ok for r in results)
+    assert fake.batch_calls == 2
+    assert fake.sessions == {"keep"} | {f"s{i}" for i in [1] + list(range(10, 20))}
+
+
+def test_bulk_create_reports_failures_and_continues():
+    class Picky(FakeAdapter):
+        def create_session(self, name: str, cwd: str) -> None:
+            if not name:
+                raise RuntimeError("invalid session:")
+            super().create_session(name, cwd)
+
+    fake = Picky()
+    manager = Manager(adapter=fake)
+
+    results = manager.create_sessions([("a", "/"), ("", "/"), ("b", "/")])
+
+    assert [(r.name, r.ok) for r in results] == [("a", True), ("", False), ("b", True)]
+    assert results[1].error == "invalid session:"
+    # The failure stopped the first batch; the rest went in a second one.
+    assert fake.batch_calls == 2
+
+
+def test_bulk_changes_report_every_item_when_tmux_times_out():
+    from ytpm.adapters.tmux import TmuxTimeoutError
+
+    class Stalling(FakeAdapter):
+        # Creates the first two sessions of each batch, then stops answering.
+        def batch(self) -> SequentialBatch:
+            adapter = self
+
+            class Batch(SequentialBatch):
+                def run(self, check: bool = False):
+                    for _, op in self._ops[:2]:
+                        op()
+                    raise TmuxTimeoutError(["tmux", "new-session"] * 500, 5.0)
+
+            self.batch_calls += 1
+            return Batch(adapter)
+
+    fake = Stalling()
+    manager = Manager(adapter=fake)
+    manager.BULK_CHUNK = 3
+
+    results = manager.create_sessions([(f"s{i}", "/") for i in range(5)])
+
+    assert [(r.name, r.ok) for r in results] == [
+        ("s0", True),
+        ("s1", True),
+        ("s2", False),
+        ("s3", False),
+        ("s4", False),
+    ]
+    assert results[2].error == "tmux did not answer within 5s"
+    # Nothing more is sent to a tmux that stopped answering.
+    assert fake.batch_calls == 1
+
+    # Nor does it list its sessions: ops it reported done count as done.
+    class Silent(FakeAdapter):
+        def list_sessions(self) -> List[Session]:
+            raise TmuxTimeoutError(["tmux", "list-sessions"], 4.99999)
+
+    fake = Silent()
+    fake.sessions = {"a", "b"}
+    results = Manager(adapter=fake).kill_sessions(["a", "b"])
+    assert [(r.name, r.ok) for r in results] == [("a", True), ("b", True)]
+    assert fake.sessions == set()
+
+
 def test_kill_session_removes_if_exists():
     fake = FakeAdapter()
     fake.sessions = {"a", "b"}
@@ -123,3 +359,71 @@ def test_kill_session_no_error_if_missing():
 
     # Session set stays unchanged
     assert fake.sessions == {"a"}
+
+
+def test_goto_session_uses_a_single_batch(monkeypatch: pytest.MonkeyPatch):
+    fake = FakeAdapter()
+    fake.sessions = {"proj"}
+    manager = Manager(adapter=fake)
+    monkeypatch.setattr(manager, "_inside_tmux", lambda: True)
+
+    manager.goto_session("proj", "/tmp")
+
+    assert fake.batch_calls == 1
+    assert fake.sessions == {"proj"}
+    assert fake.switch_calls == ["proj"]
+
+
+def test_sequential_batch_skips_after_failure():
+    fake = FakeAdapter()
+
+    def boom(name: str) -> None:
+        raise RuntimeError("no client")
+
+    fake.switch_client = boom  # type: ignore[method-assign]
+    batch = SequentialBatch(fake)
+    batch.switch_client("a")
+    batch.kill_session("a", missing_ok=True)
+
+    results = batch.run()
+
+    assert [r.ok for r in results] == [False, False]
+    assert results[0].error == "no client"
+    assert results[1].error.startswith("not run")
+
+
+class FakeAsyncAdapter:
+    """Async fake whose queries take a while, to check they run concurrently."""
+
+    def __init__(self, sessions: set[str]) -> None:
+        self.sessions = sessions
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def list_sessions(self) -> List[Session]:
+        return [Session(name) for name in sorted(self.sessions)]
+
+    async def session_exists(self, name: str) -> bool:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return name in self.sessions
+
+
+def test_async_manager_lists_sessions():
+    manager = AsyncManager(adapter=FakeAsyncAdapter({"b", "a"}))
+
+    sessions = asyncio.run(manager.list_sessions())
+
+    assert [s.name for s in sessions] == ["a", "b"]
+
+
+def test_async_manager_checks_sessions_concurrently():
+    fake = FakeAsyncAdapter({"a"})
+    manager = AsyncManager(adapter=fake)
+
+    found = asyncio.run(manager.sessions_exist(["a", "b", "c"]))
+
+    assert found == {"a": True, "b": False, "c": False}
+    assert fake.max_in_flight == 3
@@ -0,0 +1,183 @@
+# tests/test_multi_server_unit.py
+
+import time
+from typing import List
+
+import pytest
+
+from ytpm.adapters.batch import SKIPPED, SequentialBatch
+from ytpm.adapters.multi import MultiServerAdapter, ServerRoutingError
+from ytpm.adapters.session import Pane, Session
+from ytpm.core.frecency import FrecencyStore
+from ytpm.core.manager import Manager
+from ytpm.core.projects import Project
+
+
+class FakeServer:
+    """One in-memory tmux server; every call takes `latency` seconds."""
+
+    def __init__(self, *names: str, latency: float = 0.0, socket: str = "x") -> None:
+        self.sessions = {name: "/" for name in names}
+        self.latency = latency
+        self.calls: List[tuple] = []
+        self.command_prefix = ["tmux", "-L", socket]
+
+    def _wait(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+    def list_sessions(self) -> List[Session]:
+        self._wait()
+        return [Session(name, f"${i}") for i, name in enumerate(self.sessions)]
+
+    def list_panes(self) -> List[Pane]:
+        self._wait()
+        return [Pane(name, "@1", 0, "w", "%1") for name in self.sessions]
+
+    def session_exists(self, name: str) -> bool:
+        return name in self.sessions
+
+    def create_session(self, name: str, cwd: str, window: str = "") -> None:
+        self.sessions[name] = cwd
+
+    def kill_session(self, name: str) -> None:
+        del self.sessions[name]
+
+    def switch_client(self, name: str) -> None:
+        self.calls.append(("switch_client", name))
+
+    def attach(self, name: str) -> None:
+        self.calls.append(("attach", name))
+
+    def detach_client(self, command: str) -> None:
+        self.calls.append(("detach_client", command))
+
+    def select_layout(self, target: str, layout: str) -> None:
+        if not target.startswith("=") or target[1:].split(":")[0] not in self.sessions:
+            raise RuntimeError(f"can't find session: {target}")
+        self.calls.append(("select_layout", target, layout))
+
+    def batch(self) -> SequentialBatch:
+        self._wait()
+        return SequentialBatch(self)
+
+
+class FakeProjects:
+    def __init__(self, projects: List[Project]) -> None:
+        self.projects = projects
+
+    def find(self, name: str):
+        return next((p for p in self.projects if p.name == name), None)
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("XDG_STATE_HOME", str(tmp_path / "state"))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+
+def test_sessions_of_all_servers_are_listed_with_their_server():
+    multi = MultiServerAdapter({"a": FakeServer("api"), "b": FakeServer("api", "web")})
+
+    sessions = multi.list_sessions()
+
+    assert sessions == [
+        Session("a:api", "a:$0", server="a"),
+        Session("b:api", "b:$0", server="b"),
+        Session("b:web", "b:$1", server="b"),
+    ]
+    assert [(p.session, p.window_id, p.id) for p in multi.list_panes()][:1] == [
+        ("a:api", "a:@1", "a:%1")
+    ]
+
+
+def test_servers_are_listed_concurrently():
+    servers = {f"s{i}": FakeServer(f"p{i}", latency=0.2) for i in range(8)}
+    multi = MultiServerAdapter(servers)
+
+    start = time.perf_counter()
+    sessions = multi.list_sessions()
+    elapsed = time.perf_counter() - start
+
+    assert len(sessions) == 8
+    # Eight servers in about the time of one (0.2s), not eight (1.6s).
+    assert elapsed < 0.8
+
+
+def test_operations_go_to_the_server_they_name():
+    a, b = FakeServer("api"), FakeServer("api")
+    multi = MultiServerAdapter({"a": a, "b": b})
+
+    batch = multi.batch()
+    batch.kill_session("b:api")
+    batch.create_session("a:new", "/src/new")
+    batch.select_layout("=a:new:{end}", "tiled")
+    results = batch.run(check=True)
+
+    assert [r.ok for r in results] == [True, True, True]
+    assert set(a.sessions) == {"api", "new"} and set(b.sessions) == set()
+    assert a.calls == [("select_layout", "=new:{end}", "tiled")]
+
+
+def test_unqualified_names_go_to_the_server_that_has_them():
+    a, b = FakeServer("api"), FakeServer("web")
+    multi = MultiServerAdapter({"a": a, "b": b})
+
+    multi.kill_session("web")
+    multi.create_session("docs", "/")
+
+    assert set(b.sessions) == set()
+    # Nobody has it: new sessions go to the first server.
+    assert "docs" in a.sessions
+    assert multi.session_exists("docs") and not multi.session_exists("b:docs")
+
+    b.sessions["docs"] = "/"
+    with pytest.raises(ServerRoutingError, match=r"several tmux servers \(a, b\)"):
+        multi.kill_session("docs")
+
+
+def test_a_failure_skips_that_server_only_and_the_client_switch():
+    a, b = FakeServer("api"), FakeServer("web")
+    multi = MultiServerAdapter({"a": a, "b": b}, current="a")
+
+    batch = multi.batch()
+    batch.select_layout("=a:missing", "tiled")
+    batch.select_layout("=a:api", "tiled")
+    batch.kill_session("b:web")
+    batch.switch_client("a:api")
+    results = batch.run()
+
+    assert [r.ok for r in results] == [False, False, True, False]
+    assert results[1].error == SKIPPED and results[3].error == SKIPPED
+    assert b.sessions == {}
+    assert a.calls == []
+
+
+def test_goto_switches_or_hands_the_client_to_another_server(monkeypatch):
+    a, b = FakeServer("api", socket="a"), FakeServer(socket="b")
+    manager = Manager(
+        adapter=MultiServerAdapter({"a": a, "b": b}, current="a"),
+        projects=FakeProjects([Project("web", "/src/web")]),  # type: ignore[arg-type]
+        frecency=FrecencyStore(),
+    )
+    monkeypatch.setattr(manager, "_inside_tmux", lambda: True)
+
+    manager.goto_session("a:api")
+    manager.goto_session("b:web")
+
+    assert a.calls == [
+        ("switch_client", "api"),
+        ("detach_client", "tmux -L b attach-session -t =web"),
+    ]
+    # A qualified name still finds its project.
+    assert b.sessions == {"web": "/src/web"}
+
+
+def test_manager_on_servers_shares_state_and_skips_the_cache():
+    manager = Manager(adapter=FakeServer(), frecency=FrecencyStore())
+
+    multi = manager.on_servers(["work", "/tmp/sockets/play"])
+
+    assert multi.cache is None
+    assert multi.frecency is manager.frecency and multi.projects is manager.projects
+    assert multi.servers == ["work", "/tmp/sockets/play"]
@@ -0,0 +1,110 @@
+# tests/test_profile_unit.py
+
+import json
+import subprocess
+
+import pytest
+
+from ytpm.adapters import events
+from ytpm.adapters.tmux import TmuxAdapter
+from ytpm.cli.main import run
+from ytpm.core import profile
+from ytpm.core.frecency import FrecencyStore
+from ytpm.core.manager import Manager
+from ytpm.core.profile import Stats, command_name
+from ytpm.core.projects import ProjectIndex
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    """A Manager on a real TmuxAdapter whose tmux answers instantly."""
+
+    def fake_run(cmd, **kwargs):
+        # Print every display-message marker, so batches see success.
+        markers = [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-p"]
+        return subprocess.CompletedProcess(cmd, 0, "".join(m + "\n" for m in markers), "")
+
+    monkeypatch.setattr("ytpm.adapters.tmux.subprocess.run", fake_run)
+    monkeypatch.setattr("ytpm.adapters.tmux.shutil.which", lambda binary: binary)
+    monkeypatch.setattr(TmuxAdapter, "server_running", lambda self: True)
+    # goto switches the client; outside tmux it would attach this terminal.
+    monkeypatch.setenv("TMUX", "/tmp/fake,1,0")
+    return Manager(
+        adapter=TmuxAdapter(),
+        projects=ProjectIndex(tmp_path / "projects.json", tmp_path / "state.json"),
+        frecency=FrecencyStore(tmp_path / "frecency.json"),
+    )
+
+
+@pytest.fixture(autouse=True)
+def stop_profiling():
+    yield
+    profile.stop()
+
+
+def test_command_names_skip_global_flags_and_batch_markers():
+    assert command_name(["tmux", "-L", "x", "list-sessions", "-F", "#{a}"]) == "list-sessions"
+    assert (
+        command_name(
+            ["tmux", "if-shell", "-F", "c", "", "new-session", ";", "display-message", "-p", "m0",
+             ";", "switch-client", "-t", "=a", ";", "display-message", "-p", "m1"]
+        )
+        == "if-shell+switch-client"
+    )
+    assert command_name(["tmux", "set-hook", "a", ";", "set-hook", "b"]) == "set-hook"
+
+
+def test_stats_histogram_and_quantiles():
+    stats = Stats()
+    for ms in [0.5, 3, 3, 4, 250]:
+        stats.add(ms / 1000)
+
+    assert stats.buckets[0] == 1 and stats.buckets[2] == 3
+    assert stats.quantile(0.5) == 5.0
+    assert stats.quantile(0.99) == 500.0
+    assert stats.to_dict()["histogram"] == {"<=1ms": 1, "<=5ms": 3, "<=500ms": 1}
+
+
+def test_commands_are_recorded_inside_manager_spans(manager):
+    profiler = profile.start()
+    manager.goto_session("api", "/tmp")
+    manager.kill_session("api")
+    profile.stop()
+
+    report = profiler.to_dict()
+    assert set(report["spans"]) == {"Manager.goto_session", "Manager.kill_session"}
+    assert report["commands"]["if-shell+switch-client"]["count"] == 1
+    assert [e["span"] for e in report["events"]] == ["Manager.goto_session", "Manager.kill_session"]
+    assert all(e["transport"] == "subprocess" for e in report["events"])
+
+
+def test_bytes_read_are_bytes_not_characters():
+    seen = []
+    events.observer = seen.append
+    try:
+        events.emit(["tmux", "ls"], 0, 0.001, "café\n", "ü", "subprocess")
+    finally:
+        events.observer = None
+    assert seen[0].bytes_read == 8
+
+
+def test_nothing_is_recorded_when_off(manager):
+    profiler = profile.start()
+    profile.stop()
+    manager.goto_session("api", "/tmp")
+
+    assert events.observer is None
+    assert profiler.commands == {} and profiler.spans == {}
+
+
+def test_profile_flag_and_env_var(manager, tmp_path, capsys, monkeypatch):
+    assert run(["--profile", "ls"], manager) == 0
+    report = json.loads(capsys.readouterr().err)
+    assert "Manager.list_sessions" in report["spans"]
+    assert "list-sessions" in report["commands"]
+
+    path = tmp_path / "profile.json"
+    monkeypatch.setenv("YTPM_PROFILE", str(path))
+    assert run(["kill", "web"], manager) == 0
+    assert "Manager.kill_session" in json.loads(path.read_text())["spans"]
+    assert events.observer is None
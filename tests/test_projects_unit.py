@@ -0,0 +1,110 @@
+# tests/test_projects_unit.py
+
+import os
+
+import pytest
+
+from ytpm.core.config import ConfigError, ScanConfig, load_config
+from ytpm.core.projects import ProjectIndex
+
+
+def make_tree(root, dirs):
+    for d in dirs:
+        (root / d).mkdir(parents=True, exist_ok=True)
+
+
+@pytest.fixture
+def index(tmp_path):
+    return ProjectIndex(tmp_path / "projects.json", tmp_path / "scan-state.json")
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "src"
+    make_tree(
+        root,
+        [
+            "web/.git",
+            "web/packages/ui/.git",  # nested project, not descended into
+            "work/api/.git",
+            "work/api2",
+            "work/node_modules/junk/.git",  # ignored
+            "work/.hidden/secret/.git",  # hidden
+            "deep/a/b/c/d/.git",  # too deep
+        ],
+    )
+    (root / "work" / "api2" / "pyproject.toml").write_text("")
+    return root
+
+
+def names(index):
+    return sorted(p.name for p in index.projects)
+
+
+def test_scan_finds_projects_with_rules(index, tree):
+    config = ScanConfig(roots=[str(tree)], max_depth=3)
+
+    stats = index.scan(config)
+
+    assert names(index) == ["api", "api2", "web"]
+    assert stats.projects == 3
+    assert stats.rescanned == stats.dirs
+
+
+def test_rescan_only_rereads_changed_directories(index, tree):
+    config = ScanConfig(roots=[str(tree)], max_depth=3)
+    index.scan(config)
+
+    # Nothing changed: every directory is only stat'ed.
+    assert index.scan(config).rescanned == 0
+
+    (tree / "work" / "cli").mkdir()
+    (tree / "work" / "cli" / "go.mod").write_text("")
+    stats = index.scan(config)
+
+    # "work" gained an entry and "work/cli" is new.
+    assert stats.rescanned == 2
+    assert "cli" in names(index)
+
+
+def test_results_persist_and_resolve_by_name(index, tree, tmp_path):
+    index.scan(ScanConfig(roots=[str(tree)], max_depth=3))
+
+    fresh = ProjectIndex(tmp_path / "projects.json", tmp_path / "scan-state.json")
+    project = fresh.find("api")
+
+    assert project is not None
+    assert project.path == os.path.join(str(tree.resolve()), "work", "api")
+    assert fresh.find("nope") is None
+
+
+def test_changed_config_forces_full_rescan(index, tree):
+    index.scan(ScanConfig(roots=[str(tree)], max_depth=3))
+
+    stats = index.scan(ScanConfig(roots=[str(tree)], max_depth=5))
+
+    assert stats.rescanned == stats.dirs
+    assert "d" in names(index)
+
+
+def test_load_config_reads_scan_section(tmp_path):
+    path = tmp_path / "config.toml"
+    path.write_text('[scan]\nroots = ["~/src"]\nmax_depth = 2\n')
+
+    config = load_config(path)
+
+    assert config.scan.roots == ["~/src"]
+    assert config.scan.max_depth == 2
+    assert ".git" in config.scan.markers
+
+
+def test_load_config_rejects_unknown_keys(tmp_path):
+    path = tmp_path / "config.toml"
+    path.write_text("[scan]\nroot = 1\n")
+
+    with pytest.raises(ConfigError):
+        load_config(path)
+
+
+def test_missing_config_is_defaults(tmp_path):
+    assert load_config(tmp_path / "missing.toml").scan.max_depth == ScanConfig().max_depth
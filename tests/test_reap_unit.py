@@ -0,0 +1,155 @@
+# tests/test_reap_unit.py
+
+import time
+from typing import Dict, List
+
+import pytest
+
+from ytpm.adapters.batch import SequentialBatch
+from ytpm.adapters.session import Session
+from ytpm.core.config import Config, ConfigError, ReapConfig, SessionConfig, load_config
+from ytpm.core.frecency import FrecencyStore
+from ytpm.core.manager import Manager
+from ytpm.core.reap import Reaped, select_sessions
+
+NOW = 1_000_000.0
+HOUR = 3600
+
+
+def session(name, idle_hours, attached=0, server=""):
+    return Session(name, attached=attached, activity=int(NOW - idle_hours * HOUR), server=server)
+
+
+class FakeAdapter:
+    """Sessions with activity times; counts batches."""
+
+    def __init__(self, sessions: List[Session]) -> None:
+        self.sessions: Dict[str, Session] = {s.name: s for s in sessions}
+        self.batch_calls = 0
+
+    def list_sessions(self) -> List[Session]:
+        return list(self.sessions.values())
+
+    def attached_clients(self) -> Dict[str, int]:
+        # Control-mode clients are counted in Session.attached only.
+        return {s.id: s.attached for s in self.sessions.values() if s.id != "$control"}
+
+    def kill_session(self, name: str) -> None:
+        self.sessions.pop(name, None)
+
+    def session_exists(self, name: str) -> bool:
+        return name in self.sessions
+
+    def batch(self) -> SequentialBatch:
+        self.batch_calls += 1
+        return SequentialBatch(self)
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("XDG_STATE_HOME", str(tmp_path / "state"))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+
+def test_idle_sessions_are_reaped_unless_protected_or_attached():
+    sessions = [
+        session("scratch-1", 30),
+        session("scratch-2", 1),
+        session("api", 50, attached=1),
+        session("notes", 100),
+        session("web", 9),
+    ]
+    policy = ReapConfig(idle="8h", protect=["notes"])
+
+    reaped = select_sessions(sessions, policy, NOW)
+
+    assert reaped == [Reaped("scratch-1", "idle for 1d6h"), Reaped("web", "idle for 9h")]
+    attached = select_sessions(sessions, ReapConfig(idle="8h", attached=True), NOW)
+    assert [r.name for r in attached] == ["notes", "api", "scratch-1", "web"]
+    only = select_sessions(sessions, ReapConfig(idle="8h", patterns=["scratch-*"]), NOW)
+    assert [r.name for r in only] == ["scratch-1"]
+    # Workspace sessions of the config are passed in as protected.
+    assert [r.name for r in select_sessions(sessions, policy, NOW, protected=["web"])] == [
+        "scratch-1"
+    ]
+
+
+def test_sessions_beyond_the_maximum_go_least_recently_active_first():
+    sessions = [session(f"s{i}", i) for i in range(6)] + [session("main", 99)]
+    policy = ReapConfig(max_sessions=3, protect=["main"])
+
+    reaped = select_sessions(sessions, policy, NOW)
+
+    # Seven sessions, three kept; "main" counts but can't go.
+    assert [r.name for r in reaped] == ["s5", "s4", "s3", "s2"]
+    assert reaped[0].reason == "least recently active (idle for 5h) of 7 sessions, max 3"
+
+    # Idle ones count towards the maximum.
+    both = select_sessions(sessions, ReapConfig(idle="4h", max_sessions=3), NOW)
+    assert [r.name for r in both] == ["main", "s5", "s4", "s3"]
+    assert [r.reason.split()[0] for r in both] == ["idle", "idle", "idle", "least"]
+
+    # Not enough reapable sessions to get down to the maximum.
+    few = select_sessions(sessions, ReapConfig(max_sessions=3, patterns=["s5"]), NOW)
+    assert [r.name for r in few] == ["s5"]
+
+
+def test_sessions_of_several_servers_match_by_either_name():
+    sessions = [session("a:web", 9, server="a"), session("b:web", 9, server="b")]
+
+    assert select_sessions(sessions, ReapConfig(idle="1h", protect=["web"]), NOW) == []
+    reaped = select_sessions(sessions, ReapConfig(idle="1h", protect=["a:*"]), NOW)
+    assert [r.name for r in reaped] == ["b:web"]
+
+
+def test_manager_kills_the_selection_in_one_batch():
+    now = time.time()
+    adapter = FakeAdapter(
+        [
+            Session("old", activity=int(now - 10 * HOUR)),
+            Session("older", activity=int(now - 20 * HOUR)),
+            Session("api", activity=int(now - 30 * HOUR)),
+            Session("new", activity=int(now)),
+        ]
+    )
+    config = Config(sessions=[SessionConfig(name="api")], reap=ReapConfig(idle="2h"))
+    manager = Manager(adapter=adapter, config=config, frecency=FrecencyStore())
+
+    planned = manager.reap_sessions(dry_run=True)
+    assert [r.name for r in planned] == ["older", "old"]
+    assert set(adapter.sessions) == {"old", "older", "api", "new"}
+
+    reaped = manager.reap_sessions()
+    assert [(r.name, r.ok) for r in reaped] == [("older", True), ("old", True)]
+    assert set(adapter.sessions) == {"api", "new"}
+    assert adapter.batch_calls == 1
+
+    # "api" is in [[sessions]]: the busier "new" goes instead.
+    assert [r.name for r in manager.reap_sessions(ReapConfig(max_sessions=1))] == ["new"]
+
+
+def test_manager_reaps_sessions_only_control_clients_are_on():
+    now = time.time()
+    adapter = FakeAdapter(
+        [
+            Session("watched", "$control", attached=1, activity=int(now - 10 * HOUR)),
+            Session("used", "$1", attached=1, activity=int(now - 10 * HOUR)),
+        ]
+    )
+    manager = Manager(adapter=adapter, config=Config(reap=ReapConfig(idle="2h")), frecency=FrecencyStore())
+
+    assert [r.name for r in manager.reap_sessions()] == ["watched"]
+    assert set(adapter.sessions) == {"used"}
+
+
+def test_reap_config_is_read_and_checked(tmp_path):
+    path = tmp_path / "config.toml"
+    path.write_text('[reap]\nidle = "1d12h"\nmax_sessions = 20\nprotect = ["main"]\n')
+    reap = load_config(path).reap
+    assert reap.idle_seconds() == 36 * HOUR
+    assert (reap.max_sessions, reap.protect, reap.attached) == (20, ["main"], False)
+
+    for text in ['[reap]\nidle = "2 hours"\n', "[reap]\nmax_sessions = -1\n", "[reap]\nidel = 1\n"]:
+        path.write_text(text)
+        with pytest.raises(ConfigError):
+            load_config(path)
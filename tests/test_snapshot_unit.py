@@ -0,0 +1,93 @@
+# tests/test_snapshot_unit.py
+
+import gzip
+
+import pytest
+
+from ytpm.adapters.session import Pane
+from ytpm.core.snapshot import (
+    SavedPane,
+    SavedSession,
+    SavedWindow,
+    SnapshotError,
+    from_panes,
+    plan_restore,
+    read_snapshot,
+    write_snapshot,
+)
+
+LAYOUT = "21be,200x50,0,0{100x50,0,0,0,99x50,101,0,1}"
+
+API = SavedSession(
+    "api",
+    [
+        SavedWindow("editor", "", False, [SavedPane("/src/api")]),
+        SavedWindow(
+            "server",
+            LAYOUT,
+            True,
+            [SavedPane("/src/api/app", active=True), SavedPane("/src/api/logs")],
+        ),
+    ],
+)
+
+
+def test_live_panes_are_grouped_in_index_order():
+    panes = [
+        Pane("api", "@2", 1, "server", "%3", 1, "/src/api/logs", layout=LAYOUT),
+        Pane("api", "@1", 0, "editor", "%1", 0, "/src/api", layout="x"),
+        Pane("api", "@2", 1, "server", "%2", 0, "/src/api/app", "", LAYOUT, True, True),
+    ]
+
+    saved = from_panes(panes)
+
+    assert saved == [API._replace(windows=[API.windows[0]._replace(layout="x"), API.windows[1]])]
+
+
+def test_snapshot_round_trips_through_the_file(tmp_path):
+    path = tmp_path / "snap.jsonl.gz"
+    sessions = [API, SavedSession("notes", [SavedWindow("w", "", True, [SavedPane("/n", True, "hi\n")])])]
+
+    assert write_snapshot(path, sessions) == 2
+    assert read_snapshot(path) == sessions
+    # One header line, then a line per session.
+    assert len(gzip.open(path, "rt").read().splitlines()) == 3
+
+
+@pytest.mark.parametrize("content", [b"", b"not gzip", gzip.compress(b'{"version": 99}\n')])
+def test_unreadable_snapshots_raise(tmp_path, content):
+    path = tmp_path / "snap.jsonl.gz"
+    path.write_bytes(content)
+
+    with pytest.raises(SnapshotError):
+        read_snapshot(path)
+    with pytest.raises(SnapshotError, match="no such snapshot"):
+        read_snapshot(tmp_path / "missing")
+
+
+def test_restore_rebuilds_missing_sessions_only():
+    result = plan_restore([API, SavedSession("web", [])], existing=["notes"])
+
+    assert result.changes == [("create", "session", "api", "2 windows, 3 panes")]
+    assert result.ops == [
+        ("create_session", ("api", "/src/api", False, "editor")),
+        ("new_window", ("api", "server", "/src/api/app")),
+        ("split_window", ("=api:{end}", "/src/api/logs")),
+        ("select_layout", ("=api:{end}", LAYOUT)),
+        ("select_pane", ("=api:{end}.-1",)),
+        ("select_window", ("=api:+1",)),
+    ]
+    assert not plan_restore([API], existing=["api"])
+
+
+def test_scrollback_is_shown_before_the_shell(tmp_path):
+    session = SavedSession("notes", [SavedWindow("w", "", True, [SavedPane("/n", True, "hi\n")])])
+
+    assert len(plan_restore([session], [], None).ops) == 1
+    ops = plan_restore([session], [], tmp_path).ops
+
+    op, (target, cwd, command) = ops[1]
+    assert (op, target, cwd) == ("respawn_pane", "=notes:{end}", "/n")
+    [saved] = list(tmp_path.iterdir())
+    assert saved.read_text() == "hi\n"
+    assert command.startswith(f"cat -- '{saved}'; rm -f -- '{saved}';")
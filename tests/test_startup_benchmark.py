@@ -0,0 +1,142 @@
+# tests/test_startup_benchmark.py
+#
+# Start-up budget for the CLI. `ytpm goto` is bound to tmux keys, so the time
+# from key press to switch is mostly interpreter start plus our imports.
+# tmux is replaced by a shell script that answers instantly, so only ytpm's
+# own overhead is measured.
+#
+# Which modules start-up loads is always checked; the timings are printed,
+# and only held to their budgets with YTPM_BENCH=1, as they depend on the
+# machine and its load.
+
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from ytpm.adapters.tmux import TmuxAdapter
+from ytpm.core.frecency import FrecencyStore
+from ytpm.daemon.server import Daemon, DaemonManager
+
+ROOT = Path(__file__).resolve().parent.parent
+
+BENCH = bool(os.environ.get("YTPM_BENCH"))
+
+# Budgets are multiples of a bare `python -c pass` on the same machine, so
+# they hold on slow and fast boxes alike.
+# A subcommand run in-process (~5.5x here).
+MAX_SLOWDOWN = 8.0
+# The same, answered by a running daemon (~3x here).
+MAX_DAEMON_SLOWDOWN = 4.5
+# Time spent executing ytpm's own modules, stdlib imports not counted
+# (~1.4x here).
+MAX_IMPORT_RATIO = 2.5
+
+# Modules the non-TUI commands must never load.
+HEAVY = ("textual", "rich", "asyncio", "concurrent.futures", "tomllib")
+
+# Prints each `display-message -p` marker, so batches see every op succeed.
+FAKE_TMUX = """#!/bin/sh
+while [ $# -gt 0 ]; do
+    if [ "$1" = "-p" ]; then shift; echo "$1"; fi
+    shift
+done
+"""
+
+
+@pytest.fixture
+def env(tmp_path):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    tmux = bin_dir / "tmux"
+    tmux.write_text(FAKE_TMUX)
+    tmux.chmod(0o755)
+    env = dict(os.environ)
+    env.update(
+        PATH=f"{bin_dir}{os.pathsep}{env.get('PATH', '')}",
+        PYTHONPATH=str(ROOT),
+        TMUX="/tmp/fake,1,0",
+        XDG_STATE_HOME=str(tmp_path / "state"),
+        XDG_CACHE_HOME=str(tmp_path / "cache"),
+        XDG_CONFIG_HOME=str(tmp_path / "config"),
+        # No daemon here unless a test starts one.
+        YTPM_SOCKET=str(tmp_path / "daemon.sock"),
+    )
+    return env
+
+
+def wall_ms(args, env, runs: int = 7) -> float:
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, *args], env=env, cwd=ROOT, check=True, capture_output=True)
+        times.append((time.perf_counter() - started) * 1000)
+    # Best of a few runs, to keep scheduler noise out of the number.
+    return min(times)
+
+
+def test_cli_import_skips_heavy_modules(env):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import ytpm.cli.main, ytpm.core.manager"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Lines look like "import time:  self [us] |  cumulative | module".
+    self_us = {}
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            self_us[parts[2].strip()] = int(parts[0].rsplit(":", 1)[-1])
+
+    loaded = [m for m in self_us if m in HEAVY or m.split(".")[0] in HEAVY]
+    assert not loaded, f"CLI start-up imports {loaded}"
+
+    ours = sum(us for m, us in self_us.items() if m.split(".")[0] == "ytpm") / 1000
+    baseline = wall_ms(["-c", "pass"], env)
+    print(f"ytpm imports: {ours:.1f}ms (python alone {baseline:.1f}ms)")
+    if BENCH:
+        assert ours < MAX_IMPORT_RATIO * baseline
+
+
+@pytest.mark.parametrize(
+    "command",
+    [["ls"], ["ls", "--long"], ["new", "bench"], ["goto", "bench"], ["kill", "bench"]],
+    ids=lambda c: " ".join(c),
+)
+def test_subcommand_wall_time(env, command):
+    baseline = wall_ms(["-c", "pass"], env)
+    took = wall_ms(["-m", "ytpm.cli.main", *command], env)
+    print(f"ytpm {' '.join(command)}: {took:.1f}ms (python alone {baseline:.1f}ms)")
+    if BENCH:
+        assert took < MAX_SLOWDOWN * baseline
+
+
+def test_daemon_client_wall_time(env, tmp_path, monkeypatch):
+    # The daemon runs in this process, seeing the same fake tmux and server.
+    for key in ("PATH", "TMUX", "XDG_STATE_HOME"):
+        monkeypatch.setenv(key, env[key])
+    manager = DaemonManager(adapter=TmuxAdapter(), frecency=FrecencyStore())
+    daemon = Daemon(manager, path=env["YTPM_SOCKET"], live_updates=False)
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(daemon.start(), loop).result()
+    try:
+        baseline = wall_ms(["-c", "pass"], env)
+        took = wall_ms(["-m", "ytpm.cli.main", "ls"], env)
+    finally:
+        asyncio.run_coroutine_threadsafe(daemon.stop(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+    print(f"ytpm ls via daemon: {took:.1f}ms (python alone {baseline:.1f}ms)")
+    if BENCH:
+        assert took < MAX_DAEMON_SLOWDOWN * baseline
@@ -0,0 +1,45 @@
+# tests/test_storage_unit.py
+
+import os
+import stat
+
+import pytest
+
+from ytpm.core import storage
+from ytpm.core.storage import atomic_write, read_json, write_json
+
+
+def test_data_is_synced_before_the_rename(tmp_path, monkeypatch):
+    path = tmp_path / "state" / "data.json"
+    calls = []
+    real_fsync, real_replace = os.fsync, os.replace
+
+    def fsync(fd):
+        st = os.fstat(fd)
+        calls.append(("fsync", "dir" if stat.S_ISDIR(st.st_mode) else st.st_size))
+        real_fsync(fd)
+
+    def replace(src, dst):
+        calls.append(("replace", dst))
+        real_replace(src, dst)
+
+    monkeypatch.setattr(storage.os, "fsync", fsync)
+    monkeypatch.setattr(storage.os, "replace", replace)
+    write_json(path, {"a": 1})
+
+    assert calls == [("fsync", len(b'{"a":1}')), ("replace", path), ("fsync", "dir")]
+    assert read_json(path) == {"a": 1}
+
+
+def test_failed_writes_leave_the_old_file(tmp_path, monkeypatch):
+    path = tmp_path / "data"
+    atomic_write(path, b"old")
+
+    def fail(fd):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(storage.os, "fsync", fail)
+    with pytest.raises(OSError):
+        atomic_write(path, b"new")
+    assert path.read_bytes() == b"old"
+    assert os.listdir(tmp_path) == ["data"]
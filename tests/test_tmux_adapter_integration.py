@@ -1,14 +1,19 @@
 # tests/test_tmux_adapter_integration.py
 
 import os
+import re
 import shutil
+import time
 import uuid
 
 import pytest
 
+from ytpm.adapters.control import TmuxControlAdapter
 from ytpm.adapters.tmux import TmuxAdapter, TmuxNotFoundError
 
 
+# A pane in a layout string: "WxH,X,Y,ID".
+LAYOUT_IDS = r"(\d+x\d+,\d+,\d+),\d+"
 
 
 def tmux_available() -> bool:
@@ -34,12 +39,14 @@ def test_create_and_list_session(adapter, unique_session_name, tmp_path):
     cwd = tmp_path.as_posix()
     adapter.create_session(unique_session_name, cwd)
 
-    sessions = adapter.list_sessions()
+    sessions = {s.name: s for s in adapter.list_sessions()}
     assert unique_session_name in sessions
+    assert sessions[unique_session_name].windows == 1
+    assert sessions[unique_session_name].path == cwd
 
     # cleanup
     adapter.kill_session(unique_session_name)
-    assert unique_session_name not in adapter.list_sessions()
+    assert unique_session_name not in [s.name for s in adapter.list_sessions()]
 
 
 def test_session_exists_roundtrip(adapter, unique_session_name, tmp_path):
@@ -51,3 +58,305 @@ def test_session_exists_roundtrip(adapter, unique_session_name, tmp_path):
 
     adapter.kill_session(unique_session_name)
     assert adapter.session_exists(unique_session_name) is False
+
+
+def test_batch_create_is_idempotent(adapter, unique_session_name, tmp_path):
+    cwd = tmp_path.as_posix()
+    batch = adapter.batch()
+    batch.create_session(unique_session_name, cwd, exist_ok=True)
+    batch.create_session(unique_session_name, cwd, exist_ok=True)
+    results = batch.run(check=True)
+
+    assert [r.ok for r in results] == [True, True]
+    assert adapter.session_exists(unique_session_name) is True
+
+    batch = adapter.batch()
+    batch.kill_session(unique_session_name, missing_ok=True)
+    batch.kill_session(unique_session_name, missing_ok=True)
+    batch.run(check=True)
+    assert adapter.session_exists(unique_session_name) is False
+
+
+def test_manager_bulk_create_and_kill(adapter, unique_session_name, tmp_path):
+    from ytpm.core.manager import Manager
+
+    manager = Manager(adapter=adapter)
+    names = [f"{unique_session_name}-{i}" for i in range(20)]
+    try:
+        results = manager.create_sessions([(name, tmp_path.as_posix()) for name in names])
+        assert all(r.ok for r in results)
+        assert sorted(manager.match_sessions([f"{unique_session_name}-*"])) == sorted(names)
+    finally:
+        results = manager.kill_sessions(names)
+    assert all(r.ok for r in results)
+    assert manager.match_sessions([f"{unique_session_name}-*"]) == []
+
+
+def test_apply_workspace_builds_layout_once(adapter, unique_session_name, tmp_path):
+    from ytpm.core.config import SessionConfig, WindowConfig
+    from ytpm.core.manager import Manager
+
+    (tmp_path / "sub").mkdir()
+    session = SessionConfig(
+        name=unique_session_name,
+        root=tmp_path.as_posix(),
+        windows=[
+            WindowConfig(name="edit", panes=["", ""], layout="even-horizontal"),
+            WindowConfig(name="sub.dir", path="sub"),
+        ],
+    )
+    manager = Manager(adapter=adapter)
+    try:
+        assert manager.apply_workspace([session]).changes
+        panes = [p for p in adapter.list_panes() if p.session == unique_session_name]
+        assert [(p.window_name, p.index) for p in panes] == [("edit", 0), ("edit", 1), ("sub.dir", 0)]
+        assert panes[-1].path == (tmp_path / "sub").as_posix()
+        assert panes[0].workspace == "1"
+        assert all(p.pid > 0 for p in panes)
+
+        assert not manager.apply_workspace([session])
+    finally:
+        adapter.kill_session(unique_session_name)
+
+
+@pytest.fixture
+def control_adapter():
+    if not tmux_available():
+        pytest.skip("tmux not available, skipping integration tests")
+    adapter = TmuxControlAdapter()
+    yield adapter
+    adapter.close()
+
+
+def test_control_adapter_roundtrip(control_adapter, unique_session_name, tmp_path):
+    cwd = tmp_path.as_posix()
+    control_adapter.create_session(unique_session_name, cwd)
+    assert control_adapter.session_exists(unique_session_name) is True
+    assert unique_session_name in [s.name for s in control_adapter.list_sessions()]
+
+    control_adapter.kill_session(unique_session_name)
+    assert control_adapter.session_exists(unique_session_name) is False
+
+
+def test_control_adapter_batch(control_adapter, unique_session_name, tmp_path):
+    cwd = tmp_path.as_posix()
+    batch = control_adapter.batch()
+    batch.create_session(unique_session_name, cwd, exist_ok=True)
+    batch.create_session(unique_session_name, cwd, exist_ok=True)
+    assert [r.ok for r in batch.run()] == [True, True]
+
+    batch = control_adapter.batch()
+    batch.kill_session(unique_session_name, missing_ok=True)
+    batch.run(check=True)
+    assert control_adapter.session_exists(unique_session_name) is False
+
+
+def test_socket_path_selects_a_private_server(adapter, unique_session_name, tmp_path):
+    private = TmuxAdapter(socket_path=str(tmp_path / "tmux.sock"))
+    try:
+        private.create_session(unique_session_name, tmp_path.as_posix())
+        assert private.session_exists(unique_session_name) is True
+        assert adapter.session_exists(unique_session_name) is False
+    finally:
+        private._run("kill-server")
+
+
+def test_snapshot_restores_windows_panes_and_layout(adapter, tmp_path):
+    from ytpm.core.frecency import FrecencyStore
+    from ytpm.core.manager import Manager
+    from ytpm.core.projects import ProjectIndex
+
+    private = TmuxAdapter(socket_path=str(tmp_path / "tmux.sock"))
+    manager = Manager(
+        adapter=private,
+        projects=ProjectIndex(tmp_path / "projects.json", tmp_path / "state.json"),
+        frecency=FrecencyStore(tmp_path / "frecency.json"),
+    )
+    cwd = tmp_path.as_posix()
+    try:
+        private.create_session("snap", cwd, window="main")
+        private.new_window("snap", "side", "/")
+        private.split_window("=snap:side", cwd)
+        private.select_layout("=snap:side", "even-horizontal")
+
+        def state():
+            # Pane IDs differ after a restore, and so do layout checksums.
+            return [
+                (p.window_name, p.index, p.path, re.sub(LAYOUT_IDS, r"\1", p.layout[5:]), p.active)
+                for p in private.list_panes()
+            ]
+
+        before = state()
+        manager.save_snapshot(tmp_path / "snap.jsonl.gz", scrollback=True)
+        private.kill_session("snap")
+        plan = manager.restore_snapshot(tmp_path / "snap.jsonl.gz")
+
+        assert [c.target for c in plan.changes] == ["snap"]
+        assert state() == before
+        assert not manager.restore_snapshot(tmp_path / "snap.jsonl.gz")
+    finally:
+        private._run("kill-server")
+
+
+def test_manager_works_across_private_servers(adapter, unique_session_name, tmp_path):
+    from ytpm.adapters.multi import MultiServerAdapter
+    from ytpm.core.frecency import FrecencyStore
+    from ytpm.core.manager import Manager
+    from ytpm.core.projects import ProjectIndex
+
+    sockets = [str(tmp_path / "one"), str(tmp_path / "two")]
+    manager = Manager(
+        projects=ProjectIndex(tmp_path / "projects.json", tmp_path / "state.json"),
+        frecency=FrecencyStore(tmp_path / "frecency.json"),
+        servers=sockets,
+    )
+    servers = [TmuxAdapter(socket_path=s) for s in sockets]
+    try:
+        manager.create_session(f"one:{unique_session_name}", tmp_path.as_posix())
+        manager.create_session(f"two:{unique_session_name}", tmp_path.as_posix())
+        manager.create_session("two:other", tmp_path.as_posix())
+        assert isinstance(manager.adapter, MultiServerAdapter)
+
+        listed = [(s.server, s.name) for s in manager.list_sessions()]
+        assert sorted(listed) == [
+            ("one", f"one:{unique_session_name}"),
+            ("two", "two:other"),
+            ("two", f"two:{unique_session_name}"),
+        ]
+
+        manager.kill_session(f"two:{unique_session_name}")
+        manager.kill_session("other")
+        assert servers[0].session_exists(unique_session_name) is True
+        assert servers[1].list_sessions() == []
+        assert adapter.session_exists(unique_session_name) is False
+    finally:
+        for server in servers:
+            try:
+                server._run("kill-server")
+            except Exception:
+                pass
+
+
+def test_control_clients_dont_keep_a_session_from_being_reaped(adapter, tmp_path):
+    import subprocess
+    import time
+
+    from ytpm.core.config import Config, ReapConfig
+    from ytpm.core.frecency import FrecencyStore
+    from ytpm.core.manager import Manager
+
+    socket = str(tmp_path / "tmux.sock")
+    private = TmuxAdapter(socket_path=socket)
+    private.create_session("watched", tmp_path.as_posix())
+    # What the daemon's and the TUI's subscribers look like to tmux.
+    control = subprocess.Popen(
+        ["tmux", "-S", socket, "-C", "attach-session", "-t", "=watched"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 5
+        while not private.list_sessions()[0].attached and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert private.list_sessions()[0].attached == 1
+        assert private.attached_clients() == {}
+
+        manager = Manager(
+            adapter=private,
+            config=Config(reap=ReapConfig(idle="0s")),
+            frecency=FrecencyStore(tmp_path / "frecency.json"),
+        )
+        assert [r.name for r in manager.reap_sessions(dry_run=True)] == ["watched"]
+    finally:
+        control.kill()
+        control.wait()
+        private._run("kill-server")
+
+
+def test_goto_outside_tmux_hands_the_terminal_to_tmux(adapter, tmp_path):
+    import subprocess
+    import sys
+    import threading
+    import time
+
+    socket = str(tmp_path / "tmux.sock")
+    private = TmuxAdapter(socket_path=socket)
+    env = {k: v for k, v in os.environ.items() if k not in ("TMUX", "TMUX_PANE")}
+    env.update(
+        TERM="xterm",
+        YTPM_NO_DAEMON="1",
+        XDG_CONFIG_HOME=str(tmp_path / "config"),
+        XDG_STATE_HOME=str(tmp_path / "state"),
+        XDG_CACHE_HOME=str(tmp_path / "cache"),
+    )
+    master, slave = os.openpty()
+    goto = subprocess.Popen(
+        [sys.executable, "-m", "ytpm.cli.main", "-L", socket, "goto", "demo"],
+        stdin=slave,
+        stdout=slave,
+        stderr=slave,
+        env=env,
+        cwd=os.getcwd(),
+        start_new_session=True,
+    )
+    os.close(slave)
+    screen = []
+
+    def drain() -> None:
+        # tmux stalls if nobody reads what it draws.
+        try:
+            while True:
+                chunk = os.read(master, 65536)
+                if not chunk:
+                    break
+                screen.append(chunk)
+        except OSError:
+            pass
+
+    reader = threading.Thread(target=drain, daemon=True)
+    reader.start()
+    try:
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            if private.server_running() and private.attached_clients():
+                break
+            time.sleep(0.05)
+        assert list(private.attached_clients().values()) == [1]
+        # The pane shows the shell, not a batch marker in view-mode.
+        assert private._run("display-message", "-p", "-t", "=demo:", "#{pane_in_mode}") == "0"
+        assert "ytpm-batch" not in private._run("capture-pane", "-p", "-t", "=demo:")
+
+        private._run("detach-client", "-s", "=demo")
+        assert goto.wait(timeout=10) == 0
+        reader.join(timeout=5)
+        assert b"Error" not in b"".join(screen)
+    finally:
+        if goto.poll() is None:
+            goto.kill()
+            goto.wait()
+        os.close(master)
+        if private.server_running():
+            private._run("kill-server")
+
+
+def test_cache_hook_survives_awkward_paths(adapter, unique_session_name, tmp_path):
+    from ytpm.core.manager import SessionCache
+
+    cache_dir = tmp_path / "My Cache" / "it's #1"
+    cache_dir.mkdir(parents=True)
+    socket = tmp_path / "tmux.sock"
+    private = TmuxAdapter(socket_path=str(socket))
+    cache = SessionCache(
+        cache_dir / "sessions.json", cache_dir / "sessions.gen", server=str(socket)
+    )
+    try:
+        private.create_session(unique_session_name, tmp_path.as_posix())
+        private.set_hooks(cache.EVENTS, cache.hook_command(), cache.HOOK_INDEX)
+        private.create_session(unique_session_name + "-2", tmp_path.as_posix())
+        # run-shell -b returns before the shell has run.
+        deadline = time.monotonic() + 5
+        while not cache.generation_path.exists() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert cache.generation_path.read_text().startswith(".")
+    finally:
+        private._run("kill-server")
@@ -1,10 +1,27 @@
 # tests/test_tmux_adapter_unit.py
 
+import stat
 import subprocess
+import time
+
 import pytest
 
-from ytpm.adapters.tmux import TmuxAdapter, TmuxCommandError, TmuxNotFoundError
+from ytpm.adapters.policy import CircuitBreaker, CommandPolicy
+from ytpm.adapters.session import Session
+from ytpm.adapters.tmux import (
+    NO_SERVER,
+    TmuxAdapter,
+    TmuxCommandError,
+    TmuxNotFoundError,
+    TmuxTimeoutError,
+    TmuxUnavailableError,
+)
+
 
+@pytest.fixture(autouse=True)
+def server_is_running(monkeypatch):
+    """Batches only start a server when none runs; pretend one always does."""
+    monkeypatch.setattr(TmuxAdapter, "server_running", lambda self: True)
 
 
 def test_tmux_not_found(monkeypatch):
@@ -19,21 +36,27 @@ def test_tmux_not_found(monkeypatch):
 
 
 def test_list_sessions_parses_output(monkeypatch):
-    def fake_run(cmd, capture_output, text):
+    def fake_run(cmd, capture_output, text, timeout=None):
         class Result:
             returncode = 0
-            stdout = "s1\ns2\n"
+            stdout = (
+                "s1\x1f$0\x1f1\x1f2\x1f1700000100\x1f1700000000\x1f/home/me\n"
+                "s2\x1f$1\x1f0\x1f1\x1f1700000200\x1f1700000050\x1f/tmp\n"
+            )
             stderr = ""
         return Result()
 
     monkeypatch.setattr(subprocess, "run", fake_run)
 
     adapter = TmuxAdapter()
-    assert adapter.list_sessions() == ["s1", "s2"]
+    assert adapter.list_sessions() == [
+        Session("s1", "$0", 1, 2, 1700000100, 1700000000, "/home/me"),
+        Session("s2", "$1", 0, 1, 1700000200, 1700000050, "/tmp"),
+    ]
 
 
 def test_session_exists_true(monkeypatch):
-    def fake_run(cmd, capture_output, text):
+    def fake_run(cmd, capture_output, text, timeout=None):
         class Result:
             returncode = 0
             stdout = ""
@@ -47,7 +70,7 @@ def test_session_exists_true(monkeypatch):
 
 
 def test_session_exists_false(monkeypatch):
-    def fake_run(cmd, capture_output, text):
+    def fake_run(cmd, capture_output, text, timeout=None):
         class Result:
             returncode = 1
             stdout = ""
@@ -58,3 +81,188 @@ def test_session_exists_false(monkeypatch):
 
     adapter = TmuxAdapter()
     assert adapter.session_exists("foo") is False
+
+
+def test_batch_runs_as_one_command_and_splits_results(monkeypatch):
+    calls = []
+
+    def fake_run(cmd, capture_output, text, timeout=None):
+        calls.append(cmd)
+        markers = [cmd[i + 2] for i, a in enumerate(cmd) if a == "display-message"]
+
+        class Result:
+            returncode = 1
+            stdout = f"{markers[0]}\n"
+            stderr = "no current client"
+        return Result()
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+
+    adapter = TmuxAdapter()
+    batch = adapter.batch()
+    batch.create_session("proj", "/tmp", exist_ok=True)
+    batch.switch_client("proj")
+    batch.kill_session("old", missing_ok=True)
+    results = batch.run()
+
+    assert len(calls) == 1
+    assert calls[0][1] == "if-shell"
+    assert [r.ok for r in results] == [True, False, False]
+    assert results[1].error == "no current client"
+    assert results[2].error.startswith("not run")
+
+    with pytest.raises(TmuxCommandError):
+        batch.switch_client("proj")
+        batch.run(check=True)
+
+
+def test_batch_creating_sessions_starts_a_missing_server(monkeypatch):
+    calls = []
+
+    def fake_run(cmd, capture_output, text, timeout=None):
+        calls.append(cmd)
+        markers = [cmd[i + 2] for i, a in enumerate(cmd) if a == "display-message"]
+        return subprocess.CompletedProcess(cmd, 0, "".join(f"{m}\n" for m in markers), "")
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    monkeypatch.setattr(TmuxAdapter, "server_running", lambda self: False)
+
+    adapter = TmuxAdapter()
+    adapter.kill_session("old")
+    batch = adapter.batch()
+    batch.create_session("proj", "/tmp", exist_ok=True)
+    batch.run()
+
+    # The if-shell guarding new-session needs a server; kill-session doesn't.
+    assert calls[0][1] == "kill-session"
+    assert calls[1][1:4] == ["start-server", ";", "if-shell"]
+
+
+def test_batch_too_long_for_one_command_is_split(monkeypatch):
+    calls = []
+
+    def fake_run(cmd, capture_output, text, timeout=None):
+        calls.append(cmd)
+        markers = [cmd[i + 2] for i, a in enumerate(cmd) if a == "display-message"]
+
+        class Result:
+            returncode = 0
+            stdout = "".join(f"{m}\n" for m in markers)
+            stderr = ""
+        return Result()
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+
+    adapter = TmuxAdapter()
+    batch = adapter.batch()
+    cwd = "/" + "x" * 1000
+    for i in range(40):
+        batch.create_session(f"s{i}", cwd, exist_ok=True)
+    results = batch.run()
+
+    assert len(calls) > 1
+    assert all(sum(len(a) + 1 for a in cmd) < 16_000 for cmd in calls)
+    assert len(results) == 40 and all(r.ok for r in results)
+
+
+def fake_tmux(tmp_path, script: str) -> str:
+    """Write an executable stand-in for tmux and return its path."""
+    path = tmp_path / "tmux"
+    path.write_text("#!/bin/sh\n" + script)
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+
+def test_command_past_its_deadline_is_killed(tmp_path):
+    binary = fake_tmux(tmp_path, "exec sleep 5")
+    adapter = TmuxAdapter(binary=binary, policy=CommandPolicy(timeout=0.2))
+
+    started = time.monotonic()
+    with pytest.raises(TmuxTimeoutError):
+        adapter.list_sessions()
+    assert time.monotonic() - started < 2
+
+
+def test_breaker_fails_fast_after_repeated_timeouts(tmp_path):
+    calls = tmp_path / "calls"
+    binary = fake_tmux(tmp_path, f"echo x >> {calls}; exec sleep 5")
+    policy = CommandPolicy(timeout=0.1, breaker_threshold=2, breaker_cooldown=60)
+    adapter = TmuxAdapter(binary=binary, policy=policy)
+
+    for _ in range(2):
+        with pytest.raises(TmuxTimeoutError):
+            adapter.session_exists("a")
+    with pytest.raises(TmuxUnavailableError):
+        adapter.session_exists("a")
+    assert len(calls.read_text().splitlines()) == 2
+
+
+def test_lost_server_is_retried_with_backoff(monkeypatch):
+    replies = ["server exited unexpectedly\n", ""]
+
+    def fake_run(cmd, capture_output, text, timeout=None):
+        class Result:
+            returncode = 1 if replies[0] else 0
+            stdout = "s1\x1f$0\x1f0\x1f1\x1f0\x1f0\x1f/tmp\n"
+            stderr = replies.pop(0)
+        return Result()
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+
+    adapter = TmuxAdapter(policy=CommandPolicy(backoff=0.01))
+    assert [s.name for s in adapter.list_sessions()] == ["s1"]
+    assert replies == []
+
+
+def test_failure_is_no_server_only_when_nothing_listens(tmp_path):
+    binary = fake_tmux(tmp_path, "echo 'error connecting' >&2; exit 1")
+    adapter = TmuxAdapter(binary=binary, socket_path=str(tmp_path / "gone"))
+
+    assert adapter.list_sessions() == []
+    with pytest.raises(TmuxCommandError) as excinfo:
+        adapter.create_session("a", "/tmp")
+    assert excinfo.value.kind == NO_SERVER
+
+
+def test_policy_deadlines():
+    policy = CommandPolicy(timeout=2.0, timeouts={"capture-pane": 0.5}, per_command=0.1)
+
+    assert policy.timeout_for(["capture-pane"]) == 0.5
+    assert policy.timeout_for(["rename-window"] * 3) == pytest.approx(2.2)
+    # new-session and kill-session get more per command than the rest.
+    assert policy.timeout_for(["new-session"] * 3) == pytest.approx(3.0)
+    assert policy.timeout_for(["kill-session"] * 3) == pytest.approx(3.0)
+    assert policy.timeout_for(["new-session", "attach"]) is None
+
+
+def test_guarded_ops_get_the_deadline_of_what_they_run(monkeypatch):
+    timeouts = []
+
+    def fake_run(cmd, capture_output, text, timeout=None):
+        timeouts.append(timeout)
+        markers = [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-p"]
+        return subprocess.CompletedProcess(cmd, 0, "".join(m + "\n" for m in markers), "")
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    adapter = TmuxAdapter(policy=CommandPolicy(timeout=2.0, per_command=0.1))
+
+    batch = adapter.batch()
+    for i in range(3):
+        batch.create_session(f"s{i}", "/tmp", exist_ok=True)
+    batch.run(check=True)
+    assert timeouts[0] == pytest.approx(3.0, abs=0.05)
+
+
+def test_breaker_lets_one_trial_through_after_cooldown():
+    now = [0.0]
+    breaker = CircuitBreaker(threshold=2, cooldown=10, clock=lambda: now[0])
+    breaker.failure()
+    assert breaker.remaining() == 0
+    breaker.failure()
+    assert breaker.remaining() == 10
+
+    now[0] = 11
+    assert breaker.remaining() == 0  # the trial
+    assert breaker.remaining() == 10  # everyone else keeps waiting
+    breaker.success()
+    assert not breaker.open and breaker.remaining() == 0
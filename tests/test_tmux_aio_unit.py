@@ -0,0 +1,103 @@
+# tests/test_tmux_aio_unit.py
+
+import asyncio
+import socket
+import stat
+import time
+
+import pytest
+
+from ytpm.adapters.aio import AsyncTmuxAdapter
+from ytpm.adapters.policy import CommandPolicy
+from ytpm.adapters.session import Session
+from ytpm.adapters.tmux import (
+    COMMAND_FAILED,
+    TmuxCommandError,
+    TmuxTimeoutError,
+    TmuxUnavailableError,
+)
+
+
+def fake_tmux(tmp_path, script: str) -> str:
+    """Write an executable stand-in for tmux and return its path."""
+    path = tmp_path / "tmux"
+    path.write_text("#!/bin/sh\n" + script)
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+
+def test_list_sessions_parses_output(tmp_path):
+    binary = fake_tmux(tmp_path, r"printf 's1\037$0\0371\0372\0371700000100\0371700000000\037/tmp\n'")
+
+    adapter = AsyncTmuxAdapter(binary=binary)
+    sessions = asyncio.run(adapter.list_sessions())
+
+    assert sessions == [Session("s1", "$0", 1, 2, 1700000100, 1700000000, "/tmp")]
+
+
+def test_list_sessions_no_server_is_empty(tmp_path):
+    binary = fake_tmux(tmp_path, "echo 'no server running on /tmp/x' >&2; exit 1")
+
+    adapter = AsyncTmuxAdapter(binary=binary, socket_path=str(tmp_path / "no-server"))
+    assert asyncio.run(adapter.list_sessions()) == []
+
+
+def test_session_exists_false_on_error(tmp_path):
+    binary = fake_tmux(tmp_path, "echo \"can't find session\" >&2; exit 1")
+
+    adapter = AsyncTmuxAdapter(binary=binary)
+    assert asyncio.run(adapter.session_exists("nope")) is False
+
+
+def test_timeout_kills_tmux_and_raises(tmp_path):
+    binary = fake_tmux(tmp_path, "exec sleep 5")
+
+    adapter = AsyncTmuxAdapter(binary=binary, timeout=0.2)
+    started = time.monotonic()
+    with pytest.raises(TmuxTimeoutError):
+        asyncio.run(adapter.list_sessions())
+    assert time.monotonic() - started < 2
+
+
+def test_error_with_a_live_server_is_not_no_server(tmp_path):
+    # The message alone doesn't decide: something answers on the socket.
+    binary = fake_tmux(tmp_path, "echo 'no server running on /tmp/x' >&2; exit 1")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(str(tmp_path / "sock"))
+    listener.listen()
+
+    adapter = AsyncTmuxAdapter(binary=binary, socket_path=str(tmp_path / "sock"))
+    with pytest.raises(TmuxCommandError) as excinfo:
+        asyncio.run(adapter.list_sessions())
+    assert excinfo.value.kind == COMMAND_FAILED
+    listener.close()
+
+
+def test_repeated_timeouts_open_the_breaker(tmp_path):
+    binary = fake_tmux(tmp_path, "exec sleep 5")
+    policy = CommandPolicy(timeout=0.1, breaker_threshold=2, breaker_cooldown=60)
+    adapter = AsyncTmuxAdapter(binary=binary, policy=policy)
+
+    async def scenario() -> None:
+        for _ in range(2):
+            with pytest.raises(TmuxTimeoutError):
+                await adapter.list_sessions()
+        started = time.monotonic()
+        with pytest.raises(TmuxUnavailableError):
+            await adapter.active_panes()
+        assert time.monotonic() - started < 0.1
+
+    asyncio.run(scenario())
+
+
+def test_lost_server_is_retried(tmp_path):
+    # Fails once as if the server died mid-command, then answers.
+    marker = tmp_path / "failed"
+    binary = fake_tmux(
+        tmp_path,
+        f"if [ ! -e {marker} ]; then touch {marker}; echo 'lost server' >&2; exit 1; fi\n"
+        r"printf 's1\037$0\0370\0371\0370\0370\037/tmp\n'",
+    )
+    adapter = AsyncTmuxAdapter(binary=binary, policy=CommandPolicy(backoff=0.01))
+
+    assert [s.name for s in asyncio.run(adapter.list_sessions())] == ["s1"]
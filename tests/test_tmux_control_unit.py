@@ -0,0 +1,140 @@
+# tests/test_tmux_control_unit.py
+
+import io
+import os
+
+import pytest
+
+from ytpm.adapters.control import ControlClient, ControlModeError, ControlModeTimeout, quote_arg
+
+
+class FakeProc:
+    """
+    Stands in for the `tmux -C` process: stdin is captured in memory and
+    stdout is a real pipe pre-loaded with tmux's replies.
+    """
+
+    def __init__(self, replies: str) -> None:
+        self.stdin = io.BytesIO()
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, replies.encode())
+        os.close(write_fd)
+        self.stdout = os.fdopen(read_fd, "rb")
+
+    def poll(self):
+        return None
+
+    def wait(self, timeout=None):
+        return 0
+
+
+def make_client(replies: str) -> ControlClient:
+    client = ControlClient()
+    proc = FakeProc(replies)
+    client._proc = proc  # pretend we are already connected
+    client._serial = 0
+    return client
+
+
+def sentinel(num: int) -> str:
+    return (
+        f"%begin 1 {num} 1\n"
+        f"ytpm-sync-{os.getpid()}-1\n"
+        f"%end 1 {num} 1\n"
+    )
+
+
+def test_quote_arg_keeps_separator_and_escapes_quotes():
+    assert quote_arg(";") == ";"
+    assert quote_arg("#S") == "'#S'"
+    assert quote_arg("it's") == "'it'\\''s'"
+
+
+def test_command_collects_output_and_skips_notifications():
+    replies = (
+        "%sessions-changed\n"
+        "%begin 1 10 1\n"
+        "s1\n"
+        "s2\n"
+        "%end 1 10 1\n"
+        "%window-add @3\n"
+        + sentinel(11)
+    )
+    client = make_client(replies)
+
+    assert client.command(["list-sessions", "-F", "#S"]) == (0, "s1\ns2", "")
+    assert client._proc.stdin.getvalue().startswith(b"'list-sessions' '-F' '#S'\n")
+
+
+def test_command_ignores_blocks_from_other_commands():
+    replies = (
+        "%begin 1 9 0\n"
+        "not ours\n"
+        "%end 1 9 0\n"
+        "%begin 1 10 1\n"
+        "%end 1 10 1\n"
+        + sentinel(11)
+    )
+    client = make_client(replies)
+
+    assert client.command(["has-session", "-t", "a"]) == (0, "", "")
+
+
+def test_command_reports_error_blocks():
+    replies = (
+        "%begin 1 10 1\n"
+        "can't find session: nope\n"
+        "%error 1 10 1\n"
+        + sentinel(11)
+    )
+    client = make_client(replies)
+
+    assert client.command(["has-session", "-t", "nope"]) == (
+        1,
+        "",
+        "can't find session: nope",
+    )
+
+
+def test_command_output_may_look_like_the_end_of_a_block():
+    replies = (
+        "%begin 1 10 1\n"
+        "%end 1 9 1\n"
+        "%error in a pane\n"
+        "%end 2 10 1\n"
+        "%end 1 10 1\n"
+        + sentinel(11)
+    )
+    client = make_client(replies)
+
+    assert client.command(["capture-pane", "-p"]) == (
+        0,
+        "%end 1 9 1\n%error in a pane\n%end 2 10 1",
+        "",
+    )
+
+
+def test_command_raises_if_detached_before_reply():
+    client = make_client("%exit\n")
+
+    with pytest.raises(ControlModeError):
+        client.command(["list-sessions"])
+
+
+def test_command_rejects_newlines():
+    client = make_client("")
+
+    with pytest.raises(ControlModeError):
+        client.command(["display-message", "-p", "a\nb"])
+
+
+def test_command_times_out_and_closes_the_client():
+    client = make_client("")
+    # A pipe that stays open but never delivers a reply: a wedged server.
+    read_fd, write_fd = os.pipe()
+    client._proc.stdout = os.fdopen(read_fd, "rb")
+
+    with pytest.raises(ControlModeTimeout):
+        client.command(["list-sessions"], timeout=0.1)
+    assert client._proc is None
+    os.close(write_fd)
@@ -0,0 +1,73 @@
+# tests/test_tmux_notify_unit.py
+
+import asyncio
+
+from ytpm.adapters.notify import ControlSubscriber
+
+
+def test_burst_of_events_triggers_one_change():
+    calls = []
+
+    async def scenario() -> None:
+        sub = ControlSubscriber(on_change=lambda: calls.append(1), debounce=0.02)
+        for _ in range(50):
+            sub.feed("%sessions-changed")
+            sub.feed("%unlinked-window-close @3")
+        await asyncio.sleep(0.1)
+
+    asyncio.run(scenario())
+    assert calls == [1]
+
+
+def test_irrelevant_notifications_are_ignored():
+    calls = []
+
+    async def scenario() -> None:
+        sub = ControlSubscriber(on_change=lambda: calls.append(1), debounce=0.01)
+        sub.feed("%output %1 hello")
+        sub.feed("%layout-change @1 abcd")
+        await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+    assert calls == []
+
+
+def test_long_burst_is_flushed_after_max_delay():
+    calls = []
+
+    async def scenario() -> None:
+        sub = ControlSubscriber(
+            on_change=lambda: calls.append(1), debounce=0.05, max_delay=0.1
+        )
+        # Events keep arriving faster than the debounce window for 0.25s.
+        for _ in range(25):
+            sub.feed("%window-add @1")
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.1)
+
+    asyncio.run(scenario())
+    assert 2 <= len(calls) <= 4
+
+
+def test_tracks_own_session():
+    async def scenario() -> ControlSubscriber:
+        sub = ControlSubscriber(on_change=lambda: None, debounce=0.01)
+        sub.feed("%session-changed $4 work")
+        await asyncio.sleep(0.02)
+        return sub
+
+    assert asyncio.run(scenario()).session_id == "$4"
+
+
+def test_only_the_matching_guard_line_ends_a_reply(tmp_path):
+    # A tmux whose attach-session fails with a message that starts like the
+    # end of a successful reply.
+    tmux = tmp_path / "tmux"
+    tmux.write_text(
+        "#!/bin/sh\n"
+        "printf '%%begin 5 1 0\\n%%end 5 2 0\\n%%error 5 1 0\\n%%exit\\n'\n"
+    )
+    tmux.chmod(0o755)
+    sub = ControlSubscriber(on_change=lambda: None, binary=str(tmux))
+
+    assert asyncio.run(sub._listen_once()) is False
@@ -0,0 +1,341 @@
+# tests/test_tui_unit.py
+
+import asyncio
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pytest
+
+from ytpm.adapters.session import Session
+from ytpm.core.gitstatus import GitStatus
+from ytpm.core.projects import Project
+from ytpm.tui.app import SessionItem, YtpmTui
+from ytpm.tui.preview import CaptureCache
+from ytpm.tui.recent import RecentList
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    """Each app starts without a list saved by an earlier one."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+
+class FakeAsyncManager:
+    """Serves whatever session list the test sets next."""
+
+    def __init__(self, sessions: List[Session]) -> None:
+        self.sessions = sessions
+        # Session id -> activity of its (single) pane; pane ids are "%<id>".
+        self.activity: Dict[str, int] = {}
+        self.captures: List[str] = []
+        # Cleared to hold list_sessions back, as a slow tmux would.
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.error: Optional[Exception] = None
+
+    async def list_sessions(self) -> List[Session]:
+        await self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        return list(self.sessions)
+
+    async def active_panes(self) -> Dict[str, Tuple[str, int]]:
+        return {s.id: ("%" + s.id, self.activity.get(s.id, 0)) for s in self.sessions}
+
+    async def capture_pane(self, pane_id: str) -> str:
+        self.captures.append(pane_id)
+        return f"\x1b[32mcontents of {pane_id}\x1b[0m"
+
+
+class FakeManager:
+    def __init__(
+        self,
+        projects: List[Project] | None = None,
+        frecency: Dict[str, float] | None = None,
+    ) -> None:
+        self.projects = projects or []
+        self.frecency = frecency or {}
+        self.git: Dict[str, GitStatus] = {}
+        # Set to hold git lookups back until the test releases them.
+        self.git_gate = threading.Event()
+        self.git_gate.set()
+
+    def list_projects(self) -> List[Project]:
+        return self.projects
+
+    def frecency_scores(self, names: Iterable[str]) -> Dict[str, float]:
+        return {name: self.frecency.get(name, 0.0) for name in names}
+
+    def git_statuses(self, paths: Iterable[str]) -> Iterator[Tuple[str, Optional[GitStatus]]]:
+        for path in paths:
+            self.git_gate.wait()
+            yield path, self.git.get(path)
+
+
+def rows(app: YtpmTui) -> List[SessionItem]:
+    assert app._list_view is not None
+    return [c for c in app._list_view.children if isinstance(c, SessionItem)]
+
+
+def test_reload_updates_rows_in_place_and_keeps_selection():
+    fake = FakeAsyncManager(
+        [Session("a", "$1"), Session("b", "$2", windows=1), Session("c", "$3")]
+    )
+
+    async def scenario() -> None:
+        app = YtpmTui(manager=FakeManager(), async_manager=fake, live_updates=False)  # type: ignore[arg-type]
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            before = {item.key: item for item in rows(app)}
+            app._list_view.index = 1  # highlight "b"
+
+            # "a" is gone, "b" gained a window, "d" is new.
+            fake.sessions = [Session("b", "$2", windows=2), Session("c", "$3"), Session("d", "$4")]
+            await app._reload_sessions()
+            await pilot.pause()
+
+            after = rows(app)
+            assert [item.session_name for item in after] == ["b", "c", "d"]
+            assert after[0] is before["$2"]
+            assert after[1] is before["$3"]
+            assert after[0].session.windows == 2
+            assert app._list_view.index == 0
+
+            # Nothing changed: no widget is replaced.
+            await app._reload_sessions()
+            assert rows(app) == after
+
+    asyncio.run(scenario())
+
+
+def test_reload_follows_reordered_sessions():
+    fake = FakeAsyncManager([Session("a", "$1"), Session("b", "$2"), Session("c", "$3")])
+
+    async def scenario() -> None:
+        app = YtpmTui(manager=FakeManager(), async_manager=fake, live_updates=False)  # type: ignore[arg-type]
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            app._list_view.index = 0  # highlight "a"
+
+            fake.sessions = [Session("c", "$3"), Session("a", "$1"), Session("b", "$2")]
+            await app._reload_sessions()
+            await pilot.pause()
+
+            assert [item.session_name for item in rows(app)] == ["c", "a", "b"]
+            assert app._list_view.index == 1
+
+    asyncio.run(scenario())
+
+
+def test_git_status_fills_in_rows_after_they_are_shown():
+    fake = FakeAsyncManager(
+        [
+            Session("api", "$1", windows=1, path="/src/api"),
+            Session("tmp", "$2", windows=1, path="/tmp"),
+        ]
+    )
+    manager = FakeManager()
+    manager.git = {"/src/api": GitStatus("main", dirty=True, behind=3)}
+    manager.git_gate.clear()
+
+    async def scenario() -> None:
+        app = YtpmTui(manager=manager, async_manager=fake, live_updates=False)  # type: ignore[arg-type]
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            # Listed while git is still working.
+            assert [item.git for item in rows(app)] == [None, None]
+
+            manager.git_gate.set()
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+
+            api, tmp = rows(app)
+            assert api.git == GitStatus("main", dirty=True, behind=3)
+            assert str(api._label.render()) == "api  1 window  main* -3"
+            assert tmp.git is None
+
+    asyncio.run(scenario())
+
+
+def test_last_list_is_shown_until_tmux_answers(tmp_path):
+    recent = RecentList(tmp_path / "recent.json")
+    recent.save(
+        [Session("old", "$1", path="/src/old"), Session("api", "$2", path="/src/api")],
+        {"/src/api": GitStatus("main")},
+    )
+    fake = FakeAsyncManager(
+        [Session("api", "$2", windows=2, path="/src/api"), Session("new", "$3")]
+    )
+
+    manager = FakeManager()
+    manager.git = {"/src/api": GitStatus("main", dirty=True)}
+
+    async def scenario() -> None:
+        fake.gate = asyncio.Event()
+        app = YtpmTui(
+            manager=manager, async_manager=fake, live_updates=False, recent=recent  # type: ignore[arg-type]
+        )
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            cached = rows(app)
+            assert [(item.session_name, item.git) for item in cached] == [
+                ("old", None),
+                ("api", GitStatus("main")),
+            ]
+            assert app.sub_title == "refreshing…"
+
+            fake.gate.set()
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+
+            live = rows(app)
+            assert [item.session_name for item in live] == ["api", "new"]
+            assert live[0] is cached[1] and live[0].session.windows == 2
+            assert app.sub_title == ""
+
+    asyncio.run(scenario())
+    sessions, git = recent.load()
+    assert [s.name for s in sessions] == ["api", "new"]
+    # Saved again on exit, with the statuses that came in meanwhile.
+    assert git == {"/src/api": GitStatus("main", dirty=True)}
+
+
+def test_last_list_stays_when_tmux_fails(tmp_path):
+    from ytpm.adapters.tmux import TmuxTimeoutError
+
+    recent = RecentList(tmp_path / "recent.json")
+    recent.save([Session("old", "$1")], {})
+    fake = FakeAsyncManager([])
+    fake.error = TmuxTimeoutError(["tmux", "list-sessions"], 5.0)
+
+    async def scenario() -> None:
+        app = YtpmTui(
+            manager=FakeManager(), async_manager=fake, live_updates=False, recent=recent  # type: ignore[arg-type]
+        )
+        async with app.run_test() as pilot:
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            assert [item.session_name for item in rows(app)] == ["old"]
+            assert app.sub_title == "last known sessions"
+
+    asyncio.run(scenario())
+    # Nothing live was seen, so the saved list is kept as it was.
+    assert [s.name for s in recent.load()[0]] == ["old"]
+
+
+def test_typing_a_filter_narrows_rows_and_enter_selects():
+    fake = FakeAsyncManager(
+        [Session("web-api", "$1"), Session("db", "$2"), Session("jobs", "$3")]
+    )
+
+    async def scenario() -> YtpmTui:
+        app = YtpmTui(manager=FakeManager(), async_manager=fake, live_updates=False)  # type: ignore[arg-type]
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            await pilot.press("slash", "j", "b")
+            await pilot.pause()
+            assert [item.session_name for item in rows(app)] == ["jobs"]
+
+            await pilot.press("escape")
+            await pilot.pause()
+            assert len(rows(app)) == 3
+
+            await pilot.press("slash", "d", "b", "enter")
+            await pilot.pause()
+        return app
+
+    app = asyncio.run(scenario())
+    assert app.return_value is not None
+    assert app.return_value[0] == "db"
+
+
+def test_filter_finds_projects_without_sessions():
+    fake = FakeAsyncManager([Session("web", "$1")])
+    manager = FakeManager([Project("web", "/src/web"), Project("infra", "/src/infra")])
+
+    async def scenario() -> YtpmTui:
+        app = YtpmTui(manager=manager, async_manager=fake, live_updates=False)  # type: ignore[arg-type]
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            # Without a filter only running sessions are listed.
+            assert [item.session_name for item in rows(app)] == ["web"]
+
+            await pilot.press("slash", "i", "n", "f")
+            await pilot.pause()
+            assert [item.session_name for item in rows(app)] == ["infra"]
+            await pilot.press("enter")
+            await pilot.pause()
+        return app
+
+    app = asyncio.run(scenario())
+    assert app.return_value == ("infra", "/src/infra")
+
+
+def test_sessions_and_matches_are_ranked_by_frecency():
+    fake = FakeAsyncManager([Session("api", "$1"), Session("app", "$2"), Session("web", "$3")])
+    manager = FakeManager(frecency={"web": 5.0, "app": 1.0})
+
+    async def scenario() -> None:
+        app = YtpmTui(manager=manager, async_manager=fake, live_updates=False)  # type: ignore[arg-type]
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            assert [item.session_name for item in rows(app)] == ["web", "app", "api"]
+
+            # "ap" matches "api" and "app" equally well; the visited one wins.
+            await pilot.press("slash", "a", "p")
+            await pilot.pause()
+            assert [item.session_name for item in rows(app)] == ["app", "api"]
+
+    asyncio.run(scenario())
+
+
+def test_preview_waits_for_the_cursor_to_rest_and_prefetches_neighbours():
+    fake = FakeAsyncManager([Session(name, f"${i}") for i, name in enumerate("abcdef")])
+
+    async def scenario() -> None:
+        app = YtpmTui(manager=FakeManager(), async_manager=fake, live_updates=False)  # type: ignore[arg-type]
+        app.PREVIEW_DELAY = 0.2
+        async with app.run_test() as pilot:
+            await pilot.pause(0.3)
+            fake.captures.clear()
+
+            # Holding j: no capture for the rows passed over.
+            await pilot.press("j", "j", "j")
+            assert fake.captures == []
+
+            await pilot.pause(0.3)
+            assert fake.captures == ["%$3", "%$4", "%$2"]
+            assert app._preview is not None
+            assert "contents of %$3" in str(app._preview.render())
+
+            # Neighbours were prefetched (row 1 at start-up, with row 0), and
+            # unchanged panes aren't captured again.
+            await pilot.press("k")
+            assert "contents of %$2" in str(app._preview.render())
+            await pilot.pause(0.3)
+            assert fake.captures == ["%$3", "%$4", "%$2"]
+
+            # Activity in a pane makes its capture stale.
+            fake.activity["$2"] = 1
+            app._start_preview()
+            await pilot.pause(0.1)
+            assert fake.captures[-1] == "%$2"
+
+    asyncio.run(scenario())
+
+
+def test_capture_cache_is_bounded_and_keeps_one_capture_per_pane():
+    cache = CaptureCache(max_chars=10, max_entries=2)
+
+    cache.put(("%1", 1), "aaaa")
+    cache.put(("%1", 2), "bbbb")
+    assert ("%1", 1) not in cache and cache.get(("%1", 2)) == "bbbb"
+
+    cache.put(("%2", 1), "cccc")
+    cache.get(("%1", 2))  # most recently used now
+    cache.put(("%3", 1), "dd")
+    assert len(cache) == 2
+    assert ("%2", 1) not in cache
+
+    cache.put(("%4", 1), "e" * 9)
+    assert list(cache._entries) == [("%4", 1)]
@@ -0,0 +1,134 @@
+# tests/test_usage_unit.py
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from ytpm.adapters.session import Pane
+from ytpm.core.usage import UsageSampler, parse_stat, read_processes
+
+TICKS = os.sysconf("SC_CLK_TCK")
+PAGE = os.sysconf("SC_PAGE_SIZE")
+
+
+class FakeProc:
+    """A /proc directory with stat files only."""
+
+    def __init__(self, root) -> None:
+        self.root = root
+
+    def add(self, pid, ppid, cpu=0, pages=0, start=1, comm="sh") -> None:
+        # Fields 3 to 24 of proc(5): state, ppid, ... utime (14), stime (15),
+        # ... starttime (22), vsize, rss (24).
+        fields = ["S", ppid] + [0] * 9 + [cpu, 0] + [0] * 6 + [start, 0, pages]
+        (self.root / str(pid)).mkdir(exist_ok=True)
+        (self.root / str(pid) / "stat").write_text(
+            f"{pid} ({comm}) " + " ".join(map(str, fields)) + "\n"
+        )
+
+    def remove(self, pid) -> None:
+        (self.root / str(pid) / "stat").unlink()
+        (self.root / str(pid)).rmdir()
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def pane(session, pid):
+    return Pane(session, "@1", 0, "w", f"%{pid}", pid=pid)
+
+
+@pytest.fixture
+def proc(tmp_path):
+    (tmp_path / "self").mkdir()  # not a process
+    return FakeProc(tmp_path)
+
+
+def test_stat_lines_are_parsed_whatever_the_command_name():
+    fake = "42 (a) (b ) S 7 " + "0 " * 9 + "30 12 " + "0 " * 6 + "555 0 9\n"
+    assert parse_stat(fake.encode()) == (7, 555, 42, 9)
+    assert parse_stat(b"42 (zombie") is None
+
+
+def test_sessions_add_up_their_pane_process_trees(proc):
+    # web: two panes, a shell with a server and its worker; db: one shell.
+    proc.add(1, 0)
+    proc.add(10, 1, cpu=2 * TICKS, pages=100)
+    proc.add(11, 10, cpu=TICKS, pages=1000, comm="python3 server.py")
+    proc.add(12, 11, pages=500)
+    proc.add(13, 1, pages=10)
+    proc.add(20, 1, cpu=TICKS, pages=50)
+    proc.add(99, 1, cpu=50 * TICKS, pages=9999)
+    sampler = UsageSampler(root=str(proc.root), clock=Clock())
+
+    usage = sampler.sample([pane("web", 10), pane("web", 13), pane("db", 20), pane("gone", 77)])
+
+    assert [(u.session, u.panes, u.processes) for u in usage] == [
+        ("web", 2, 4),
+        ("db", 1, 1),
+        ("gone", 1, 0),
+    ]
+    assert usage[0].rss == 1610 * PAGE
+    assert usage[0].cpu_time == pytest.approx(3.0)
+    assert usage[0].cpu_percent is None
+
+
+def test_cpu_percent_is_measured_between_samples(proc):
+    clock = Clock()
+    proc.add(10, 1, cpu=10 * TICKS, start=5)
+    proc.add(11, 10, cpu=TICKS, start=6)
+    sampler = UsageSampler(root=str(proc.root), clock=clock)
+    sampler.sample([pane("web", 10)])
+
+    # In two seconds: one CPU second for 10, none for 11, and a new
+    # process 12 that used half a second.
+    clock.now += 2
+    proc.add(10, 1, cpu=11 * TICKS, start=5)
+    proc.add(12, 10, cpu=TICKS // 2, start=7)
+    (usage,) = sampler.sample([pane("web", 10)])
+    assert usage.cpu_percent == pytest.approx(75.0, abs=1)
+
+    # 11 exited and its pid went to an unrelated process of the session.
+    clock.now += 1
+    proc.remove(11)
+    proc.add(11, 10, cpu=TICKS // 4, start=9)
+    (usage,) = sampler.sample([pane("web", 10)])
+    assert usage.cpu_percent == pytest.approx(25.0, abs=1)
+
+
+def test_the_children_index_is_kept_while_no_parent_changes(proc):
+    proc.add(10, 1)
+    proc.add(11, 10, cpu=1)
+    sampler = UsageSampler(root=str(proc.root), clock=Clock())
+    sampler.sample([pane("web", 10)])
+    index = sampler._children
+
+    proc.add(11, 10, cpu=2)
+    sampler.sample([pane("web", 10)])
+    assert sampler._children is index
+
+    proc.add(12, 11)
+    (usage,) = sampler.sample([pane("web", 10)])
+    assert sampler._children is not index
+    assert usage.processes == 3
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self"), reason="needs /proc")
+def test_real_processes_are_found_under_their_parent():
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        assert read_processes()[child.pid][0] == os.getpid()
+
+        (usage,) = UsageSampler().sample([pane("me", os.getpid())])
+        assert usage.processes >= 2
+        assert usage.rss > 0 and usage.cpu_time > 0
+    finally:
+        child.kill()
+        child.wait()
@@ -0,0 +1,182 @@
+# tests/test_workspace_unit.py
+
+from typing import List
+
+import pytest
+
+from ytpm.adapters.batch import SequentialBatch
+from ytpm.adapters.session import Pane
+from ytpm.core.config import ConfigError, SessionConfig, WindowConfig, load_config
+from ytpm.core.manager import Manager
+from ytpm.core.projects import ProjectIndex
+from ytpm.core.frecency import FrecencyStore
+from ytpm.core.workspace import plan
+
+
+def pane(session, window_id, window_index, window_name, id_, index=0, workspace=""):
+    return Pane(session, window_id, window_index, window_name, id_, index, "/", workspace)
+
+
+API = SessionConfig(
+    name="api",
+    root="/src/api",
+    windows=[
+        WindowConfig(name="editor", panes=["nvim", ""], layout="main-vertical"),
+        WindowConfig(name="server", path="app", panes=["make run"]),
+    ],
+)
+
+API_LIVE = [
+    pane("api", "@1", 0, "editor", "%1", 0),
+    pane("api", "@1", 0, "editor", "%2", 1),
+    pane("api", "@2", 1, "server", "%3", 0),
+]
+
+
+def test_new_session_is_built_window_by_window():
+    result = plan([API], [])
+
+    assert result.changes[0] == ("create", "session", "api", "/src/api")
+    assert result.ops == [
+        ("create_session", ("api", "/src/api", False, "editor")),
+        ("set_option", ("=api:", "@ytpm-workspace", "1")),
+        ("send_keys", ("=api:{end}", "nvim")),
+        ("split_window", ("=api:{end}", "/src/api")),
+        ("select_layout", ("=api:{end}", "main-vertical")),
+        ("new_window", ("api", "server", "/src/api/app")),
+        ("send_keys", ("=api:{end}", "make run")),
+    ]
+
+
+def test_matching_live_state_needs_nothing():
+    assert not plan([API], API_LIVE)
+    assert not plan([API], API_LIVE, prune=True)
+    # Sessions without windows only need to exist.
+    assert not plan([SessionConfig(name="api")], API_LIVE[:1])
+
+
+def test_only_the_difference_is_planned():
+    live = [
+        pane("api", "@1", 0, "zsh", "%1", 0),  # right place, wrong name
+        pane("api", "@7", 1, "server", "%7", 0),
+        pane("api", "@8", 2, "scratch", "%8", 0),
+    ]
+
+    result = plan([API], live)
+
+    assert result.ops == [
+        ("rename_window", ("@1", "editor")),
+        ("split_window", ("@1", "/src/api")),
+        ("select_layout", ("@1", "main-vertical")),
+    ]
+    assert [c.action for c in result.changes] == ["rename", "create"]
+    # Extra windows are left alone unless asked.
+    assert plan([API], live, prune=True).ops[3:] == [("kill_window", ("@8",))]
+
+    # A missing window is added at the end.
+    assert plan([API], live[:1]).ops[3:] == [
+        ("new_window", ("api", "server", "/src/api/app")),
+        ("send_keys", ("=api:{end}", "make run")),
+    ]
+
+
+def test_prune_kills_extra_panes_and_sessions_apply_created():
+    live = API_LIVE + [
+        pane("api", "@2", 1, "server", "%4", 1),
+        pane("old", "@3", 0, "zsh", "%5", workspace="1"),
+        pane("mine", "@4", 0, "zsh", "%6"),
+    ]
+
+    result = plan([API], live, prune=True)
+
+    assert result.ops == [("kill_pane", ("%4",)), ("kill_session", ("old",))]
+    assert [c.action for c in result.changes] == ["kill", "kill"]
+
+
+class FakeAdapter:
+    """Records layout operations against a fixed pane snapshot."""
+
+    def __init__(self, panes: List[Pane]) -> None:
+        self.panes = panes
+        self.calls: List[str] = []
+        self.batches = 0
+
+    def list_panes(self) -> List[Pane]:
+        self.calls.append("list_panes")
+        return self.panes
+
+    def batch(self) -> SequentialBatch:
+        self.batches += 1
+        return SequentialBatch(self)
+
+    def __getattr__(self, op: str):
+        return lambda *args, **kwargs: self.calls.append(op)
+
+
+@pytest.fixture
+def make_manager(tmp_path):
+    def make(panes: List[Pane]) -> Manager:
+        return Manager(
+            adapter=FakeAdapter(panes),
+            projects=ProjectIndex(tmp_path / "projects.json", tmp_path / "state.json"),
+            frecency=FrecencyStore(tmp_path / "frecency.json"),
+        )
+
+    return make
+
+
+def test_unchanged_workspace_is_a_single_read(make_manager):
+    manager = make_manager(API_LIVE)
+
+    manager.apply_workspace([API])
+
+    assert manager.adapter.calls == ["list_panes"]
+
+
+def test_changes_run_in_one_batch(make_manager):
+    manager = make_manager([])
+
+    assert manager.apply_workspace([API], dry_run=True).changes
+    assert manager.adapter.batches == 0
+
+    manager.adapter.calls.clear()
+    manager.apply_workspace([API])
+    assert manager.adapter.batches == 1
+    assert manager.adapter.calls[:3] == ["list_panes", "create_session", "set_option"]
+
+
+def write(tmp_path, text: str):
+    path = tmp_path / "config.toml"
+    path.write_text(text)
+    return path
+
+
+def test_load_config_reads_sessions(tmp_path):
+    config = load_config(
+        write(
+            tmp_path,
+            '[[sessions]]\nname = "api"\nroot = "~/api"\n'
+            '[[sessions.windows]]\nname = "editor"\npanes = ["nvim", ""]\n'
+            '[[sessions]]\nname = "notes"\n',
+        )
+    )
+
+    assert [s.name for s in config.sessions] == ["api", "notes"]
+    assert config.sessions[0].windows == [WindowConfig(name="editor", panes=["nvim", ""])]
+    assert config.sessions[1].windows == []
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '[[sessions]]\nroot = "~"\n',
+        '[[sessions]]\nname = "a"\n[[sessions]]\nname = "a"\n',
+        '[[sessions]]\nname = "a"\n[[sessions.windows]]\npanes = [""]\n',
+        '[[sessions]]\nname = "a"\n[[sessions.windows]]\nname = "w"\npanes = []\n',
+        '[[sessions]]\nname = "a"\nwindow = []\n',
+        'sessions = "a"\n',
+    ],
+)
+def test_load_config_rejects_bad_sessions(tmp_path, text):
+    with pytest.raises(ConfigError):
+        load_config(write(tmp_path, text))
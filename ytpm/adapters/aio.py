@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+import shutil
+import time
+from typing import Dict, List, Optional, Tuple
+
+from ytpm.adapters import events
+from ytpm.adapters.policy import CircuitBreaker, CommandPolicy
+from ytpm.adapters.server import server_socket, socket_flags
+from ytpm.adapters.session import Session
+from ytpm.adapters.tmux import (
+    FIELD_SEP,
+    SESSION_FORMAT,
+    TmuxCommandError,
+    TmuxNotFoundError,
+    TmuxTimeoutError,
+    TmuxUnavailableError,
+    classify_error,
+    is_no_server_error,
+    line_commands,
+    lost_server,
+    parse_session_line,
+)
+
+# The pane a client would land on in each session, and when its window
+# last saw activity.
+ACTIVE_PANE_FILTER = "#{&&:#{window_active},#{pane_active}}"
+ACTIVE_PANE_FORMAT = FIELD_SEP.join(["#{session_id}", "#{pane_id}", "#{window_activity}"])
+
+
+class AsyncTmuxAdapter:
+    """Non-blocking counterpart of TmuxAdapter for asyncio callers.
+
+    Every call runs tmux with asyncio.create_subprocess_exec, so the event
+    loop keeps running while tmux answers, and several calls can be in flight
+    at once. Calls run under `policy` as TmuxAdapter's do: a deadline (on
+    expiry the tmux process is killed and TmuxTimeoutError is raised),
+    retries when tmux lost its server, and a circuit breaker shared by all
+    calls on this adapter. `timeout` overrides the policy's deadline.
+    """
+
+    def __init__(
+        self,
+        binary: str = "tmux",
+        timeout: Optional[float] = None,
+        socket_name: Optional[str] = None,
+        socket_path: Optional[str] = None,
+        policy: Optional[CommandPolicy] = None,
+    ) -> None:
+        self.binary = binary
+        self.command_prefix = [binary, *socket_flags(socket_name, socket_path)]
+        self.socket = server_socket(socket_name, socket_path)
+        self.policy = policy or CommandPolicy.from_env()
+        if timeout is not None:
+            self.policy.timeout = timeout
+        self.breaker = CircuitBreaker(self.policy.breaker_threshold, self.policy.breaker_cooldown)
+        self._ensure_tmux_available()
+
+    def _ensure_tmux_available(self) -> None:
+        if shutil.which(self.binary) is None:
+            raise TmuxNotFoundError(
+                f"'{self.binary}' not found on PATH. Please install tmux."
+            )
+
+    async def _run(self, *args: str, timeout: Optional[float] = None) -> str:
+        cmd = [*self.command_prefix, *args]
+        returncode, stdout, stderr = await self._call(cmd, timeout)
+        if returncode != 0:
+            stderr = stderr.strip()
+            # Telling "no server" apart may connect to its socket: not on the loop.
+            kind = await asyncio.get_running_loop().run_in_executor(
+                None, classify_error, returncode, stderr, self.socket
+            )
+            raise TmuxCommandError(cmd, stderr, returncode, kind)
+        return stdout.strip()
+
+    async def _call(
+        self, cmd: List[str], timeout: Optional[float] = None
+    ) -> Tuple[int, str, str]:
+        """Run a command line under the policy, as TmuxAdapter._call does."""
+        retry_in = self.breaker.remaining()
+        if retry_in:
+            raise TmuxUnavailableError(cmd, retry_in)
+
+        if timeout is None:
+            timeout = self.policy.timeout_for(line_commands(cmd[len(self.command_prefix):]))
+        deadline = None if timeout is None else time.monotonic() + timeout
+        delay = self.policy.backoff
+        for attempt in range(self.policy.retries + 1):
+            remaining = None if deadline is None else deadline - time.monotonic()
+            try:
+                if remaining is not None and remaining <= 0:
+                    raise TmuxTimeoutError(cmd, timeout or 0.0)
+                result = await self._exec(cmd, remaining)
+            except TmuxTimeoutError:
+                self.breaker.failure()
+                raise
+            self.breaker.success()
+            returncode, _, stderr = result
+            if not lost_server(returncode, stderr) or attempt == self.policy.retries:
+                break
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                break
+            await asyncio.sleep(delay)
+            delay *= 2
+        return result
+
+    async def _exec(
+        self, cmd: List[str], timeout: Optional[float] = None
+    ) -> Tuple[int, str, str]:
+        start = time.perf_counter()
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            events.emit(cmd, -1, time.perf_counter() - start, "", "", "async")
+            raise TmuxTimeoutError(cmd, timeout or 0.0) from None
+        except asyncio.CancelledError:
+            # Don't leave a tmux process behind when the caller gives up.
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            raise
+        assert proc.returncode is not None
+        out, err = stdout.decode(errors="replace"), stderr.decode(errors="replace")
+        events.emit(cmd, proc.returncode, time.perf_counter() - start, out, err, "async")
+        return proc.returncode, out, err
+
+    # --- public API ---
+    async def list_sessions(self, timeout: Optional[float] = None) -> List[Session]:
+        """Return a record for every session; empty if no server is running."""
+        try:
+            output = await self._run("list-sessions", "-F", SESSION_FORMAT, timeout=timeout)
+        except TmuxCommandError as e:
+            if is_no_server_error(e):
+                return []
+            raise
+
+        if not output:
+            return []
+        return [parse_session_line(line) for line in output.splitlines()]
+
+    async def session_exists(self, name: str, timeout: Optional[float] = None) -> bool:
+        """Return True if a session with the given name exists."""
+        try:
+            await self._run("has-session", "-t", f"={name}", timeout=timeout)
+            return True
+        except TmuxCommandError:
+            return False
+
+    async def active_panes(self, timeout: Optional[float] = None) -> Dict[str, Tuple[str, int]]:
+        """Map every session id to (active pane id, window activity), in one call."""
+        try:
+            output = await self._run(
+                "list-panes", "-a", "-f", ACTIVE_PANE_FILTER, "-F", ACTIVE_PANE_FORMAT,
+                timeout=timeout,
+            )
+        except TmuxCommandError as e:
+            if is_no_server_error(e):
+                return {}
+            raise
+
+        panes: Dict[str, Tuple[str, int]] = {}
+        for line in output.splitlines():
+            session_id, pane_id, activity = line.split(FIELD_SEP, 2)
+            panes[session_id] = (pane_id, int(activity or 0))
+        return panes
+
+    async def capture_pane(self, target: str, timeout: Optional[float] = None) -> str:
+        """Visible contents of a pane, with colours as escape sequences."""
+        return await self._run("capture-pane", "-p", "-e", "-t", target, timeout=timeout)
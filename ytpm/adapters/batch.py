@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from typing import Any, Callable, List, NamedTuple, Tuple
+
+
+class BatchResult(NamedTuple):
+    """Outcome of one operation in a batch."""
+
+    op: str
+    ok: bool
+    output: str = ""
+    error: str = ""
+
+
+SKIPPED = "not run: an earlier command in the batch failed"
+
+
+class SequentialBatch:
+    """Batch that replays operations one by one through an adapter's methods.
+
+    Used by adapters that have no way to send several commands at once
+    (e.g. in-memory fakes). It follows tmux's rules: the first failure stops
+    the batch and the remaining operations are reported as skipped.
+    """
+
+    def __init__(self, adapter: Any) -> None:
+        self._adapter = adapter
+        # An op's return value, if it is a string, is its output.
+        self._ops: List[Tuple[str, Callable[[], Any]]] = []
+
+    def __len__(self) -> int:
+        return len(self._ops)
+
+    def create_session(
+        self, name: str, cwd: str, exist_ok: bool = False, window: str = ""
+    ) -> None:
+        def op() -> None:
+            if exist_ok and self._adapter.session_exists(name):
+                return
+            if window:
+                self._adapter.create_session(name, cwd, window=window)
+            else:
+                self._adapter.create_session(name, cwd)
+
+        self._ops.append(("create_session", op))
+
+    def switch_client(self, name: str) -> None:
+        self._ops.append(("switch_client", lambda: self._adapter.switch_client(name)))
+
+    def attach(self, name: str) -> None:
+        self._ops.append(("attach", lambda: self._adapter.attach(name)))
+
+    def detach_client(self, command: str) -> None:
+        self._ops.append(("detach_client", lambda: self._adapter.detach_client(command)))
+
+    def kill_session(self, name: str, missing_ok: bool = False) -> None:
+        def op() -> None:
+            if missing_ok and not self._adapter.session_exists(name):
+                return
+            self._adapter.kill_session(name)
+
+        self._ops.append(("kill_session", op))
+
+    # Layout operations map one-to-one onto adapter methods.
+    def new_window(self, session: str, name: str, cwd: str) -> None:
+        self._call("new_window", session, name, cwd)
+
+    def split_window(self, target: str, cwd: str) -> None:
+        self._call("split_window", target, cwd)
+
+    def rename_window(self, target: str, name: str) -> None:
+        self._call("rename_window", target, name)
+
+    def kill_window(self, target: str) -> None:
+        self._call("kill_window", target)
+
+    def kill_pane(self, target: str) -> None:
+        self._call("kill_pane", target)
+
+    def send_keys(self, target: str, text: str) -> None:
+        self._call("send_keys", target, text)
+
+    def select_layout(self, target: str, layout: str) -> None:
+        self._call("select_layout", target, layout)
+
+    def set_option(self, target: str, option: str, value: str) -> None:
+        self._call("set_option", target, option, value)
+
+    def select_window(self, target: str) -> None:
+        self._call("select_window", target)
+
+    def select_pane(self, target: str) -> None:
+        self._call("select_pane", target)
+
+    def respawn_pane(self, target: str, cwd: str, command: str) -> None:
+        self._call("respawn_pane", target, cwd, command)
+
+    def capture_pane(self, target: str, history: bool = False) -> None:
+        self._call("capture_pane", target, history)
+
+    def _call(self, op: str, *args: Any) -> None:
+        self._ops.append((op, lambda: getattr(self._adapter, op)(*args)))
+
+    def run(self, check: bool = False) -> List[BatchResult]:
+        results: List[BatchResult] = []
+        failed = False
+        for name, op in self._ops:
+            if failed:
+                results.append(BatchResult(name, False, error=SKIPPED))
+                continue
+            try:
+                output = op()
+            except Exception as e:
+                if check:
+                    raise
+                failed = True
+                results.append(BatchResult(name, False, error=str(e)))
+            else:
+                results.append(BatchResult(name, True, output if isinstance(output, str) else ""))
+        self._ops = []
+        return results
@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+import os
+import select
+import subprocess
+import time
+from typing import List, Optional, Sequence, Tuple
+
+from ytpm.adapters import events
+from ytpm.adapters.session import Session
+from ytpm.adapters.policy import CommandPolicy
+from ytpm.adapters.tmux import TmuxAdapter, TmuxCommandError, TmuxTimeoutError, quote_arg
+
+
+class ControlModeError(RuntimeError):
+    """Raised when a command could not be sent over the control-mode connection."""
+
+
+class ControlModeTimeout(ControlModeError):
+    """Raised when tmux did not answer within the deadline."""
+
+
+class ControlClient:
+    """A long-lived `tmux -C` client that runs commands over a pipe.
+
+    Replies are framed by tmux as `%begin`/`%end` (or `%error`) blocks. Each
+    command line is followed by a `display-message` sentinel, so we know when
+    every block belonging to that line has arrived, however many commands
+    the line expanded to.
+    """
+
+    def __init__(
+        self,
+        binary: str = "tmux",
+        connect_timeout: float = 2.0,
+        flags: Sequence[str] = (),
+    ) -> None:
+        self.binary = binary
+        self.connect_timeout = connect_timeout
+        # Server selection (-L/-S), see ytpm.adapters.server.socket_flags.
+        self.flags = list(flags)
+        self.session_id: Optional[str] = None
+        self._proc: Optional[subprocess.Popen[bytes]] = None
+        self._buffer = b""
+        self._serial = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def _spawn(self) -> subprocess.Popen[bytes]:
+        return subprocess.Popen(
+            [self.binary, *self.flags, "-C", "attach-session"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def connect(self) -> None:
+        """Start the control client and wait until tmux has attached it."""
+        self.close()
+        try:
+            self._proc = self._spawn()
+        except OSError as e:
+            raise ControlModeError(f"could not start tmux control client: {e}") from e
+
+        deadline = time.monotonic() + self.connect_timeout
+        try:
+            # The first block not sent by us is the result of attach-session.
+            while True:
+                ok, lines, ours = self._read_block(deadline)
+                if not ours:
+                    break
+        except ControlModeError:
+            self.close()
+            raise
+        if not ok:
+            self.close()
+            raise ControlModeError("; ".join(lines) or "tmux control client failed to attach")
+
+        # Don't stream pane output to us or let our client affect window sizes.
+        # Older tmux versions don't know these flags; that's fine.
+        self.command(["refresh-client", "-f", "no-output,ignore-size"], self.connect_timeout)
+
+    def close(self) -> None:
+        proc, self._proc = self._proc, None
+        self._buffer = b""
+        self.session_id = None
+        if proc is None:
+            return
+        try:
+            if proc.stdin is not None:
+                proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        if proc.stdout is not None:
+            proc.stdout.close()
+
+    def command(self, args: List[str], timeout: Optional[float] = None) -> Tuple[int, str, str]:
+        """Run one tmux command line and return (returncode, stdout, stderr).
+
+        Raises ControlModeError when tmux never answered the line, so the
+        caller can retry the command some other way, and ControlModeTimeout
+        when it did not answer within `timeout` seconds (the client is closed
+        then: tmux is wedged, and resending would only hang again).
+        """
+        if any("\n" in arg for arg in args):
+            raise ControlModeError("arguments containing newlines can't be sent in control mode")
+        if not self.connected:
+            self.connect()
+        assert self._proc is not None and self._proc.stdin is not None
+
+        self._serial += 1
+        token = f"ytpm-sync-{os.getpid()}-{self._serial}"
+        line = " ".join(quote_arg(a) for a in args)
+        try:
+            self._proc.stdin.write(f"{line}\ndisplay-message -p {token}\n".encode())
+            self._proc.stdin.flush()
+        except OSError as e:
+            self.close()
+            raise ControlModeError(f"tmux control client went away: {e}") from e
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        out: List[str] = []
+        err: List[str] = []
+        seen_reply = False
+        while True:
+            try:
+                ok, lines, ours = self._read_block(deadline)
+            except ControlModeTimeout:
+                self.close()
+                raise
+            except ControlModeError:
+                self.close()
+                # If tmux replied before dropping us (e.g. we killed our own
+                # session), report what it said. If it never replied, the
+                # client was already on its way out and the line was dropped.
+                if seen_reply:
+                    break
+                raise
+            if not ours:
+                continue
+            if ok and lines == [token]:
+                break
+            seen_reply = True
+            if ok:
+                out.extend(lines)
+            else:
+                err.extend(lines)
+
+        returncode = 1 if err else 0
+        return returncode, "\n".join(out), "\n".join(err)
+
+    # --- protocol parsing ---
+
+    def _read_block(self, deadline: Optional[float]) -> Tuple[bool, List[str], bool]:
+        """Read up to the next complete reply block.
+
+        Returns (ok, output lines, sent by this client). Notifications that
+        arrive between blocks are handled along the way.
+        """
+        while True:
+            line = self._readline(deadline)
+            if line.startswith("%begin "):
+                break
+            if line.startswith("%exit"):
+                raise ControlModeError("tmux detached the control client")
+            self._handle_notification(line)
+
+        ours = self._block_flags(line) & 1 == 1
+        # A reply line may itself start with "%end " (a pane's text, say):
+        # only the guard line with the %begin's time and command number
+        # closes the block.
+        guard = line.split()[1:3]
+        lines: List[str] = []
+        while True:
+            line = self._readline(deadline)
+            if line.startswith(("%end ", "%error ")) and line.split()[1:3] == guard:
+                return line.startswith("%end "), lines, ours
+            lines.append(line)
+
+    @staticmethod
+    def _block_flags(line: str) -> int:
+        # "%begin <time> <command number> <flags>"
+        parts = line.split()
+        try:
+            return int(parts[3])
+        except (IndexError, ValueError):
+            return 0
+
+    def _handle_notification(self, line: str) -> None:
+        if line.startswith("%session-changed "):
+            parts = line.split(" ", 2)
+            if len(parts) >= 2:
+                self.session_id = parts[1]
+
+    def _readline(self, deadline: Optional[float]) -> str:
+        assert self._proc is not None and self._proc.stdout is not None
+        fd = self._proc.stdout.fileno()
+        while b"\n" not in self._buffer:
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise ControlModeTimeout("timed out waiting for tmux")
+                ready, _, _ = select.select([fd], [], [], remaining)
+                if not ready:
+                    raise ControlModeTimeout("timed out waiting for tmux")
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise ControlModeError("tmux control client closed the connection")
+            self._buffer += chunk
+        raw, self._buffer = self._buffer.split(b"\n", 1)
+        return raw.decode(errors="replace")
+
+
+class TmuxControlAdapter(TmuxAdapter):
+    """TmuxAdapter that sends commands over one persistent `tmux -C` client.
+
+    Commands cost a pipe round-trip instead of a process spawn. When control
+    mode isn't available (no server yet, old tmux, ...) every call falls back
+    to the plain subprocess path, so callers never need to care.
+    """
+
+    # These need the caller's terminal, so they always run as a real process.
+    _SUBPROCESS_ONLY = frozenset({"attach", "attach-session"})
+
+    def __init__(
+        self,
+        binary: str = "tmux",
+        socket_name: Optional[str] = None,
+        socket_path: Optional[str] = None,
+        policy: Optional[CommandPolicy] = None,
+    ) -> None:
+        super().__init__(binary, socket_name, socket_path, policy)
+        self._client = ControlClient(binary, flags=self.command_prefix[1:])
+        self._retry_connect = True
+
+    def close(self) -> None:
+        """Detach the control client."""
+        self._client.close()
+
+    def __enter__(self) -> "TmuxControlAdapter":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _exec(self, cmd: List[str], timeout: Optional[float] = None) -> Tuple[int, str, str]:
+        args = cmd[len(self.command_prefix):]
+        if self._use_control(args):
+            # An established connection that dropped (e.g. its session was
+            # killed) gets one reconnect; a failed connect means there is no
+            # server to talk to, so stop trying until something may have
+            # started one.
+            for _ in range(2):
+                was_connected = self._client.connected
+                start = time.perf_counter()
+                try:
+                    result = self._client.command(args, timeout)
+                except ControlModeTimeout:
+                    events.emit(cmd, -1, time.perf_counter() - start, "", "", "control")
+                    raise TmuxTimeoutError(cmd, timeout or 0.0) from None
+                except ControlModeError:
+                    if not was_connected:
+                        self._retry_connect = False
+                        break
+                else:
+                    returncode, stdout, stderr = result
+                    elapsed = time.perf_counter() - start
+                    events.emit(cmd, returncode, elapsed, stdout, stderr, "control")
+                    return result
+
+        result = super()._exec(cmd, timeout)
+        if result[0] == 0 and any("new-session" in arg for arg in args):
+            self._retry_connect = True
+        return result
+
+    def _use_control(self, args: List[str]) -> bool:
+        if not args:
+            return False
+        # Look at every command on the line, not just the first (batches).
+        commands: List[List[str]] = [[]]
+        for arg in args:
+            if arg == ";":
+                commands.append([])
+            else:
+                commands[-1].append(arg)
+        for command in commands:
+            if command and command[0] in self._SUBPROCESS_ONLY:
+                return False
+            # Without an explicit client, switch-client would move our own
+            # control client; only a real process can find the caller's one.
+            if command and command[0] == "switch-client" and "-c" not in command:
+                return False
+        return self._client.connected or self._retry_connect
+
+    def list_sessions(self) -> List[Session]:
+        sessions = super().list_sessions()
+        own = self._client.session_id if self._client.connected else None
+        # Our control client counts as attached to whatever session it is on;
+        # don't report that as a user being attached.
+        return [
+            s._replace(attached=max(s.attached - 1, 0)) if s.id == own else s
+            for s in sessions
+        ]
+
+    def switch_client(self, name: str) -> None:
+        """Switch the client running this process to the given session.
+
+        In control mode the "current client" would be our own control client,
+        so the target client is resolved explicitly from $TMUX_PANE.
+        """
+        self._run(*self._switch_client_args(name))
+
+    def _switch_client_args(self, target: str) -> List[str]:
+        client = self._current_client()
+        if client is None:
+            return super()._switch_client_args(target)
+        return ["switch-client", "-c", client, "-t", target]
+
+    def _current_client(self) -> Optional[str]:
+        """Return the most recently active real client on our pane's session."""
+        pane = os.environ.get("TMUX_PANE")
+        if not pane:
+            return None
+        try:
+            output = self._run(
+                "list-clients",
+                "-t",
+                pane,
+                "-F",
+                "#{client_control_mode}\t#{client_activity}\t#{client_name}",
+            )
+        except TmuxCommandError:
+            return None
+
+        best: Optional[Tuple[int, str]] = None
+        for line in output.splitlines():
+            control, activity, name = line.split("\t", 2)
+            if control == "1":
+                continue
+            candidate = (int(activity or 0), name)
+            if best is None or candidate > best:
+                best = candidate
+        return None if best is None else best[1]
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from typing import Callable, List, NamedTuple, Optional
+
+
+class CommandEvent(NamedTuple):
+    """One tmux command line, as run by a transport."""
+
+    argv: List[str]
+    returncode: int
+    seconds: float
+    # Bytes of stdout and stderr read back (UTF-8).
+    bytes_read: int
+    # "subprocess", "control" or "async".
+    transport: str
+
+
+# Transports report every command through emit(); nothing is built unless
+# something is listening (see ytpm.core.profile), so with profiling off the
+# cost per command is a clock read and this global lookup.
+observer: Optional[Callable[[CommandEvent], None]] = None
+
+
+def emit(
+    argv: List[str], returncode: int, seconds: float, stdout: str, stderr: str, transport: str
+) -> None:
+    if observer is not None:
+        size = len(stdout.encode()) + len(stderr.encode())
+        observer(CommandEvent(argv, returncode, seconds, size, transport))
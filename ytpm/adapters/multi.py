@@ -0,0 +1,396 @@
+from __future__ import annotations
+
+import os
+import shlex
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+from ytpm.adapters.batch import SKIPPED, BatchResult
+from ytpm.adapters.server import server_socket
+from ytpm.adapters.session import Pane, Session
+
+T = TypeVar("T")
+
+# Between a server's label and a session name, window or pane ID. tmux
+# never allows ":" in session names, so "work:api" can't be a local name.
+SEP = ":"
+
+# Operations that act on the user's tmux client; they run after the rest
+# of a batch, once the sessions they go to exist.
+CLIENT_OPS = ("switch_client", "attach")
+
+
+class ServerRoutingError(RuntimeError):
+    """Raised when an operation can't be sent to exactly one server."""
+
+
+def qualify(server: str, name: str) -> str:
+    return f"{server}{SEP}{name}"
+
+
+def server_label(socket: str) -> str:
+    """Label of a server given as a socket name (tmux -L) or path (tmux -S)."""
+    return os.path.basename(socket)
+
+
+def socket_options(socket: str) -> Dict[str, str]:
+    """TmuxAdapter keyword arguments selecting `socket`: a path if it has a /."""
+    if os.sep in socket:
+        return {"socket_path": socket}
+    return {"socket_name": socket}
+
+
+class MultiServerAdapter:
+    """Several tmux servers behind one adapter.
+
+    Sessions of all servers are listed together, with their names, window
+    and pane IDs qualified by the server's label ("work:api", "work:%3") and
+    `Session.server` set. Reads go to every server at once from a thread
+    pool, so listing N servers costs about as long as the slowest of them.
+
+    Operations are sent to the server their name or target is qualified
+    with; an unqualified session name goes to the one server that has it,
+    or to the first server if none does.
+    """
+
+    def __init__(
+        self,
+        adapters: Dict[str, Any],
+        current: Optional[str] = None,
+        client: Any = None,
+        max_workers: int = 16,
+    ) -> None:
+        if not adapters:
+            raise ValueError("MultiServerAdapter needs at least one server")
+        for label in adapters:
+            if not label or SEP in label:
+                raise ValueError(f"invalid server label {label!r}")
+        self.adapters = dict(adapters)
+        # Label of the server the current tmux client (our pane) is on, if
+        # it is one of ours; `client` talks to that server even if it isn't.
+        self.current = current
+        self.client = client if client is not None else self.adapters.get(current or "")
+        self.max_workers = max_workers
+
+    @classmethod
+    def from_sockets(cls, sockets: Sequence[str], **kwargs: Any) -> "MultiServerAdapter":
+        """One TmuxAdapter per socket name or path; extra arguments go to each."""
+        from ytpm.adapters.tmux import TmuxAdapter
+
+        adapters: Dict[str, Any] = {}
+        for socket in sockets:
+            label = server_label(socket)
+            if label in adapters:
+                raise ValueError(f"two tmux servers are called {label!r}")
+            adapters[label] = TmuxAdapter(**socket_options(socket), **kwargs)
+
+        current = client = None
+        env = os.environ.get("TMUX")
+        if env:
+            ours = env.split(",", 1)[0]
+            for label, adapter in adapters.items():
+                if server_socket(adapter.socket_name, adapter.socket_path) == ours:
+                    current = label
+                    break
+            else:
+                client = TmuxAdapter(socket_path=ours, **kwargs)
+        return cls(adapters, current=current, client=client)
+
+    def fan_out(self, calls: Sequence[Callable[[], T]]) -> List[T]:
+        """Run `calls` concurrently; their results in order, or the first error."""
+        if len(calls) == 1:
+            return [calls[0]()]
+        # Threads, not asyncio: each call spends its time waiting on a tmux
+        # subprocess, and the adapters are synchronous.
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(len(calls), self.max_workers)) as pool:
+            futures = [pool.submit(call) for call in calls]
+        return [f.result() for f in futures]
+
+    def batch(self) -> MultiServerBatch:
+        return MultiServerBatch(self)
+
+    def list_sessions(self) -> List[Session]:
+        listed = self.fan_out([a.list_sessions for a in self.adapters.values()])
+        return [
+            s._replace(
+                name=qualify(label, s.name),
+                id=qualify(label, s.id) if s.id else "",
+                server=label,
+            )
+            for label, sessions in zip(self.adapters, listed)
+            for s in sessions
+        ]
+
+    def list_panes(self) -> List[Pane]:
+        listed = self.fan_out([a.list_panes for a in self.adapters.values()])
+        return [
+            p._replace(
+                session=qualify(label, p.session),
+                window_id=qualify(label, p.window_id),
+                id=qualify(label, p.id),
+            )
+            for label, panes in zip(self.adapters, listed)
+            for p in panes
+        ]
+
+    def attached_clients(self) -> Dict[str, int]:
+        listed = self.fan_out([a.attached_clients for a in self.adapters.values()])
+        return {
+            qualify(label, session_id): count
+            for label, counts in zip(self.adapters, listed)
+            for session_id, count in counts.items()
+        }
+
+    def session_exists(self, name: str) -> bool:
+        server, local = self.split(name)
+        if server is not None:
+            return self.adapters[server].session_exists(local)
+        return bool(self.owners([name]).get(name))
+
+    def owners(self, names: Iterable[str]) -> Dict[str, List[str]]:
+        """Labels of the servers that have a session called each of `names`."""
+        wanted = set(names)
+        found: Dict[str, List[str]] = {name: [] for name in wanted}
+        listed = self.fan_out([a.list_sessions for a in self.adapters.values()])
+        for label, sessions in zip(self.adapters, listed):
+            for s in sessions:
+                if s.name in wanted:
+                    found[s.name].append(label)
+        return found
+
+    def split(self, target: str) -> Tuple[Optional[str], str]:
+        """(server label, target on that server); no label if unqualified."""
+        exact = "=" if target.startswith("=") else ""
+        server, sep, rest = target[len(exact) :].partition(SEP)
+        if sep and server in self.adapters:
+            return server, exact + rest
+        return None, target
+
+    def create_session(self, name: str, cwd: str, window: str = "") -> None:
+        self._single("create_session", name, cwd, False, window)
+
+    def attach(self, name: str) -> None:
+        self._single("attach", name)
+
+    def switch_client(self, name: str) -> None:
+        self._single("switch_client", name)
+
+    def kill_session(self, name: str) -> None:
+        self._single("kill_session", name)
+
+    def set_hooks(self, events: Iterable[str], command: str, index: int) -> None:
+        events = list(events)
+        self.fan_out(
+            [lambda a=a: a.set_hooks(events, command, index) for a in self.adapters.values()]
+        )
+
+    def new_window(self, session: str, name: str, cwd: str) -> None:
+        self._single("new_window", session, name, cwd)
+
+    def split_window(self, target: str, cwd: str) -> None:
+        self._single("split_window", target, cwd)
+
+    def rename_window(self, target: str, name: str) -> None:
+        self._single("rename_window", target, name)
+
+    def kill_window(self, target: str) -> None:
+        self._single("kill_window", target)
+
+    def kill_pane(self, target: str) -> None:
+        self._single("kill_pane", target)
+
+    def send_keys(self, target: str, text: str) -> None:
+        self._single("send_keys", target, text)
+
+    def select_layout(self, target: str, layout: str) -> None:
+        self._single("select_layout", target, layout)
+
+    def set_option(self, target: str, option: str, value: str) -> None:
+        self._single("set_option", target, option, value)
+
+    def select_window(self, target: str) -> None:
+        self._single("select_window", target)
+
+    def select_pane(self, target: str) -> None:
+        self._single("select_pane", target)
+
+    def respawn_pane(self, target: str, cwd: str, command: str) -> None:
+        self._single("respawn_pane", target, cwd, command)
+
+    def capture_pane(self, target: str, history: bool = False) -> str:
+        batch = self.batch()
+        batch.capture_pane(target, history)
+        return batch.run(check=True)[0].output
+
+    def _single(self, op: str, *args: Any) -> None:
+        batch = self.batch()
+        getattr(batch, op)(*args)
+        batch.run(check=True)
+
+
+class MultiServerBatch:
+    """Splits a batch into one batch per server and runs those concurrently.
+
+    Each server's operations keep their order and its batch its semantics
+    (the first failure skips the rest of that server's operations).
+    switch_client and attach run last; going to a session on another
+    server than the client's replaces the client with one attached there
+    (detach-client -E).
+    """
+
+    def __init__(self, adapter: MultiServerAdapter) -> None:
+        self._adapter = adapter
+        # (op, routed name or target, other arguments)
+        self._ops: List[Tuple[str, str, Tuple[Any, ...]]] = []
+
+    def __len__(self) -> int:
+        return len(self._ops)
+
+    def create_session(
+        self, name: str, cwd: str, exist_ok: bool = False, window: str = ""
+    ) -> None:
+        self._ops.append(("create_session", name, (cwd, exist_ok, window)))
+
+    def switch_client(self, name: str) -> None:
+        self._ops.append(("switch_client", name, ()))
+
+    def attach(self, name: str) -> None:
+        self._ops.append(("attach", name, ()))
+
+    def kill_session(self, name: str, missing_ok: bool = False) -> None:
+        self._ops.append(("kill_session", name, (missing_ok,)))
+
+    def new_window(self, session: str, name: str, cwd: str) -> None:
+        self._ops.append(("new_window", session, (name, cwd)))
+
+    def split_window(self, target: str, cwd: str) -> None:
+        self._ops.append(("split_window", target, (cwd,)))
+
+    def rename_window(self, target: str, name: str) -> None:
+        self._ops.append(("rename_window", target, (name,)))
+
+    def kill_window(self, target: str) -> None:
+        self._ops.append(("kill_window", target, ()))
+
+    def kill_pane(self, target: str) -> None:
+        self._ops.append(("kill_pane", target, ()))
+
+    def send_keys(self, target: str, text: str) -> None:
+        self._ops.append(("send_keys", target, (text,)))
+
+    def select_layout(self, target: str, layout: str) -> None:
+        self._ops.append(("select_layout", target, (layout,)))
+
+    def set_option(self, target: str, option: str, value: str) -> None:
+        self._ops.append(("set_option", target, (option, value)))
+
+    def select_window(self, target: str) -> None:
+        self._ops.append(("select_window", target, ()))
+
+    def select_pane(self, target: str) -> None:
+        self._ops.append(("select_pane", target, ()))
+
+    def respawn_pane(self, target: str, cwd: str, command: str) -> None:
+        self._ops.append(("respawn_pane", target, (cwd, command)))
+
+    def capture_pane(self, target: str, history: bool = False) -> None:
+        self._ops.append(("capture_pane", target, (history,)))
+
+    def run(self, check: bool = False) -> List[BatchResult]:
+        ops, self._ops = self._ops, []
+        routes = self._routes(ops)
+
+        results: List[Optional[BatchResult]] = [None] * len(ops)
+        work = [i for i, (op, _, _) in enumerate(ops) if op not in CLIENT_OPS]
+        self._run_servers(ops, routes, work, results, check)
+        client = [i for i, (op, _, _) in enumerate(ops) if op in CLIENT_OPS]
+        if any(not r.ok for r in results if r is not None):
+            for i in client:
+                results[i] = BatchResult(ops[i][0], False, error=SKIPPED)
+        elif client:
+            self._run_client(ops, routes, client, results, check)
+        return [r for r in results if r is not None]
+
+    def _routes(self, ops: List[Tuple[str, str, Tuple[Any, ...]]]) -> List[Tuple[str, str]]:
+        """(server label, local target) for each op; one listing resolves
+        all unqualified session names."""
+        adapter = self._adapter
+        split = [adapter.split(target) for _, target, _ in ops]
+        names = {_session_of(t) for server, t in split if server is None}
+        names.discard("")
+        owners = adapter.owners(names) if names else {}
+
+        default = next(iter(adapter.adapters))
+        routes: List[Tuple[str, str]] = []
+        for server, target in split:
+            if server is None:
+                found = owners.get(_session_of(target)) or [default]
+                if len(found) > 1:
+                    raise ServerRoutingError(
+                        f"session {_session_of(target)!r} exists on several tmux servers "
+                        f"({', '.join(found)}); name one as SERVER{SEP}NAME"
+                    )
+                server = found[0]
+            routes.append((server, target))
+        return routes
+
+    def _run_servers(
+        self,
+        ops: List[Tuple[str, str, Tuple[Any, ...]]],
+        routes: List[Tuple[str, str]],
+        indices: List[int],
+        results: List[Optional[BatchResult]],
+        check: bool,
+    ) -> None:
+        by_server: Dict[str, List[int]] = {}
+        for i in indices:
+            by_server.setdefault(routes[i][0], []).append(i)
+        if not by_server:
+            return
+
+        def run_one(server: str, members: List[int]) -> List[BatchResult]:
+            batch = self._adapter.adapters[server].batch()
+            for i in members:
+                op, _, args = ops[i]
+                getattr(batch, op)(routes[i][1], *args)
+            return batch.run(check=check)
+
+        listed = self._adapter.fan_out(
+            [lambda s=s, m=m: run_one(s, m) for s, m in by_server.items()]
+        )
+        for members, server_results in zip(by_server.values(), listed):
+            for i, r in zip(members, server_results):
+                results[i] = r
+
+    def _run_client(
+        self,
+        ops: List[Tuple[str, str, Tuple[Any, ...]]],
+        routes: List[Tuple[str, str]],
+        indices: List[int],
+        results: List[Optional[BatchResult]],
+        check: bool,
+    ) -> None:
+        adapter = self._adapter
+        for i in indices:
+            op, _, _ = ops[i]
+            server, target = routes[i]
+            if op == "attach" or server == adapter.current:
+                batch = adapter.adapters[server].batch()
+                getattr(batch, op)(target)
+            elif adapter.client is None:
+                raise ServerRoutingError("not inside a tmux client to switch")
+            else:
+                batch = adapter.client.batch()
+                batch.detach_client(_attach_command(adapter.adapters[server], target))
+            [results[i]] = [r._replace(op=op) for r in batch.run(check=check)]
+
+
+def _session_of(target: str) -> str:
+    """Session name a local target refers to; "" for window and pane IDs."""
+    name = target.lstrip("=").partition(SEP)[0]
+    return "" if name[:1] in ("$", "@", "%") else name
+
+
+def _attach_command(adapter: Any, name: str) -> str:
+    return shlex.join([*adapter.command_prefix, "attach-session", "-t", f"={name}"])
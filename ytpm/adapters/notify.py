@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Callable, List, Optional, Sequence
+
+from ytpm.adapters.session import Session
+
+
+class ControlSubscriber:
+    """Watches tmux for session changes over a dedicated `tmux -C` client.
+
+    tmux pushes notifications (`%sessions-changed`, `%window-add`, ...) to
+    control clients on its own, so watching costs no tmux traffic while
+    nothing happens. Notifications are coalesced: `on_change` runs once,
+    `debounce` seconds after the last event of a burst, and at most
+    `max_delay` seconds after the first one, so a mass kill of sessions
+    produces a single refresh.
+
+    If the connection drops or no server is running, it reconnects with
+    exponential backoff and calls `on_change` after every (re)connect, since
+    changes may have been missed in between.
+    """
+
+    # Notifications that can change what a session list shows.
+    EVENTS = frozenset(
+        {
+            "%sessions-changed",
+            "%session-renamed",
+            "%session-window-changed",
+            "%window-add",
+            "%window-close",
+            "%unlinked-window-add",
+            "%unlinked-window-close",
+            "%client-session-changed",
+            "%client-detached",
+        }
+    )
+
+    def __init__(
+        self,
+        on_change: Callable[[], None],
+        binary: str = "tmux",
+        debounce: float = 0.1,
+        max_delay: float = 0.5,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 30.0,
+        flags: Sequence[str] = (),
+    ) -> None:
+        self.on_change = on_change
+        self.binary = binary
+        # Server selection (-L/-S), see ytpm.adapters.server.socket_flags.
+        self.flags = list(flags)
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        # Session our own client is attached to; it shows up as "attached".
+        self.session_id: Optional[str] = None
+        # True while attached, i.e. while no change can go unnoticed.
+        self.connected = False
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._burst_started: Optional[float] = None
+
+    async def run(self) -> None:
+        """Listen until cancelled."""
+        delay = self.retry_delay
+        try:
+            while True:
+                connected = await self._listen_once()
+                # Only failed connects back off; a dropped connection retries soon.
+                delay = self.retry_delay if connected else min(delay * 2, self.max_retry_delay)
+                await asyncio.sleep(delay)
+        finally:
+            self._cancel_timer()
+
+    async def _listen_once(self) -> bool:
+        """Run one control client until it exits. Returns True if it attached."""
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                self.binary,
+                *self.flags,
+                "-C",
+                "attach-session",
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                limit=1 << 20,
+            )
+        except OSError:
+            return False
+        assert proc.stdin is not None and proc.stdout is not None
+
+        attached = False
+        try:
+            # Time, command number and flags of the open reply block.
+            block: Optional[List[str]] = None
+            while True:
+                try:
+                    raw = await proc.stdout.readline()
+                except ValueError:
+                    # A line over the limit (old tmux streaming %output); skip.
+                    continue
+                if not raw:
+                    break
+                line = raw.decode(errors="replace").rstrip("\n")
+                if block is None and line.startswith("%begin "):
+                    block = line.split()[1:]
+                elif block is not None:
+                    # Only the guard line matching the %begin ends the block;
+                    # a reply line may start with "%end " too.
+                    if line.startswith(("%end ", "%error ")) and line.split()[1:3] == block[:2]:
+                        # The first block not sent by us is attach-session.
+                        if not attached and block[2:] == ["0"] and line.startswith("%end "):
+                            attached = True
+                            self.connected = True
+                            # We only want notifications, never pane output
+                            # or a say in window sizes.
+                            proc.stdin.write(b"refresh-client -f no-output,ignore-size\n")
+                            await proc.stdin.drain()
+                            self._schedule()
+                        block = None
+                elif line.startswith("%exit"):
+                    break
+                else:
+                    self.feed(line)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.session_id = None
+            self.connected = False
+            if proc.returncode is None:
+                # Killing a control client just detaches it from the server.
+                proc.kill()
+            await proc.wait()
+        if attached:
+            # The server may be gone; let the listener find out.
+            self._schedule()
+        return attached
+
+    def feed(self, line: str) -> None:
+        """Handle one notification line."""
+        event, _, rest = line.partition(" ")
+        if event == "%session-changed":
+            self.session_id = rest.split(" ", 1)[0]
+            self._schedule()
+        elif event in self.EVENTS:
+            self._schedule()
+
+    def discount(self, sessions: List[Session]) -> List[Session]:
+        """Don't count our own client as someone attached to a session."""
+        own = self.session_id
+        if own is None:
+            return sessions
+        return [
+            s._replace(attached=max(s.attached - 1, 0)) if s.id == own else s
+            for s in sessions
+        ]
+
+    # --- coalescing ---
+
+    def _schedule(self) -> None:
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+        if self._burst_started is None:
+            self._burst_started = now
+        self._cancel_timer(reset=False)
+        remaining = self.max_delay - (now - self._burst_started)
+        self._timer = loop.call_later(max(0.0, min(self.debounce, remaining)), self._fire)
+
+    def _fire(self) -> None:
+        self._timer = None
+        self._burst_started = None
+        self.on_change()
+
+    def _cancel_timer(self, reset: bool = True) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if reset:
+            self._burst_started = None
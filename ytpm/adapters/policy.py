@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import os
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+# Commands that hold the caller's terminal for as long as the user likes.
+UNBOUNDED = ("attach", "attach-session")
+
+# Seconds a line's deadline grows by for each of these after its first
+# command, instead of per_command: new-session forks a shell, and
+# kill-session tears down the processes of every pane.
+ALLOWANCES = {"new-session": 0.5, "kill-session": 0.5}
+
+
+class CommandPolicy:
+    """Deadlines and retries for the tmux commands an adapter runs.
+
+    A plain class rather than a dataclass: it is built on every CLI run, and
+    importing dataclasses costs more than the rest of the fast path.
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = 5.0,
+        timeouts: Optional[Dict[str, Optional[float]]] = None,
+        per_command: float = 0.1,
+        allowances: Optional[Dict[str, float]] = None,
+        retries: int = 2,
+        backoff: float = 0.05,
+        breaker_threshold: int = 3,
+        breaker_cooldown: float = 30.0,
+    ) -> None:
+        # Seconds a command line may take, retries included; None waits forever.
+        self.timeout = timeout
+        # Per tmux command overrides, e.g. {"capture-pane": 1.0}. A line with
+        # several commands gets the largest of their deadlines.
+        self.timeouts: Dict[str, Optional[float]] = {name: None for name in UNBOUNDED}
+        self.timeouts.update(timeouts or {})
+        # Extra seconds for every command after the first on a line, so big
+        # batches (e.g. 200 new-session) aren't held to one command's budget;
+        # `allowances` overrides it per command (see ALLOWANCES).
+        self.per_command = per_command
+        self.allowances = dict(ALLOWANCES)
+        self.allowances.update(allowances or {})
+        # Retries after tmux lost its server mid-command; the first waits
+        # `backoff` seconds, each later one twice as long.
+        self.retries = retries
+        self.backoff = backoff
+        # Timeouts in a row after which commands fail at once, and for how
+        # long; see CircuitBreaker.
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+
+    @classmethod
+    def from_env(cls) -> "CommandPolicy":
+        """Defaults, with the timeout taken from $YTPM_TMUX_TIMEOUT if set (0: none)."""
+        policy = cls()
+        raw = os.environ.get("YTPM_TMUX_TIMEOUT")
+        if raw:
+            try:
+                seconds = float(raw)
+            except ValueError:
+                raise ValueError(
+                    f"YTPM_TMUX_TIMEOUT must be a number of seconds, got {raw!r}"
+                ) from None
+            policy.timeout = seconds if seconds > 0 else None
+        return policy
+
+    def timeout_for(self, commands: Iterable[str]) -> Optional[float]:
+        """Deadline (seconds) of a command line running `commands`."""
+        commands = list(commands)
+        deadlines = [self.timeouts.get(name, self.timeout) for name in commands]
+        if not deadlines:
+            return self.timeout
+        bounded = [d for d in deadlines if d is not None]
+        if len(bounded) < len(deadlines):
+            return None
+        return max(bounded) + sum(
+            self.allowances.get(name, self.per_command) for name in commands[1:]
+        )
+
+
+class CircuitBreaker:
+    """Fails fast while tmux keeps timing out, instead of waiting out each one.
+
+    After `threshold` timeouts in a row the breaker opens: remaining() says
+    how long commands should fail without running. Once `cooldown` has
+    passed, one command is let through as a trial; an answer closes the
+    breaker, another timeout opens it again.
+    """
+
+    def __init__(
+        self,
+        threshold: int = 3,
+        cooldown: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+
+    @property
+    def open(self) -> bool:
+        return self._opened_at is not None
+
+    def remaining(self) -> float:
+        """Seconds until commands may run again; 0 when they may run now."""
+        if self._opened_at is None:
+            return 0.0
+        left = self._opened_at + self.cooldown - self._clock()
+        if left <= 0:
+            # Half-open: this caller is the trial; others wait for its result.
+            self._opened_at = self._clock()
+            return 0.0
+        return left
+
+    def success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+
+    def failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self._opened_at = self._clock()
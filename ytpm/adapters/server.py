@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import os
+
+# Kept free of heavy imports (typing included): the CLI client uses it.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import List, Optional
+
+
+def server_socket(name: Optional[str] = None, path: Optional[str] = None) -> str:
+    """Socket of the tmux server a `tmux` command talks to.
+
+    With neither `name` (tmux -L) nor `path` (tmux -S), that's the server of
+    the current pane ($TMUX) inside tmux, otherwise the default socket.
+    """
+    if path:
+        return path
+    if not name:
+        env = os.environ.get("TMUX")
+        if env:
+            return env.split(",", 1)[0]
+    return os.path.join(socket_dir(), name or "default")
+
+
+def socket_dir() -> str:
+    """Directory tmux keeps this user's server sockets in."""
+    tmpdir = os.environ.get("TMUX_TMPDIR") or "/tmp"
+    return os.path.join(tmpdir, f"tmux-{os.getuid()}")
+
+
+def socket_flags(name: Optional[str] = None, path: Optional[str] = None) -> List[str]:
+    """tmux options selecting a server: -S path, -L name, or none (the default)."""
+    if path:
+        return ["-S", path]
+    if name:
+        return ["-L", name]
+    return []
+
+
+def server_running(path: str) -> bool:
+    """Whether a tmux server accepts connections on the socket at `path`.
+
+    A missing socket, or one left behind by a dead server (connection
+    refused), means no server.
+    """
+    import socket
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(0.5)
+    try:
+        sock.connect(path)
+    except (BlockingIOError, socket.timeout):
+        # Its backlog is full: busy, but there.
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+    return True
+
+
+def live_servers() -> List[str]:
+    """Sockets of every tmux server of this user that is running, sorted."""
+    directory = socket_dir()
+    try:
+        names = sorted(os.listdir(directory))
+    except OSError:
+        return []
+    sockets = [os.path.join(directory, name) for name in names]
+    return [path for path in sockets if server_running(path)]
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from typing import NamedTuple
+
+
+class Session(NamedTuple):
+    """One multiplexer session, as reported by a single list call."""
+
+    name: str
+    id: str = ""
+    attached: int = 0
+    windows: int = 0
+    activity: int = 0
+    created: int = 0
+    path: str = ""
+    # Label of the tmux server it is on; "" unless several are listed together.
+    server: str = ""
+
+
+class Pane(NamedTuple):
+    """One pane, with the window and session it belongs to."""
+
+    session: str
+    window_id: str
+    window_index: int
+    window_name: str
+    id: str
+    index: int = 0
+    path: str = ""
+    # Value of the session's WORKSPACE_OPTION ("" unless ytpm apply created it).
+    workspace: str = ""
+    # tmux's layout string of the window, e.g. "b25d,80x24,0,0{...}".
+    layout: str = ""
+    window_active: bool = False
+    active: bool = False
+    # Process ID of what runs in the pane (its shell, usually).
+    pid: int = 0
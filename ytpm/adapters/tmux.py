@@ -1,30 +1,460 @@
 from __future__ import annotations
 
+import os
 import shutil
 import subprocess
-from typing import List
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ytpm.adapters import events
+from ytpm.adapters.batch import SKIPPED, BatchResult
+from ytpm.adapters.policy import CircuitBreaker, CommandPolicy
+from ytpm.adapters.server import server_running, server_socket, socket_flags
+from ytpm.adapters.session import Pane, Session
 
 
 class TmuxNotFoundError(RuntimeError):
     """Raised when tmux binary is not available on PATH."""
 
 
+# What a failed command line means, see classify_error().
+COMMAND_FAILED = "command"
+NO_SERVER = "no-server"
+SERVER_EXITED = "server-exited"
+
+
 class TmuxCommandError(RuntimeError):
-    """Raised when a tmux command fails."""
+    """Raised when a tmux command fails.
 
-    def __init__(self, command: list[str], stderr: str, returncode: int) -> None:
+    `kind` is COMMAND_FAILED, NO_SERVER or SERVER_EXITED.
+    """
+
+    def __init__(
+        self, command: list[str], stderr: str, returncode: int, kind: str = COMMAND_FAILED
+    ) -> None:
         self.command = command
         self.stderr = stderr
         self.returncode = returncode
+        self.kind = kind
         message = f"tmux command failed ({returncode}): {' '.join(command)}\n{stderr}"
         super().__init__(message)
 
 
+class TmuxTimeoutError(RuntimeError):
+    """Raised when tmux does not answer within the allowed time."""
+
+    def __init__(self, command: list[str], timeout: float) -> None:
+        self.command = command
+        self.timeout = timeout
+        # The message without the (possibly very long) command line.
+        self.summary = f"tmux did not answer within {timeout:.3g}s"
+        super().__init__(f"{self.summary}: {' '.join(command)}")
+
+
+class TmuxUnavailableError(TmuxTimeoutError):
+    """Raised without running the command while tmux keeps timing out."""
+
+    def __init__(self, command: list[str], retry_in: float) -> None:
+        self.command = command
+        self.timeout = 0.0
+        self.retry_in = retry_in
+        self.summary = f"tmux is not answering; not trying again for {retry_in:.0f}s"
+        RuntimeError.__init__(self, f"{self.summary}: {' '.join(command)}")
+
+
+# tmux rejects a command line whose arguments don't fit in one client
+# message (16k) with "command too long"; batches split their lines below it.
+MAX_COMMAND_BYTES = 12_000
+
+# Field separator for multi-field formats. tmux escapes control characters
+# in session names, so this can't collide with a name.
+FIELD_SEP = "\x1f"
+
+SESSION_FORMAT = FIELD_SEP.join(
+    [
+        "#{session_name}",
+        "#{session_id}",
+        "#{session_attached}",
+        "#{session_windows}",
+        "#{session_activity}",
+        "#{session_created}",
+        "#{session_path}",
+    ]
+)
+
+
+# Session user option that marks sessions created by `ytpm apply`.
+WORKSPACE_OPTION = "@ytpm-workspace"
+
+PANE_FORMAT = FIELD_SEP.join(
+    [
+        "#{session_name}",
+        "#{window_id}",
+        "#{window_index}",
+        "#{window_name}",
+        "#{pane_id}",
+        "#{pane_index}",
+        "#{pane_current_path}",
+        "#{window_layout}",
+        "#{window_active}",
+        "#{pane_active}",
+        "#{pane_pid}",
+        # Last: it is the field that may be empty.
+        "#{" + WORKSPACE_OPTION + "}",
+    ]
+)
+
+
+def _int(value: str) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        return 0
+
+
+def parse_session_line(line: str) -> Session:
+    """Parse one line of `list-sessions -F SESSION_FORMAT` output."""
+    name, id_, attached, windows, activity, created, path = line.split(FIELD_SEP, 6)
+    return Session(
+        name=name,
+        id=id_,
+        attached=_int(attached),
+        windows=_int(windows),
+        activity=_int(activity),
+        created=_int(created),
+        path=path,
+    )
+
+
+def parse_pane_line(line: str) -> Pane:
+    """Parse one line of `list-panes -a -F PANE_FORMAT` output."""
+    fields = line.split(FIELD_SEP, 11)
+    # str.strip() counts FIELD_SEP as whitespace, so an empty last field
+    # may have lost its separator.
+    fields += [""] * (12 - len(fields))
+    (
+        session,
+        window_id,
+        window_index,
+        window_name,
+        id_,
+        index,
+        path,
+        layout,
+        window_active,
+        active,
+        pid,
+        workspace,
+    ) = fields
+    return Pane(
+        session=session,
+        window_id=window_id,
+        window_index=_int(window_index),
+        window_name=window_name,
+        id=id_,
+        index=_int(index),
+        path=path,
+        workspace=workspace,
+        layout=layout,
+        window_active=window_active == "1",
+        active=active == "1",
+        pid=_int(pid),
+    )
+
+
+# What the tmux client prints, as its whole output, when its server went
+# away before answering (client_exit_message() in tmux's client.c).
+LOST_SERVER_MESSAGES = frozenset({"server exited unexpectedly", "lost server"})
+
+
+def lost_server(returncode: int, stderr: str) -> bool:
+    """Return True if tmux failed because its server went away mid-command."""
+    return returncode == 1 and stderr.strip() in LOST_SERVER_MESSAGES
+
+
+def classify_error(returncode: int, stderr: str, socket: str) -> str:
+    """What a failed command line means: NO_SERVER, SERVER_EXITED or COMMAND_FAILED.
+
+    tmux exits with 1 for every failure, so the server is checked directly:
+    when nothing accepts connections on its socket, the command failed
+    because there is no server, whatever the message says.
+    """
+    if returncode != 1:
+        # Killed by a signal, or not tmux's own failure.
+        return COMMAND_FAILED
+    if lost_server(returncode, stderr):
+        return SERVER_EXITED
+    if not server_running(socket):
+        return NO_SERVER
+    return COMMAND_FAILED
+
+
+def is_no_server_error(error: TmuxCommandError) -> bool:
+    """Return True if the command failed only because no server is running."""
+    return error.kind == NO_SERVER
+
+
+def line_commands(args: Iterable[str]) -> List[str]:
+    """Names of the tmux commands on a command line (without the binary)."""
+    names: List[str] = []
+    expect_command = True
+    for arg in args:
+        if arg == ";":
+            expect_command = True
+        elif expect_command:
+            names.append(arg)
+            expect_command = False
+    return names
+
+
+def quote_arg(arg: str) -> str:
+    """Quote a single argument for tmux's command parser.
+
+    A bare ";" is kept as-is so it still separates commands, the same way a
+    lone ";" argument does on the tmux command line.
+    """
+    if arg == ";":
+        return arg
+    return "'" + arg.replace("'", "'\\''") + "'"
+
+
+def session_exists_format(name: str) -> str:
+    """Return a tmux format that expands to "1" if session `name` exists."""
+    escaped = name.replace("#", "##").replace(",", "#,").replace("}", "#}")
+    # A lookup by exact name; looping over sessions with #{S:...} made
+    # every guarded op cost as much as the server has sessions.
+    return "#{N/s:" + escaped + "}"
+
+
+# Ops whose command may be nested in an existence guard (if-shell), by
+# the command they run.
+GUARDED = {"create_session": "new-session", "kill_session": "kill-session"}
+
+
+class TmuxBatch:
+    """Collects tmux operations and runs them as one tmux invocation.
+
+    Operations are joined with ";" on a single command line (several for
+    batches too big for one tmux command). A marker is printed after each
+    one, so run() can split the output per operation and tell where tmux
+    stopped if one of them failed. Existence checks are
+    evaluated by tmux itself (if-shell -F), so there is no gap between check
+    and action for another ytpm process to slip into.
+
+    attach is the exception: it takes over the terminal until the client
+    detaches, so it runs after everything else as a plain
+    `tmux attach-session` of its own (see TmuxAdapter._interactive).
+    """
+
+    def __init__(self, adapter: "TmuxAdapter") -> None:
+        self._adapter = adapter
+        self._ops: List[Tuple[str, List[str]]] = []
+        self._nonce = os.urandom(6).hex()
+
+    def __len__(self) -> int:
+        return len(self._ops)
+
+    def create_session(
+        self, name: str, cwd: str, exist_ok: bool = False, window: str = ""
+    ) -> None:
+        args = ["new-session", "-d", "-s", name, "-c", cwd]
+        if window:
+            args += ["-n", window]
+        if exist_ok:
+            args = self._unless_exists(name, args)
+        self._ops.append(("create_session", args))
+
+    def switch_client(self, name: str) -> None:
+        self._ops.append(("switch_client", self._adapter._switch_client_args(f"={name}")))
+
+    def attach(self, name: str) -> None:
+        self._ops.append(("attach", ["attach-session", "-t", f"={name}"]))
+
+    def detach_client(self, command: str) -> None:
+        # The client runs `command` in its terminal instead (e.g. an attach
+        # to another server).
+        self._ops.append(("detach_client", ["detach-client", "-E", command]))
+
+    def kill_session(self, name: str, missing_ok: bool = False) -> None:
+        args = ["kill-session", "-t", f"={name}"]
+        if missing_ok:
+            args = ["if-shell", "-F", session_exists_format(name), self._join(args)]
+        self._ops.append(("kill_session", args))
+
+    # Layout operations. `target` is a window or pane ID (@1, %2) or any
+    # other tmux target; new windows are added at the end of the session,
+    # so "={session}:{end}" refers to the one just created.
+
+    def new_window(self, session: str, name: str, cwd: str) -> None:
+        args = ["new-window", "-d", "-a", "-t", f"={session}:{{end}}", "-n", name, "-c", cwd]
+        self._ops.append(("new_window", args))
+
+    def split_window(self, target: str, cwd: str) -> None:
+        self._ops.append(("split_window", ["split-window", "-t", target, "-c", cwd]))
+
+    def rename_window(self, target: str, name: str) -> None:
+        self._ops.append(("rename_window", ["rename-window", "-t", target, name]))
+
+    def kill_window(self, target: str) -> None:
+        self._ops.append(("kill_window", ["kill-window", "-t", target]))
+
+    def kill_pane(self, target: str) -> None:
+        self._ops.append(("kill_pane", ["kill-pane", "-t", target]))
+
+    def send_keys(self, target: str, text: str) -> None:
+        """Type `text` into the target's active pane and press Enter."""
+        args = ["send-keys", "-t", target, "-l", text, ";", "send-keys", "-t", target, "Enter"]
+        self._ops.append(("send_keys", args))
+
+    def select_layout(self, target: str, layout: str) -> None:
+        self._ops.append(("select_layout", ["select-layout", "-t", target, layout]))
+
+    def set_option(self, target: str, option: str, value: str) -> None:
+        self._ops.append(("set_option", ["set-option", "-t", target, option, value]))
+
+    def select_window(self, target: str) -> None:
+        self._ops.append(("select_window", ["select-window", "-t", target]))
+
+    def select_pane(self, target: str) -> None:
+        self._ops.append(("select_pane", ["select-pane", "-t", target]))
+
+    def respawn_pane(self, target: str, cwd: str, command: str) -> None:
+        """Replace what runs in the pane with `command`, a shell command."""
+        args = ["respawn-pane", "-k", "-t", target, "-c", cwd, command]
+        self._ops.append(("respawn_pane", args))
+
+    def capture_pane(self, target: str, history: bool = False) -> None:
+        """Queue a capture of the pane's screen (and its scrollback, with
+        `history`), with colours; the text is the op's output."""
+        args = ["capture-pane", "-p", "-e", "-J", "-t", target]
+        if history:
+            args += ["-S", "-"]
+        self._ops.append(("capture_pane", args))
+
+    def run(self, check: bool = False) -> List[BatchResult]:
+        """Send all queued operations in one go and return one result per op.
+
+        Operations go on as few command lines as tmux accepts (see
+        MAX_COMMAND_BYTES); lines run in order and stop at the first failure.
+        With check=True a TmuxCommandError is raised if any operation failed.
+        Attaches run last, whatever their place in the queue.
+        """
+        queued, self._ops = self._ops, []
+        lines = [op for op in queued if op[0] != "attach"]
+        attaches = [op for op in queued if op[0] == "attach"]
+        ops = lines + attaches
+        results: List[BatchResult] = []
+        for line in self._lines(lines):
+            cmd, line_results, stderr, returncode = self._run_line(line)
+            results += line_results
+            if not all(r.ok for r in line_results):
+                results += [BatchResult(op, False, error=SKIPPED) for op, _ in ops[len(results):]]
+                if check:
+                    raise self._adapter._error(cmd, stderr, returncode or 1)
+                return results
+        for op, args in attaches:
+            cmd, returncode = self._adapter._interactive(args)
+            if returncode == 0:
+                results.append(BatchResult(op, True))
+                continue
+            # tmux told the terminal why itself.
+            results.append(BatchResult(op, False, error=f"tmux exited with code {returncode}"))
+            results += [BatchResult(op, False, error=SKIPPED) for op, _ in ops[len(results):]]
+            if check:
+                raise self._adapter._error(cmd, "", returncode)
+            break
+        return results
+
+    def _lines(self, ops: List[Tuple[str, List[str]]]) -> List[List[Tuple[str, List[str]]]]:
+        """Group ops so that no command line exceeds MAX_COMMAND_BYTES."""
+        lines: List[List[Tuple[str, List[str]]]] = [[]]
+        size = 0
+        for op in ops:
+            # Each argument is sent NUL-terminated, plus the marker command.
+            op_size = sum(len(a.encode()) + 1 for a in op[1]) + 64
+            if lines[-1] and size + op_size > MAX_COMMAND_BYTES:
+                lines.append([])
+                size = 0
+            lines[-1].append(op)
+            size += op_size
+        return [line for line in lines if line]
+
+    def _run_line(
+        self, ops: List[Tuple[str, List[str]]]
+    ) -> Tuple[List[str], List[BatchResult], str, int]:
+        cmd = list(self._adapter.command_prefix)
+        if any(op == "create_session" for op, _ in ops) and not self._adapter.server_running():
+            # new-session starts a server, but the if-shell guarding it
+            # needs one first.
+            cmd += ["start-server", ";"]
+        for i, (_, args) in enumerate(ops):
+            if i:
+                cmd.append(";")
+            cmd += [*args, ";", "display-message", "-p", self._marker(i)]
+        # The deadline goes by what each op runs, guarded ones included.
+        commands = [
+            name
+            for op, args in ops
+            for name in ([GUARDED[op]] if op in GUARDED else line_commands(args))
+        ]
+        returncode, stdout, stderr = self._adapter._call(cmd, commands)
+        stderr = stderr.strip()
+
+        results: List[BatchResult] = []
+        segment: List[str] = []
+        for line in stdout.splitlines():
+            if len(results) < len(ops) and line == self._marker(len(results)):
+                results.append(BatchResult(ops[len(results)][0], True, "\n".join(segment)))
+                segment = []
+            else:
+                segment.append(line)
+
+        if len(results) < len(ops):
+            error = stderr or f"tmux exited with code {returncode}"
+            results.append(BatchResult(ops[len(results)][0], False, "\n".join(segment), error))
+        elif returncode != 0:
+            # Every marker printed, so the failure came from a command nested
+            # in an if-shell; pin it on the last operation.
+            results[-1] = results[-1]._replace(ok=False, error=stderr)
+        return cmd, results, stderr, returncode
+
+    def _marker(self, index: int) -> str:
+        return f"ytpm-batch-{self._nonce}-{index}"
+
+    @staticmethod
+    def _join(args: List[str]) -> str:
+        return " ".join(quote_arg(a) for a in args)
+
+    def _unless_exists(self, name: str, args: List[str]) -> List[str]:
+        return ["if-shell", "-F", session_exists_format(name), "", self._join(args)]
+
+
 class TmuxAdapter:
-    """Thin wrapper around the tmux CLI."""
+    """Thin wrapper around the tmux CLI.
 
-    def __init__(self, binary: str = "tmux") -> None:
+    By default it talks to the server a plain `tmux` would; `socket_name`
+    (tmux -L) or `socket_path` (tmux -S) select another one.
+
+    Every command line runs under `policy` (see CommandPolicy): it gets a
+    deadline, after which TmuxTimeoutError is raised; it is retried with
+    backoff if tmux lost its server mid-command; and after repeated
+    timeouts commands fail at once with TmuxUnavailableError for a while.
+    """
+
+    def __init__(
+        self,
+        binary: str = "tmux",
+        socket_name: Optional[str] = None,
+        socket_path: Optional[str] = None,
+        policy: Optional[CommandPolicy] = None,
+    ) -> None:
         self.binary = binary
+        self.socket_name = socket_name
+        self.socket_path = socket_path
+        # What every command line starts with.
+        self.command_prefix = [binary, *socket_flags(socket_name, socket_path)]
+        self.policy = policy or CommandPolicy.from_env()
+        self.breaker = CircuitBreaker(self.policy.breaker_threshold, self.policy.breaker_cooldown)
         self._ensure_tmux_available()
 
     def _ensure_tmux_available(self) -> None:
@@ -34,36 +464,153 @@ class TmuxAdapter:
             )
 
     def _run(self, *args: str) -> str:
-        cmd = [self.binary, *args]
-        proc = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
+        cmd = [*self.command_prefix, *args]
+        returncode, stdout, stderr = self._call(cmd)
+        if returncode != 0:
+            raise self._error(cmd, stderr, returncode)
+        return stdout.strip()
+
+    def server_running(self) -> bool:
+        return server_running(server_socket(self.socket_name, self.socket_path))
+
+    def _error(self, cmd: List[str], stderr: str, returncode: int) -> TmuxCommandError:
+        stderr = stderr.strip()
+        socket = server_socket(self.socket_name, self.socket_path)
+        return TmuxCommandError(cmd, stderr, returncode, classify_error(returncode, stderr, socket))
+
+    def _call(self, cmd: List[str], commands: Optional[List[str]] = None) -> Tuple[int, str, str]:
+        """Run a full command line under the policy; see the class docstring.
+
+        The deadline goes by `commands`, the tmux commands the line runs;
+        by default they are read off the line.
+        """
+        retry_in = self.breaker.remaining()
+        if retry_in:
+            raise TmuxUnavailableError(cmd, retry_in)
+
+        if commands is None:
+            commands = line_commands(cmd[len(self.command_prefix):])
+        # Batches put a display-message marker after each operation.
+        timeout = self.policy.timeout_for([c for c in commands if c != "display-message"])
+        deadline = None if timeout is None else time.monotonic() + timeout
+        delay = self.policy.backoff
+        for attempt in range(self.policy.retries + 1):
+            remaining = None if deadline is None else deadline - time.monotonic()
+            try:
+                if remaining is not None and remaining <= 0:
+                    raise TmuxTimeoutError(cmd, timeout or 0.0)
+                result = self._exec(cmd, remaining)
+            except TmuxTimeoutError:
+                self.breaker.failure()
+                raise
+            self.breaker.success()
+            returncode, _, stderr = result
+            if not lost_server(returncode, stderr) or attempt == self.policy.retries:
+                break
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                break
+            time.sleep(delay)
+            delay *= 2
+        return result
+
+    def _interactive(self, args: List[str]) -> Tuple[List[str], int]:
+        """Run a tmux client in this terminal until it exits or detaches.
+
+        Returns (command line, exit status). Unlike other commands its
+        output isn't captured and the policy doesn't apply: an attached
+        client runs for as long as the user keeps it.
+        """
+        cmd = [*self.command_prefix, *args]
+        start = time.perf_counter()
+        returncode = subprocess.call(cmd)
+        events.emit(cmd, returncode, time.perf_counter() - start, "", "", "subprocess")
+        return cmd, returncode
+
+    def _exec(self, cmd: List[str], timeout: Optional[float] = None) -> Tuple[int, str, str]:
+        """Execute a full tmux command line and return (returncode, stdout, stderr).
+
+        This is the transport hook: subclasses can send commands somewhere
+        other than a fresh tmux process (see TmuxControlAdapter). Transports
+        report each command line to ytpm.adapters.events, and raise
+        TmuxTimeoutError when tmux took longer than `timeout` seconds.
+        """
+        start = time.perf_counter()
+        try:
+            proc = subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+            )
+        except subprocess.TimeoutExpired:
+            # subprocess.run has killed tmux already.
+            events.emit(cmd, -1, time.perf_counter() - start, "", "", "subprocess")
+            raise TmuxTimeoutError(cmd, timeout or 0.0) from None
+        events.emit(
+            cmd, proc.returncode, time.perf_counter() - start, proc.stdout, proc.stderr, "subprocess"
         )
-        if proc.returncode != 0:
-            raise TmuxCommandError(cmd, proc.stderr.strip(), proc.returncode)
-        return proc.stdout.strip()
+        return proc.returncode, proc.stdout, proc.stderr
 
     # --- public API ---
-    def list_sessions(self) -> List[str]:
-        """Return a list of session names.
+    def batch(self) -> TmuxBatch:
+        """Start a batch of operations that will run as one tmux command."""
+        return TmuxBatch(self)
+
+    def list_sessions(self) -> List[Session]:
+        """Return a record for every session, from a single tmux call.
 
         If no tmux server is running, return an empty list.
         """
         try:
-            output = self._run("list-sessions", "-F", "#S")
+            output = self._run("list-sessions", "-F", SESSION_FORMAT)
         except TmuxCommandError as e:
-            # When there is no server, tmux exits with code 1 and this stderr:
-            # "no server running on /tmp/tmux-XXXX/default"
-            if "no server running" in e.stderr:
+            if is_no_server_error(e):
                 return []
             # Any other tmux error should still bubble up
             raise
 
         if not output:
             return []
-        return output.splitlines()
+        return [parse_session_line(line) for line in output.splitlines()]
 
+    def attached_clients(self) -> Dict[str, int]:
+        """Number of clients on each session, by session ID, from one tmux call.
+
+        Control-mode clients (ytpm's daemon and TUI, among others) aren't
+        counted, unlike in #{session_attached}: nobody is looking at them.
+        """
+        try:
+            output = self._run(
+                "list-clients", "-F", f"#{{session_id}}{FIELD_SEP}#{{client_control_mode}}"
+            )
+        except TmuxCommandError as e:
+            if is_no_server_error(e):
+                return {}
+            raise
+
+        counts: Dict[str, int] = {}
+        for line in output.splitlines():
+            session_id, _, control = line.partition(FIELD_SEP)
+            if control != "1":
+                counts[session_id] = counts.get(session_id, 0) + 1
+        return counts
+
+    def list_panes(self) -> List[Pane]:
+        """Return every pane of every session, from a single tmux call.
+
+        This is the whole layout of the server; if no server is running,
+        return an empty list.
+        """
+        try:
+            output = self._run("list-panes", "-a", "-F", PANE_FORMAT)
+        except TmuxCommandError as e:
+            if is_no_server_error(e):
+                return []
+            raise
+
+        if not output:
+            return []
+        return [parse_pane_line(line) for line in output.splitlines()]
 
     def session_exists(self, name: str) -> bool:
         """Return True if a session with the given name exists."""
@@ -73,18 +620,83 @@ class TmuxAdapter:
         except TmuxCommandError:
             return False
 
-    def create_session(self, name: str, cwd: str) -> None:
+    def create_session(self, name: str, cwd: str, window: str = "") -> None:
         """Create a new detached session with the given name and working directory. tmux is running"""
-        self._run("new-session", "-d", "-s", name, "-c", cwd)
+        self._run("new-session", "-d", "-s", name, "-c", cwd, *(["-n", window] if window else []))
 
     def attach(self, name: str) -> None:
-        """Attach to the given session (used when outside tmux)."""
-        self._run("attach", "-t", name)
+        """Attach this terminal to the given session (used when outside tmux)."""
+        self._single("attach", name)
 
     def switch_client(self, name: str) -> None:
         """Switch the current tmux client to the given session (used inside tmux)."""
-        self._run("switch-client", "-t", name)  
+        self._run(*self._switch_client_args(name))
+
+    def _switch_client_args(self, target: str) -> List[str]:
+        return ["switch-client", "-t", target]
+
+    def detach_client(self, command: str) -> None:
+        """Detach the current client and run `command` in its terminal."""
+        self._single("detach_client", command)
 
     def kill_session(self, name: str) -> None:
         """Kill the given tmux session."""
         self._run("kill-session", "-t", name)  
+
+    def set_hooks(self, events: Iterable[str], command: str, index: int) -> None:
+        """Run `command` on each of `events`, server-wide, in one tmux call.
+
+        Hooks are arrays; using our own `index` leaves hooks the user set on
+        the same events alone.
+        """
+        args: List[str] = []
+        for event in events:
+            if args:
+                args.append(";")
+            args += ["set-hook", "-g", f"{event}[{index}]", command]
+        if args:
+            self._run(*args)
+
+    # Layout operations, one tmux call each; see TmuxBatch for the details.
+    def new_window(self, session: str, name: str, cwd: str) -> None:
+        self._single("new_window", session, name, cwd)
+
+    def split_window(self, target: str, cwd: str) -> None:
+        self._single("split_window", target, cwd)
+
+    def rename_window(self, target: str, name: str) -> None:
+        self._single("rename_window", target, name)
+
+    def kill_window(self, target: str) -> None:
+        self._single("kill_window", target)
+
+    def kill_pane(self, target: str) -> None:
+        self._single("kill_pane", target)
+
+    def send_keys(self, target: str, text: str) -> None:
+        self._single("send_keys", target, text)
+
+    def select_layout(self, target: str, layout: str) -> None:
+        self._single("select_layout", target, layout)
+
+    def set_option(self, target: str, option: str, value: str) -> None:
+        self._single("set_option", target, option, value)
+
+    def select_window(self, target: str) -> None:
+        self._single("select_window", target)
+
+    def select_pane(self, target: str) -> None:
+        self._single("select_pane", target)
+
+    def respawn_pane(self, target: str, cwd: str, command: str) -> None:
+        self._single("respawn_pane", target, cwd, command)
+
+    def capture_pane(self, target: str, history: bool = False) -> str:
+        batch = self.batch()
+        batch.capture_pane(target, history)
+        return batch.run(check=True)[0].output
+
+    def _single(self, op: str, *args: str) -> None:
+        batch = self.batch()
+        getattr(batch, op)(*args)
+        batch.run(check=True)
@@ -2,21 +2,59 @@
 
 from __future__ import annotations
 
-import argparse
 import os
 import sys
-from typing import List
 
-from ytpm.core.manager import Manager
-from ytpm.tui.app import run_tui
+# Only what `ls`/`goto`/... need is imported up front; the TUI (Textual,
+# asyncio) is loaded when `ytpm tui` runs. `goto` is bound to tmux keys, so
+# start-up time is latency the user sees. With a daemon running, main()
+# doesn't even get as far as argparse (or typing).
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    import argparse
+    from typing import Iterable, List, Tuple
+
+    from ytpm.adapters.session import Session
+    from ytpm.core.manager import ItemResult, Manager
+    from ytpm.core.reap import Reaped
+    from ytpm.core.usage import SessionUsage
 
 
 def _build_parser() -> argparse.ArgumentParser:
+    import argparse
+
     parser = argparse.ArgumentParser(
         prog="ytpm",
         description="YTPM – Yaron's tmux project manager (session-level CLI).",
     )
 
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=(
+            "Print tmux command timings and Manager spans as JSON to stderr, "
+            "or to the file named by YTPM_PROFILE (which alone also turns "
+            "profiling on). Commands then run in-process, not in the daemon."
+        ),
+    )
+
+    parser.add_argument(
+        "-L",
+        "--server",
+        dest="servers",
+        action="append",
+        metavar="SOCKET",
+        help=(
+            "Work on the tmux server with this socket name (as tmux -L) or path; "
+            "repeat to work on several at once, with sessions listed as SERVER:NAME."
+        ),
+    )
+    parser.add_argument(
+        "--all-servers",
+        action="store_true",
+        help="Work on every running tmux server of yours at once (see --server).",
+    )
+
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     # ytpm tui
@@ -25,23 +63,82 @@ def _build_parser() -> argparse.ArgumentParser:
             help="Open the interactive TUI for selecting a session.",
     )
 
-    # ytpm ls
+    # ytpm daemon
     subparsers.add_parser(
+        "daemon",
+        help="Serve ls/new/goto/kill from a long-lived process (faster start-up).",
+    )
+
+    # ytpm ls [--long]
+    ls_parser = subparsers.add_parser(
         "ls",
         help="List existing tmux sessions.",
     )
+    output = ls_parser.add_mutually_exclusive_group()
+    output.add_argument(
+        "--long",
+        "-l",
+        action="store_true",
+        help="Also show windows, attached state, git branch and start directory.",
+    )
+    output.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the sessions as a JSON array of objects.",
+    )
+    output.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="Print one JSON object per session and line.",
+    )
+    output.add_argument(
+        "--format",
+        metavar="FORMAT",
+        help=(
+            "Print each session with a Python format string, e.g. "
+            "'{name}\\t{path}\\t{activity}' (\\t and \\n are understood). "
+            f"Fields: {', '.join(_SESSION_FIELDS)}."
+        ),
+    )
+    ls_parser.add_argument(
+        "--attached",
+        action="store_true",
+        help="Only sessions with a client attached.",
+    )
+    ls_parser.add_argument(
+        "--idle-for",
+        metavar="DURATION",
+        type=_duration,
+        help="Only sessions without activity for at least DURATION (e.g. 90s, 30m, 2h, 1d12h).",
+    )
+    ls_parser.add_argument(
+        "--sort",
+        choices=("frecency", "activity", "name"),
+        default="frecency",
+        help="Most visited first (the default), most recently active first, or by name.",
+    )
 
-    # ytpm new NAME [--path PATH]
+    # ytpm new NAME|- [--from FILE] [--path PATH]
     new_parser = subparsers.add_parser(
         "new",
-        help="Create a new session.",
+        help="Create a new session, or many at once.",
+    )
+    new_parser.add_argument(
+        "name",
+        nargs="?",
+        help="Name of the session to create; '-' reads 'NAME [PATH]' lines from stdin.",
+    )
+    new_parser.add_argument(
+        "--from",
+        dest="from_file",
+        metavar="FILE",
+        help="Create every session listed in FILE, one 'NAME [PATH]' per line.",
     )
-    new_parser.add_argument("name", help="Name of the session to create.")
     new_parser.add_argument(
         "--path",
         "-p",
         dest="path",
-        help="Working directory for the new session (default: current directory).",
+        help="Working directory for new sessions (default: current directory).",
     )
 
     # ytpm goto NAME [--path PATH]
@@ -54,15 +151,180 @@ def _build_parser() -> argparse.ArgumentParser:
         "--path",
         "-p",
         dest="path",
-        help="Working directory if session needs to be created (default: current directory).",
+        help=(
+            "Working directory if session needs to be created "
+            "(default: the scanned project with that name, else current directory)."
+        ),
     )
 
-    # ytpm kill NAME
+    # ytpm kill NAME|PATTERN... [--all-except PATTERN]
     kill_parser = subparsers.add_parser(
         "kill",
-        help="Kill a session if it exists.",
+        help="Kill sessions if they exist.",
+    )
+    kill_parser.add_argument(
+        "names",
+        nargs="*",
+        metavar="name",
+        help="Session names or glob patterns (quote them: 'web-*').",
+    )
+    kill_parser.add_argument(
+        "--all-except",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help="Kill every session except those matching PATTERN (repeatable).",
+    )
+
+    # ytpm reap [--idle DURATION] [--max-sessions N] [--match PATTERN]
+    #           [--protect PATTERN] [--attached] [--dry-run] [--every DURATION]
+    reap_parser = subparsers.add_parser(
+        "reap",
+        help="Kill idle sessions, and the least recently active beyond a maximum.",
+    )
+    reap_parser.add_argument(
+        "--idle",
+        type=_duration,
+        metavar="DURATION",
+        help="Kill sessions without activity for this long, e.g. 8h (default: [reap] idle).",
+    )
+    reap_parser.add_argument(
+        "--max-sessions",
+        type=int,
+        metavar="N",
+        help="Keep at most N sessions (default: [reap] max_sessions).",
+    )
+    reap_parser.add_argument(
+        "--match",
+        action="append",
+        metavar="PATTERN",
+        help="Only reap sessions matching PATTERN (repeatable; replaces [reap] patterns).",
+    )
+    reap_parser.add_argument(
+        "--protect",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help="Never reap sessions matching PATTERN (repeatable; added to [reap] protect).",
+    )
+    reap_parser.add_argument(
+        "--attached",
+        action="store_true",
+        help="Also reap sessions with a client attached.",
+    )
+    reap_parser.add_argument(
+        "--dry-run",
+        "-n",
+        action="store_true",
+        help="Only print what would be killed, and why.",
+    )
+    reap_parser.add_argument(
+        "--every",
+        metavar="DURATION",
+        type=_duration,
+        help="Keep running, reaping every DURATION (e.g. 10m) until interrupted.",
+    )
+
+    # ytpm apply [FILE] [--dry-run] [--prune]
+    apply_parser = subparsers.add_parser(
+        "apply",
+        help="Create the sessions, windows and panes described in the config.",
+    )
+    apply_parser.add_argument(
+        "file",
+        nargs="?",
+        help="Read [[sessions]] from FILE instead of config.toml.",
+    )
+    apply_parser.add_argument(
+        "--dry-run",
+        "-n",
+        action="store_true",
+        help="Only print the plan.",
+    )
+    apply_parser.add_argument(
+        "--prune",
+        action="store_true",
+        help=(
+            "Also kill extra windows and panes of configured sessions, and "
+            "sessions created by an earlier apply that are no longer configured."
+        ),
+    )
+
+    # ytpm save [FILE] [--scrollback]
+    save_parser = subparsers.add_parser(
+        "save",
+        help="Save every session's windows, panes and layouts to a snapshot.",
+    )
+    save_parser.add_argument(
+        "file",
+        nargs="?",
+        help="Snapshot file (default: snapshot.jsonl.gz in ytpm's state directory).",
+    )
+    save_parser.add_argument(
+        "--scrollback",
+        action="store_true",
+        help="Also save what each pane shows, with its history.",
+    )
+
+    # ytpm restore [FILE] [--dry-run]
+    restore_parser = subparsers.add_parser(
+        "restore",
+        help="Recreate the saved sessions that don't exist.",
+    )
+    restore_parser.add_argument(
+        "file",
+        nargs="?",
+        help="Snapshot file (default: the one `ytpm save` writes).",
+    )
+    restore_parser.add_argument(
+        "--dry-run",
+        "-n",
+        action="store_true",
+        help="Only print what would be created.",
+    )
+
+    # ytpm scan [--full] [--list]
+    scan_parser = subparsers.add_parser(
+        "scan",
+        help="Find project directories under the configured roots.",
+    )
+    scan_parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Re-read every directory instead of only the ones that changed.",
+    )
+    scan_parser.add_argument(
+        "--list",
+        action="store_true",
+        help="Print the projects found (name and path).",
+    )
+
+    # ytpm top [--interval SECONDS] [-n COUNT] [--sort cpu|rss|name]
+    top_parser = subparsers.add_parser(
+        "top",
+        help="Show the CPU and memory used by each session's processes.",
+    )
+    top_parser.add_argument(
+        "--interval",
+        "-d",
+        type=float,
+        default=1.0,
+        metavar="SECONDS",
+        help="Seconds between refreshes, and over which CPU%% is measured (default: 1).",
+    )
+    top_parser.add_argument(
+        "--iterations",
+        "-n",
+        type=int,
+        metavar="COUNT",
+        help="Stop after COUNT refreshes (default: run until interrupted).",
+    )
+    top_parser.add_argument(
+        "--sort",
+        choices=("cpu", "rss", "name"),
+        default="cpu",
+        help="Busiest first (the default), largest resident memory first, or by name.",
     )
-    kill_parser.add_argument("name", help="Name of the session to kill.")
 
     return parser
 
@@ -79,34 +341,141 @@ def run(argv: List[str], manager: Manager) -> int:
     parser = _build_parser()
     args = parser.parse_args(argv)
 
+    destination = os.environ.get("YTPM_PROFILE") or ("-" if args.profile else "")
+    if not destination:
+        return _run(parser, args, manager)
+
+    from ytpm.core import profile
+
+    profiler = profile.start()
     try:
+        return _run(parser, args, manager)
+    finally:
+        profile.stop()
+        try:
+            profiler.dump(destination)
+        except OSError as e:
+            print(f"Error: could not write profile: {e}", file=sys.stderr)
+
+
+def _run(parser: argparse.ArgumentParser, args: argparse.Namespace, manager: Manager) -> int:
+    try:
+        if args.servers or args.all_servers:
+            manager = manager.on_servers(_servers(args))
         if args.command == "ls":
-            sessions = manager.list_sessions()
-            for name in sessions:
-                print(name)
+            _ls(args, manager)
 
         elif args.command == "new":
             cwd = args.path or os.getcwd()
-            manager.create_session(args.name, cwd)
+            if args.name not in (None, "-") and not args.from_file:
+                manager.create_session(args.name, cwd)
+            else:
+                if args.from_file:
+                    with open(args.from_file) as f:
+                        pairs = _read_pairs(f, cwd)
+                elif args.name == "-":
+                    pairs = _read_pairs(sys.stdin, cwd)
+                else:
+                    parser.error("new: give a NAME, '-' or --from FILE")
+                return _report(manager.create_sessions(pairs), "created")
 
         elif args.command == "goto":
-            cwd = args.path or os.getcwd()
-            manager.goto_session(args.name, cwd)
+            manager.goto_session(args.name, args.path)
 
         elif args.command == "kill":
-            manager.kill_session(args.name)
+            if not args.names and not args.all_except:
+                parser.error("kill: give a NAME, a pattern or --all-except")
+            if len(args.names) == 1 and not args.all_except and not _is_glob(args.names[0]):
+                manager.kill_session(args.names[0])
+            else:
+                names = manager.match_sessions(args.names or ["*"], exclude=args.all_except)
+                return _report(manager.kill_sessions(names), "killed")
+
+        elif args.command == "reap":
+            return _reap(args, manager)
+
+        elif args.command == "apply":
+            sessions = None
+            if args.file:
+                from pathlib import Path
+
+                from ytpm.core.config import ConfigError, load_config
+
+                if not os.path.isfile(args.file):
+                    raise ConfigError(f"{args.file}: no such file")
+                sessions = load_config(Path(args.file)).sessions
+            plan = manager.apply_workspace(sessions, prune=args.prune, dry_run=args.dry_run)
+            for change in plan.changes:
+                symbol = _PLAN_SYMBOLS[change.action]
+                detail = f"  {change.detail}" if change.detail else ""
+                print(f"{symbol} {change.kind} {change.target}{detail}")
+            if not plan.changes:
+                print("nothing to do", file=sys.stderr)
+            elif args.dry_run:
+                print(f"{len(plan.changes)} change(s) planned", file=sys.stderr)
+            else:
+                print(f"{len(plan.changes)} change(s) applied", file=sys.stderr)
+
+        elif args.command == "save":
+            from pathlib import Path
+
+            from ytpm.core.snapshot import default_snapshot_path
+
+            path = Path(args.file) if args.file else default_snapshot_path()
+            saved = manager.save_snapshot(path, scrollback=args.scrollback)
+            windows = sum(len(s.windows) for s in saved)
+            panes = sum(len(w.panes) for s in saved for w in s.windows)
+            print(
+                f"saved {len(saved)} sessions ({windows} windows, {panes} panes) to {path}",
+                file=sys.stderr,
+            )
+
+        elif args.command == "restore":
+            from pathlib import Path
+
+            plan = manager.restore_snapshot(
+                Path(args.file) if args.file else None, dry_run=args.dry_run
+            )
+            for change in plan.changes:
+                print(f"{_PLAN_SYMBOLS[change.action]} {change.kind} {change.target}  {change.detail}")
+            verb = "to restore" if args.dry_run else "restored"
+            print(f"{len(plan.changes)} session(s) {verb}", file=sys.stderr)
+
+        elif args.command == "scan":
+            stats = manager.scan_projects(full=args.full)
+            if args.list:
+                for project in manager.list_projects():
+                    print(f"{project.name}\t{project.path}")
+            print(
+                f"{stats.projects} projects in {stats.dirs} directories "
+                f"({stats.rescanned} re-read) in {stats.seconds:.2f}s",
+                file=sys.stderr,
+            )
+
+        elif args.command == "top":
+            _top(args, manager)
 
         elif args.command == "tui":
             # TUI uses the real Manager instance; manager here is ManagerProtocol
             # but in main() we'll pass a real Manager.
             # Easier: ignore the injected manager here and build a fresh real Manager
             # inside run_tui.
+            from ytpm.tui.app import run_tui
+
             run_tui()
 
+        elif args.command == "daemon":
+            from ytpm.daemon.server import serve
+
+            serve()
+
         else:
             parser.print_help()
             return 1
 
+    except BrokenPipeError:
+        # Our reader went away (`ytpm ls | head`); main() exits quietly.
+        raise
     except Exception as exc:
         print(f"Error: {exc}", file=sys.stderr)
         return 1
@@ -114,6 +483,220 @@ def run(argv: List[str], manager: Manager) -> int:
     return 0
 
 
+# Session._fields, for ls --format and --help without importing typing.
+_SESSION_FIELDS = ("name", "id", "attached", "windows", "activity", "created", "path", "server")
+
+
+def _duration(text: str) -> float:
+    from ytpm.core.config import parse_duration
+
+    try:
+        return parse_duration(text)
+    except ValueError as e:
+        import argparse
+
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def _ls(args: argparse.Namespace, manager: Manager) -> None:
+    sessions = manager.list_sessions()
+    if args.attached:
+        sessions = [s for s in manager.with_real_clients(sessions) if s.attached]
+    if args.idle_for is not None:
+        import time
+
+        cutoff = time.time() - args.idle_for
+        sessions = [s for s in sessions if s.activity <= cutoff]
+    if args.sort == "activity":
+        sessions.sort(key=lambda s: -s.activity)
+    elif args.sort == "name":
+        sessions.sort(key=lambda s: s.name)
+
+    # Everything goes out in one write rather than a print per session.
+    if args.json or args.ndjson:
+        import json
+
+        records = [s._asdict() for s in sessions]
+        if args.json:
+            out = json.dumps(records) + "\n"
+        else:
+            out = "".join(json.dumps(r) + "\n" for r in records)
+    elif args.format is not None:
+        template = _unescape(args.format)
+        try:
+            out = "".join(template.format_map(s._asdict()) + "\n" for s in sessions)
+        except KeyError as e:
+            raise ValueError(
+                f"ls --format: unknown field {e}; use {', '.join(_SESSION_FIELDS)}"
+            ) from None
+    elif args.long:
+        out = _long_listing(sessions, manager)
+    else:
+        out = "".join(s.name + "\n" for s in sessions)
+    sys.stdout.write(out)
+
+
+def _long_listing(sessions: List[Session], manager: Manager) -> str:
+    width = max((len(s.name) for s in sessions), default=0)
+    statuses = dict(manager.git_statuses(s.path for s in sessions if s.path))
+    git = {path: status.describe() for path, status in statuses.items() if status}
+    git_width = max((len(text) for text in git.values()), default=0)
+    lines = []
+    for s in sessions:
+        state = "attached" if s.attached else "detached"
+        branch = f"{git.get(s.path, ''):<{git_width}}  " if git_width else ""
+        lines.append(f"{s.name:<{width}}  {s.windows:>3}w  {state:<8}  {branch}{s.path}\n")
+    return "".join(lines)
+
+
+def _unescape(template: str) -> str:
+    """Turn the \\t and \\n a shell passes through literally into tab and newline."""
+    import re
+
+    return re.sub(r"\\([tn\\])", lambda m: {"t": "\t", "n": "\n"}.get(m[1], "\\"), template)
+
+
+def _top(args: argparse.Namespace, manager: Manager) -> None:
+    import time
+
+    # The first sample only gives the next one something to measure CPU% from.
+    manager.session_usage()
+    clear = sys.stdout.isatty()
+    shown = 0
+    try:
+        while args.iterations is None or shown < args.iterations:
+            time.sleep(args.interval)
+            out = _usage_table(manager.session_usage(), args.sort)
+            if clear:
+                out = "\x1b[H\x1b[2J" + out
+            elif shown:
+                out = "\n" + out
+            sys.stdout.write(out)
+            sys.stdout.flush()
+            shown += 1
+    except KeyboardInterrupt:
+        pass
+
+
+def _usage_table(usage: List[SessionUsage], sort: str) -> str:
+    if sort == "cpu":
+        usage = sorted(usage, key=lambda u: (-(u.cpu_percent or 0.0), -u.rss))
+    elif sort == "rss":
+        usage = sorted(usage, key=lambda u: -u.rss)
+    else:
+        usage = sorted(usage, key=lambda u: u.session)
+    width = max([len("SESSION")] + [len(u.session) for u in usage])
+    lines = [f"{'SESSION':<{width}}  PANES  PROCS   CPU%  CPU TIME      RSS\n"]
+    for u in usage:
+        percent = "-" if u.cpu_percent is None else f"{u.cpu_percent:.1f}"
+        lines.append(
+            f"{u.session:<{width}}  {u.panes:>5}  {u.processes:>5}  {percent:>5}  "
+            f"{_cpu_time(u.cpu_time):>8}  {_size(u.rss):>7}\n"
+        )
+    return "".join(lines)
+
+
+def _cpu_time(seconds: float) -> str:
+    """As top shows it: "m:ss.ss", or "h:mm:ss" from an hour on."""
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{int(minutes)}:{seconds:05.2f}"
+    hours, minutes = divmod(int(minutes), 60)
+    return f"{hours}:{minutes:02d}:{int(seconds):02d}"
+
+
+def _size(size: float) -> str:
+    for unit in "BKMG":
+        if size < 1024 or unit == "G":
+            break
+        size /= 1024
+    return f"{size:.0f}B" if unit == "B" else f"{size:.1f}{unit}"
+
+
+def _reap(args: argparse.Namespace, manager: Manager) -> int:
+    import time
+    from dataclasses import replace
+
+    policy = manager.config.reap
+    overrides = {}
+    if args.idle is not None:
+        overrides["idle"] = f"{args.idle}s"
+    if args.max_sessions is not None:
+        overrides["max_sessions"] = args.max_sessions
+    if args.match:
+        overrides["patterns"] = args.match
+    if args.protect:
+        overrides["protect"] = policy.protect + args.protect
+    if args.attached:
+        overrides["attached"] = True
+    policy = replace(policy, **overrides)
+    if policy.idle_seconds() is None and not policy.max_sessions:
+        raise ValueError(
+            "reap: nothing to reap by; set idle or max_sessions in [reap] "
+            "or pass --idle or --max-sessions"
+        )
+
+    try:
+        while True:
+            reaped = manager.reap_sessions(policy, dry_run=args.dry_run)
+            for r in reaped:
+                print(f"- {r.name}  {r.reason}")
+            if args.dry_run:
+                print(f"{len(reaped)} session(s) to reap", file=sys.stderr)
+                code = 0
+            else:
+                code = _report(reaped, "reaped")
+            if args.every is None:
+                return code
+            sys.stdout.flush()
+            time.sleep(args.every)
+    except KeyboardInterrupt:
+        return 0
+
+
+_PLAN_SYMBOLS = {"create": "+", "rename": "~", "kill": "-"}
+
+
+def _servers(args: argparse.Namespace) -> List[str]:
+    servers = list(args.servers or [])
+    if args.all_servers:
+        from ytpm.adapters.multi import server_label
+        from ytpm.adapters.server import live_servers
+
+        running = live_servers()
+        if not running:
+            raise RuntimeError("no tmux server is running")
+        named = {server_label(s) for s in servers}
+        servers += [s for s in running if server_label(s) not in named]
+    return servers
+
+
+def _is_glob(name: str) -> bool:
+    return any(ch in name for ch in "*?[")
+
+
+def _read_pairs(lines: Iterable[str], default_cwd: str) -> List[Tuple[str, str]]:
+    """Parse 'NAME [PATH]' lines; blank lines and '#' comments are skipped."""
+    pairs = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        name, *rest = line.split(None, 1)
+        path = rest[0] if rest else ""
+        pairs.append((name, os.path.abspath(os.path.expanduser(path)) if path else default_cwd))
+    return pairs
+
+
+def _report(results: List[ItemResult] | List[Reaped], verb: str) -> int:
+    """Print failures and a summary of a bulk operation; 1 if any failed."""
+    failed = [r for r in results if not r.ok]
+    for r in failed:
+        print(f"Error: {r.name}: {r.error}", file=sys.stderr)
+    print(f"{verb} {len(results) - len(failed)} of {len(results)} sessions", file=sys.stderr)
+    return 1 if failed else 0
+
+
 def main(argv: List[str] | None = None) -> None:
     """
     Entry point used by `python -m ytpm.cli.main` or a future `ytpm` script.
@@ -121,10 +704,30 @@ def main(argv: List[str] | None = None) -> None:
     if argv is None:
         argv = sys.argv[1:]
 
-    manager = Manager()
-    code = run(argv, manager)
+    try:
+        code = _main(argv)
+        # A reader that went away shows up at the latest when our buffered
+        # output is flushed.
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # Point stdout at /dev/null so the flush at exit doesn't fail again.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        code = 1
     sys.exit(code)
 
 
+def _main(argv: List[str]) -> int:
+    from ytpm.daemon.client import forward
+
+    code = forward(argv)
+    if code is not None:
+        return code
+
+    from ytpm.core.manager import Manager
+
+    return run(argv, Manager())
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,219 @@
+# ytpm/core/config.py
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ytpm.core.storage import config_dir
+
+
+class ConfigError(RuntimeError):
+    """Raised when the config file can't be read or has invalid values."""
+
+
+def default_config_path() -> Path:
+    return config_dir() / "config.toml"
+
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def parse_duration(text: str) -> float:
+    """Seconds in "90", "90s", "30m", "2h", "1d12h", ..."""
+    import re
+
+    parts = re.findall(r"(\d+(?:\.\d+)?)([smhdw]?)", text)
+    if not parts or "".join(n + u for n, u in parts) != text:
+        raise ValueError(f"invalid duration {text!r} (e.g. 90s, 30m, 2h, 1d)")
+    return sum(float(n) * DURATION_UNITS[u or "s"] for n, u in parts)
+
+
+@dataclass
+class ScanConfig:
+    """Where and how `ytpm scan` looks for projects."""
+
+    roots: List[str] = field(default_factory=lambda: ["~"])
+    max_depth: int = 3
+    # A directory containing any of these is a project.
+    markers: List[str] = field(
+        default_factory=lambda: [
+            ".git",
+            ".hg",
+            "pyproject.toml",
+            "setup.py",
+            "package.json",
+            "Cargo.toml",
+            "go.mod",
+            ".ytpm",
+        ]
+    )
+    # Directory names (fnmatch patterns) that are never descended into.
+    ignore: List[str] = field(
+        default_factory=lambda: [
+            "node_modules",
+            "__pycache__",
+            "venv",
+            ".venv",
+            "target",
+            "dist",
+            "build",
+        ]
+    )
+    skip_hidden: bool = True
+    # Nested projects (e.g. packages inside a monorepo) are usually noise.
+    descend_into_projects: bool = False
+    workers: int = 8
+
+    def expanded_roots(self) -> List[str]:
+        return [str(Path(root).expanduser().resolve()) for root in self.roots]
+
+
+@dataclass
+class WindowConfig:
+    """One window of a workspace session."""
+
+    name: str = ""
+    # Start directory, relative to the session's root.
+    path: str = ""
+    # Any tmux layout, e.g. "main-vertical"; applied when panes are added.
+    layout: str = ""
+    # One entry per pane: the command typed into it, or "" for a plain shell.
+    panes: List[str] = field(default_factory=lambda: [""])
+
+
+@dataclass
+class SessionConfig:
+    """A session `ytpm apply` keeps in place (a [[sessions]] entry)."""
+
+    name: str = ""
+    root: str = "~"
+    # Empty means ytpm leaves the session's windows alone.
+    windows: List[WindowConfig] = field(default_factory=list)
+
+    def expanded_root(self) -> str:
+        return os.path.abspath(os.path.expanduser(self.root))
+
+    def window_path(self, window: WindowConfig) -> str:
+        root = self.expanded_root()
+        if not window.path:
+            return root
+        return os.path.normpath(os.path.join(root, os.path.expanduser(window.path)))
+
+
+@dataclass
+class ReapConfig:
+    """Which sessions `ytpm reap` kills."""
+
+    # Sessions without activity for this long, e.g. "8h"; "" for no limit.
+    idle: str = ""
+    # Keep at most this many sessions, killing the least recently active
+    # ones beyond it; 0 for no limit.
+    max_sessions: int = 0
+    # Only sessions matching one of these (fnmatch) may be reaped; empty
+    # means any.
+    patterns: List[str] = field(default_factory=list)
+    # Sessions matching one of these are never reaped. [[sessions]] of the
+    # config are never reaped either.
+    protect: List[str] = field(default_factory=list)
+    # Attached sessions are left alone unless this is set.
+    attached: bool = False
+
+    def idle_seconds(self) -> Optional[float]:
+        return parse_duration(self.idle) if self.idle else None
+
+
+@dataclass
+class Config:
+    """Everything read from config.toml."""
+
+    scan: ScanConfig = field(default_factory=ScanConfig)
+    sessions: List[SessionConfig] = field(default_factory=list)
+    reap: ReapConfig = field(default_factory=ReapConfig)
+
+
+def _section(data: Dict[str, Any], name: str, cls: type) -> Any:
+    values = data.get(name, {})
+    if not isinstance(values, dict):
+        raise ConfigError(f"[{name}] must be a table")
+    return _table(values, f"[{name}]", cls)
+
+
+def _table(values: Dict[str, Any], where: str, cls: type) -> Any:
+    known = cls.__dataclass_fields__
+    unknown = sorted(set(values) - set(known))
+    if unknown:
+        raise ConfigError(f"unknown key(s) in {where}: {', '.join(unknown)}")
+    defaults = cls()
+    for key, value in values.items():
+        expected = type(getattr(defaults, key))
+        if not isinstance(value, expected):
+            raise ConfigError(f"{where} {key} must be of type {expected.__name__}")
+    return cls(**values)
+
+
+def _tables(data: Dict[str, Any], name: str, where: str) -> List[Dict[str, Any]]:
+    values = data.get(name, [])
+    if not isinstance(values, list) or not all(isinstance(v, dict) for v in values):
+        raise ConfigError(f"{where} must be an array of tables ([[{name}]])")
+    return values
+
+
+def _sessions(data: Dict[str, Any]) -> List[SessionConfig]:
+    sessions: List[SessionConfig] = []
+    for values in _tables(data, "sessions", "sessions"):
+        name = values.get("name")
+        if not name or not isinstance(name, str):
+            raise ConfigError("every [[sessions]] entry needs a name")
+        where = f"[[sessions]] {name!r}:"
+        session = _table({k: v for k, v in values.items() if k != "windows"}, where, SessionConfig)
+        session.windows = [
+            _table(w, f"{where} window", WindowConfig)
+            for w in _tables(values, "windows", f"{where} windows")
+        ]
+        window_names = [w.name for w in session.windows]
+        if not all(window_names) or len(set(window_names)) != len(window_names):
+            raise ConfigError(f"{where} windows need unique, non-empty names")
+        for w in session.windows:
+            if not w.panes or not all(isinstance(cmd, str) for cmd in w.panes):
+                raise ConfigError(f"{where} window {w.name!r}: panes must be a list of commands")
+        sessions.append(session)
+
+    names = [s.name for s in sessions]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise ConfigError(f"session(s) listed twice in [[sessions]]: {', '.join(duplicates)}")
+    return sessions
+
+
+def _reap(data: Dict[str, Any]) -> ReapConfig:
+    reap = _section(data, "reap", ReapConfig)
+    try:
+        reap.idle_seconds()
+    except ValueError as e:
+        raise ConfigError(f"[reap] idle: {e}") from None
+    if reap.max_sessions < 0:
+        raise ConfigError("[reap] max_sessions must not be negative")
+    return reap
+
+
+def load_config(path: Optional[Path] = None) -> Config:
+    """Load the config file; a missing file means all defaults."""
+    import tomllib  # only commands that need the config pay for it
+
+    path = path or default_config_path()
+    try:
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    except FileNotFoundError:
+        return Config()
+    except (OSError, tomllib.TOMLDecodeError) as e:
+        raise ConfigError(f"could not read {path}: {e}") from e
+
+    return Config(
+        scan=_section(data, "scan", ScanConfig),
+        sessions=_sessions(data),
+        reap=_reap(data),
+    )
@@ -0,0 +1,132 @@
+# ytpm/core/frecency.py
+
+from __future__ import annotations
+
+import fcntl
+import math
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ytpm.core.storage import read_json, state_dir, write_json
+
+STORE_VERSION = 1
+
+
+class FrecencyStore:
+    """How often and how recently each session was visited.
+
+    Every visit adds 1 to a score that halves every `half_life` seconds.
+    Instead of the score itself we store its "anchored log":
+
+        key = log2(score) + t / half_life
+
+    Keys of all entries compare like their current scores, and a key never
+    needs aging, so reads are a dict lookup and a visit rewrites one entry.
+    The file holds at most `max_entries` names; once it grows past that by a
+    margin, the lowest-scoring names are dropped in one compaction.
+
+    Writes go through a lock file and an atomic rename, so concurrent ytpm
+    processes don't lose each other's visits and a crash never leaves a torn
+    file behind.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        half_life: float = 3 * 24 * 3600,
+        max_entries: int = 500,
+    ) -> None:
+        self.path = path or state_dir() / "frecency.json"
+        self.half_life = half_life
+        self.max_entries = max_entries
+        self._keys: Optional[Dict[str, float]] = None
+        # (inode, mtime) of the file _keys was parsed from; every write is a
+        # rename, so a new inode means another process wrote it.
+        self._stamp: Optional[Tuple[int, int]] = None
+
+    # --- reads ---
+
+    def score(self, name: str, now: Optional[float] = None) -> float:
+        """Current score of `name`; 0.0 if it was never visited."""
+        key = self._load().get(name)
+        if key is None:
+            return 0.0
+        return self._score(key, self._now(now))
+
+    def scores(self, names: Iterable[str], now: Optional[float] = None) -> Dict[str, float]:
+        keys = self._load()
+        t = self._now(now)
+        return {name: self._score(keys[name], t) if name in keys else 0.0 for name in names}
+
+    def rank(self, names: Iterable[str]) -> List[str]:
+        """Sort names best first; unvisited names keep their relative order."""
+        keys = self._load()
+        return sorted(names, key=lambda name: -keys.get(name, -math.inf))
+
+    # --- writes ---
+
+    def visit(self, name: str, now: Optional[float] = None) -> None:
+        """Record one visit to `name`."""
+        t = self._now(now)
+        with self._locked():
+            keys = dict(self._read())
+            current = self._score(keys[name], t) if name in keys else 0.0
+            keys[name] = math.log2(current + 1) + t / self.half_life
+            if len(keys) > self.max_entries * 1.25:
+                keys = self._compact(keys)
+            self._write(keys)
+
+    def forget(self, name: str) -> None:
+        """Drop `name` from the store."""
+        with self._locked():
+            keys = dict(self._read())
+            if keys.pop(name, None) is not None:
+                self._write(keys)
+
+    # --- internal helpers ---
+
+    def _score(self, key: float, t: float) -> float:
+        return 2.0 ** (key - t / self.half_life)
+
+    @staticmethod
+    def _now(now: Optional[float]) -> float:
+        return time.time() if now is None else now
+
+    def _compact(self, keys: Dict[str, float]) -> Dict[str, float]:
+        best = sorted(keys.items(), key=lambda item: -item[1])[: self.max_entries]
+        return dict(best)
+
+    def _load(self) -> Dict[str, float]:
+        """Read the file, reusing the parsed copy while it is unchanged."""
+        try:
+            st = self.path.stat()
+        except OSError:
+            return {}
+        stamp = (st.st_ino, st.st_mtime_ns)
+        if self._keys is None or stamp != self._stamp:
+            self._keys = self._read()
+            self._stamp = stamp
+        return self._keys
+
+    def _read(self) -> Dict[str, float]:
+        data = read_json(self.path, default={})
+        if not isinstance(data, dict) or data.get("version") != STORE_VERSION:
+            return {}
+        entries = data.get("entries")
+        return dict(entries) if isinstance(entries, dict) else {}
+
+    def _write(self, keys: Dict[str, float]) -> None:
+        write_json(self.path, {"version": STORE_VERSION, "entries": keys})
+        self._keys = None
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_suffix(".lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
@@ -0,0 +1,201 @@
+# ytpm/core/fuzzy.py
+
+from __future__ import annotations
+
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+# Characters that start a new "word" inside a name like "my-project/src".
+_SEPARATORS = frozenset(" -_./:")
+
+# Score weights. A query character always earns MATCH; the rest rewards
+# matches that a human would consider "tight" and penalises spread-out ones.
+MATCH = 16
+CONSECUTIVE = 8
+WORD_START = 10
+PREFIX = 12
+GAP = 2
+LENGTH = 0.05
+
+
+def char_mask(text: str) -> int:
+    """Return a 64-bit set of the characters in `text`.
+
+    a-z and 0-9 get a bit each; anything else shares the remaining bits.
+    If a query's mask isn't a subset of a candidate's, the candidate
+    can't contain the query as a subsequence.
+    """
+    mask = 0
+    for ch in text:
+        if "a" <= ch <= "z":
+            mask |= 1 << (ord(ch) - 97)
+        elif "0" <= ch <= "9":
+            mask |= 1 << (ord(ch) - 22)
+        else:
+            mask |= 1 << (36 + ord(ch) % 28)
+    return mask
+
+
+def score(text: str, query: str) -> Optional[float]:
+    """Score `query` as a subsequence of `text` (both lowercase).
+
+    Returns None if it doesn't match. Higher is better. The match is
+    located with a forward pass and then tightened with a backward pass,
+    so "ab" in "a_ab" scores the compact "ab" rather than "a_ab".
+    """
+    if not query:
+        return 0.0
+
+    # Forward: earliest position at which the whole query has matched.
+    pos = 0
+    for ch in query:
+        pos = text.find(ch, pos)
+        if pos < 0:
+            return None
+        pos += 1
+    end = pos
+
+    # Backward: latest start that still fits before `end`.
+    start = end
+    for ch in reversed(query):
+        start = text.rfind(ch, 0, start)
+
+    total = 0.0
+    prev = start - 1
+    pos = start
+    for ch in query:
+        pos = text.find(ch, pos)
+        total += MATCH
+        if pos == prev + 1 and pos != start:
+            total += CONSECUTIVE
+        if pos == 0:
+            total += PREFIX
+        elif text[pos - 1] in _SEPARATORS:
+            total += WORD_START
+        prev = pos
+        pos += 1
+
+    gaps = (end - start) - len(query)
+    return total - gaps * GAP - len(text) * LENGTH
+
+
+class FuzzyIndex:
+    """Fuzzy matcher over a fixed list of candidate names.
+
+    Lowercased names and character masks are computed once, and the
+    candidates containing a character are bucketed the first time it is
+    typed on its own, which is how most queries start; a fresh query only
+    looks at the smallest bucket of its characters. Searches are
+    incremental: when the query grows by a keystroke only the previous hits
+    are rescored, and results for shorter queries are kept so backspace is
+    free.
+
+    `boosts` maps a name to points added to its score on every match, so
+    e.g. frequently used sessions win close calls.
+    """
+
+    def __init__(
+        self, candidates: Sequence[str], boosts: Optional[Mapping[str, float]] = None
+    ) -> None:
+        self.candidates = list(candidates)
+        boosts = boosts or {}
+        self._boosts = [boosts.get(c, 0.0) for c in self.candidates]
+        self._lowered = [c.lower() for c in self.candidates]
+        self._masks = [char_mask(c) for c in self._lowered]
+        # What score() takes off for length, with the boost already added.
+        self._base = [b - len(c) * LENGTH for b, c in zip(self._boosts, self._lowered)]
+        # char -> indices of the candidates containing it, built on first use.
+        self._buckets: Dict[str, List[int]] = {}
+        # query -> hits, only for prefixes of the current query.
+        self._cache: Dict[str, List[Tuple[int, float]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.candidates)
+
+    def search(self, query: str) -> List[Tuple[int, float]]:
+        """Return (candidate index, score) pairs, best first.
+
+        An empty query matches everything in the original order.
+        """
+        query = query.lower()
+        if not query:
+            self._cache.clear()
+            return [(i, 0.0) for i in range(len(self.candidates))]
+
+        cached = self._cache.get(query)
+        if cached is not None:
+            self._keep_prefixes_of(query)
+            return cached
+
+        # Narrow the longest cached prefix's hits instead of rescanning.
+        self._keep_prefixes_of(query)
+        pool: Optional[List[int]] = None
+        for n in range(len(query) - 1, 0, -1):
+            hits = self._cache.get(query[:n])
+            if hits is not None:
+                pool = [i for i, _ in hits]
+                break
+        if pool is None:
+            self._cache.clear()
+            if len(query) == 1:
+                pool = self._bucket(query)
+            else:
+                # The smallest bucket of the query's characters built so far;
+                # building one costs as much as the mask test of everything.
+                built = [self._buckets[ch] for ch in set(query) if ch in self._buckets]
+                if built:
+                    pool = min(built, key=len)
+                else:
+                    pool = range(len(self.candidates))  # type: ignore[assignment]
+
+        lowered = self._lowered
+        base = self._base
+        results: List[Tuple[int, float]]
+        if len(query) == 1:
+            # What score() works out for one character, minus the calls:
+            # every candidate in the bucket matches, at its first occurrence.
+            results = []
+            for i in pool:
+                text = lowered[i]
+                pos = text.find(query)
+                if pos == 0:
+                    bonus = MATCH + PREFIX
+                elif text[pos - 1] in _SEPARATORS:
+                    bonus = MATCH + WORD_START
+                else:
+                    bonus = MATCH
+                results.append((i, bonus + base[i]))
+        else:
+            wanted = char_mask(query)
+            masks = self._masks
+            boosts = self._boosts
+            results = []
+            for i in pool:
+                if masks[i] & wanted != wanted:
+                    continue
+                s = score(lowered[i], query)
+                if s is not None:
+                    results.append((i, s + boosts[i]))
+
+        # Stable sort: equal scores keep the caller's order (e.g. frecency).
+        results.sort(key=lambda hit: -hit[1])
+        self._cache[query] = results
+        return results
+
+    def filter(self, query: str) -> List[str]:
+        """Return the matching candidate names, best first."""
+        return [self.candidates[i] for i, _ in self.search(query)]
+
+    def _bucket(self, ch: str) -> List[int]:
+        bucket = self._buckets.get(ch)
+        if bucket is None:
+            lowered = self._lowered
+            bit = char_mask(ch)
+            # The mask test is exact for a-z and 0-9 and rules out most
+            # candidates for the rest.
+            bucket = [i for i, m in enumerate(self._masks) if m & bit and ch in lowered[i]]
+            self._buckets[ch] = bucket
+        return bucket
+
+    def _keep_prefixes_of(self, query: str) -> None:
+        for key in [k for k in self._cache if not query.startswith(k)]:
+            del self._cache[key]
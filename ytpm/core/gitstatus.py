@@ -0,0 +1,253 @@
+# ytpm/core/gitstatus.py
+
+from __future__ import annotations
+
+import os
+import subprocess
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from ytpm.core.storage import cache_dir, read_json, write_json
+
+# Files whose (mtime, size) tell whether a repository's status may have
+# changed: HEAD (checkout), index (add, commit, merge) and FETCH_HEAD (fetch).
+STAMP_FILES = ("HEAD", "index", "FETCH_HEAD")
+
+
+class GitStatus(NamedTuple):
+    """Branch and state of the repository a directory is in."""
+
+    # Branch name, or "(abc1234)" on a detached HEAD.
+    branch: str
+    dirty: bool = False
+    # Commits ahead of and behind the upstream branch, if there is one.
+    ahead: int = 0
+    behind: int = 0
+
+    def describe(self) -> str:
+        """Short form for a list row, e.g. "main* +1 -2"."""
+        text = self.branch + ("*" if self.dirty else "")
+        if self.ahead:
+            text += f" +{self.ahead}"
+        if self.behind:
+            text += f" -{self.behind}"
+        return text
+
+
+def find_git_dir(path: str) -> Optional[str]:
+    """The git directory of the repository `path` is in, if any.
+
+    Handles worktrees and submodules, whose .git is a file naming the real
+    directory.
+    """
+    current = os.path.abspath(path)
+    while True:
+        dot_git = os.path.join(current, ".git")
+        if os.path.isdir(dot_git):
+            return dot_git
+        if os.path.isfile(dot_git):
+            try:
+                with open(dot_git) as f:
+                    line = f.readline().strip()
+            except OSError:
+                return None
+            if line.startswith("gitdir:"):
+                return os.path.join(current, line[len("gitdir:") :].strip())
+            return None
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+def parse_status(output: str) -> GitStatus:
+    """Parse `git status --porcelain=v2 --branch`."""
+    oid = head = ""
+    ahead = behind = 0
+    dirty = False
+    for line in output.splitlines():
+        if line.startswith("# branch.oid "):
+            oid = line[len("# branch.oid ") :]
+        elif line.startswith("# branch.head "):
+            head = line[len("# branch.head ") :]
+        elif line.startswith("# branch.ab "):
+            a, b = line[len("# branch.ab ") :].split()
+            ahead, behind = int(a), -int(b)
+        elif line and not line.startswith("#"):
+            dirty = True
+    if head == "(detached)":
+        head = f"({oid[:7]})"
+    return GitStatus(head, dirty, ahead, behind)
+
+
+class GitStatusCache:
+    """Git status of session directories, computed at most once per change.
+
+    An entry is reused while the (mtime, size) of the repository's HEAD,
+    index and FETCH_HEAD are what they were when it was computed, so an
+    unchanged repository costs a few stats and no git process. Edits to
+    files that aren't staged don't touch any of those, so entries are also
+    recomputed once they are older than `ttl` seconds.
+
+    Misses are computed by `git status` in a pool of at most `max_workers`
+    threads; the results are kept in $XDG_CACHE_HOME/ytpm/git-status.json
+    for other ytpm processes.
+    """
+
+    VERSION = 1
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        ttl: float = 30.0,
+        max_workers: int = 8,
+        timeout: float = 10.0,
+        max_entries: int = 500,
+        binary: str = "git",
+    ) -> None:
+        self.path = path or cache_dir() / "git-status.json"
+        self.ttl = ttl
+        self.max_workers = max_workers
+        # Seconds one `git status` may take (huge or networked repositories).
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.binary = binary
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        # Entries computed since the file was read.
+        self._changed: Dict[str, Dict[str, Any]] = {}
+
+    def statuses(self, paths: Iterable[str]) -> Iterator[Tuple[str, Optional[GitStatus]]]:
+        """Yield (path, status) for each path as soon as it is known.
+
+        Cached statuses come first, then the others as their git processes
+        finish. Paths outside any repository get None.
+        """
+        entries = self._load()
+        missing: List[Tuple[str, str]] = []
+        try:
+            for path in dict.fromkeys(paths):
+                entry = entries.get(path)
+                if entry is not None and self._fresh(entry):
+                    status = entry.get("status")
+                    yield path, GitStatus(*status) if status else None
+                    continue
+                git_dir = find_git_dir(path)
+                if git_dir is None:
+                    # Not cached: finding out took only the stats above.
+                    yield path, None
+                    continue
+                missing.append((path, git_dir))
+            yield from self._compute(missing)
+        finally:
+            self._save()
+
+    def _compute(
+        self, missing: List[Tuple[str, str]]
+    ) -> Iterator[Tuple[str, Optional[GitStatus]]]:
+        if not missing:
+            return
+        # Stamps are taken before running git, so a change that lands while
+        # it runs makes the entry stale instead of being lost.
+        stamps = {path: _stamp(git_dir) for path, git_dir in missing}
+        if len(missing) == 1:
+            path, git_dir = missing[0]
+            status = self._run_git(path)
+            self._store(path, git_dir, status, stamps[path])
+            yield path, status
+            return
+
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        pool = ThreadPoolExecutor(max_workers=min(len(missing), self.max_workers))
+        try:
+            futures = {
+                pool.submit(self._run_git, path): (path, git_dir) for path, git_dir in missing
+            }
+            for future in as_completed(futures):
+                path, git_dir = futures[future]
+                status = future.result()
+                self._store(path, git_dir, status, stamps[path])
+                yield path, status
+        finally:
+            # A consumer that stops early doesn't wait for the rest.
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run_git(self, path: str) -> Optional[GitStatus]:
+        try:
+            result = subprocess.run(
+                [
+                    self.binary,
+                    # Don't refresh the index: that would be a change of our own.
+                    "--no-optional-locks",
+                    "-C",
+                    path,
+                    "status",
+                    "--porcelain=v2",
+                    "--branch",
+                ],
+                capture_output=True,
+                text=True,
+                timeout=self.timeout,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        if result.returncode != 0:
+            return None
+        return parse_status(result.stdout)
+
+    def _fresh(self, entry: Dict[str, Any]) -> bool:
+        if not 0 <= time.time() - entry.get("time", 0) < self.ttl:
+            return False
+        return entry.get("stamp") == _stamp(entry["git"])
+
+    def _store(
+        self, path: str, git_dir: str, status: Optional[GitStatus], stamp: List[List[int]]
+    ) -> None:
+        entry = {
+            "git": git_dir,
+            "stamp": stamp,
+            "time": time.time(),
+            "status": list(status) if status is not None else None,
+        }
+        self._load()[path] = entry
+        self._changed[path] = entry
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            data = read_json(self.path, default=None)
+            if isinstance(data, dict) and data.get("version") == self.VERSION:
+                self._entries = dict(data.get("repos", {}))
+            else:
+                self._entries = {}
+        return self._entries
+
+    def _save(self) -> None:
+        """Merge our new entries into the file another process may have written."""
+        if not self._changed:
+            return
+        data = read_json(self.path, default=None)
+        entries: Dict[str, Dict[str, Any]] = {}
+        if isinstance(data, dict) and data.get("version") == self.VERSION:
+            entries = dict(data.get("repos", {}))
+        entries.update(self._changed)
+        if len(entries) > self.max_entries:
+            newest = sorted(entries.items(), key=lambda item: -item[1].get("time", 0))
+            entries = dict(newest[: self.max_entries])
+        try:
+            write_json(self.path, {"version": self.VERSION, "repos": entries})
+        except OSError:
+            return  # only a cache
+        self._entries = entries
+        self._changed = {}
+
+
+def _stamp(git_dir: str) -> List[List[int]]:
+    stamp = []
+    for name in STAMP_FILES:
+        try:
+            st = os.stat(os.path.join(git_dir, name))
+            stamp.append([st.st_mtime_ns, st.st_size])
+        except OSError:
+            stamp.append([])
+    return stamp
@@ -2,22 +2,195 @@
 
 from __future__ import annotations
 
+import fnmatch
 import os
-from typing import Protocol, List
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Protocol, List, Sequence, Tuple
 
-from ytpm.adapters.tmux import TmuxAdapter
+from ytpm.adapters.batch import SKIPPED, BatchResult
+from ytpm.adapters.server import server_socket
+from ytpm.adapters.session import Pane, Session
+from ytpm.adapters.tmux import TmuxAdapter, TmuxCommandError, TmuxTimeoutError, quote_arg
+from ytpm.core.frecency import FrecencyStore
+from ytpm.core.profile import traced
+from ytpm.core.projects import Project, ProjectIndex, ScanStats
+from ytpm.core.storage import cache_dir, read_json, write_json
+
+if TYPE_CHECKING:
+    from ytpm.core.config import Config, ReapConfig, SessionConfig
+    from ytpm.core.gitstatus import GitStatus, GitStatusCache
+    from ytpm.core.reap import Reaped
+    from ytpm.core.snapshot import SavedSession
+    from ytpm.core.usage import SessionUsage, UsageSampler
+    from ytpm.core.workspace import Plan
+
+
+class BatchProtocol(Protocol):
+    """Operations queued up and sent to the multiplexer in one go."""
+
+    def create_session(
+        self, name: str, cwd: str, exist_ok: bool = False, window: str = ""
+    ) -> None: ...
+    def switch_client(self, name: str) -> None: ...
+    def attach(self, name: str) -> None: ...
+    def detach_client(self, command: str) -> None: ...
+    def kill_session(self, name: str, missing_ok: bool = False) -> None: ...
+    def new_window(self, session: str, name: str, cwd: str) -> None: ...
+    def split_window(self, target: str, cwd: str) -> None: ...
+    def rename_window(self, target: str, name: str) -> None: ...
+    def kill_window(self, target: str) -> None: ...
+    def kill_pane(self, target: str) -> None: ...
+    def send_keys(self, target: str, text: str) -> None: ...
+    def select_layout(self, target: str, layout: str) -> None: ...
+    def set_option(self, target: str, option: str, value: str) -> None: ...
+    def select_window(self, target: str) -> None: ...
+    def select_pane(self, target: str) -> None: ...
+    def respawn_pane(self, target: str, cwd: str, command: str) -> None: ...
+    def capture_pane(self, target: str, history: bool = False) -> None: ...
+    def run(self, check: bool = False) -> List[BatchResult]: ...
 
 
 class AdapterProtocol(Protocol):
     """Minimal interface Manager needs from an adapter."""
 
-    def list_sessions(self) -> List[str]: ...
+    def list_sessions(self) -> List[Session]: ...
+    def list_panes(self) -> List[Pane]: ...
+    def attached_clients(self) -> Dict[str, int]: ...
     def session_exists(self, name: str) -> bool: ...
     def create_session(self, name: str, cwd: str) -> None: ...
     def attach(self, name: str) -> None: ...
     def switch_client(self, name: str) -> None: ...
     def kill_session(self, name: str) -> None: ...
+    def set_hooks(self, events: Iterable[str], command: str, index: int) -> None: ...
+    def batch(self) -> BatchProtocol: ...
+
+
+class ItemResult(NamedTuple):
+    """Outcome for one session of a bulk operation."""
+
+    name: str
+    ok: bool
+    error: str = ""
+
+
+# (socket inode, generation file stamp) a snapshot was taken at.
+_Stamp = Tuple[int, List[int]]
+
+
+class SessionCache:
+    """Last known session list of the tmux server, shared by ytpm processes.
+
+    A snapshot on disk is trusted while all of these hold:
+
+    - no tmux hook fired since it was taken. Hooks installed on the server
+      append a byte to the generation file on every session change, so a
+      change shows up as a new (inode, size, mtime) of that file: one stat.
+    - the server's socket is the same file, i.e. the server wasn't
+      restarted (which would also have dropped our hooks).
+    - it is younger than `ttl`, as a safety net for anything hooks miss.
+    """
+
+    VERSION = 1
+
+    # An index of our own in each hook array; see TmuxAdapter.set_hooks.
+    HOOK_INDEX = 77
+
+    EVENTS = (
+        "session-created",
+        "session-closed",
+        "session-renamed",
+        "client-attached",
+        "client-detached",
+        "client-session-changed",
+        "window-linked",
+        "window-unlinked",
+    )
+
+    # The generation file is truncated (itself a change) once it gets this big.
+    MAX_GENERATION_BYTES = 1 << 16
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        generation_path: Optional[Path] = None,
+        ttl: float = 5.0,
+        server: Optional[str] = None,
+    ) -> None:
+        self.path = path or cache_dir() / "sessions.json"
+        self.generation_path = generation_path or cache_dir() / "sessions.gen"
+        self.ttl = ttl
+        self._server = server
+
+    def get(self) -> Optional[List[Session]]:
+        """Return the snapshot if it is still valid, else None."""
+        data = self._read()
+        stamp = self.stamp()
+        if data is None or stamp is None or data.get("stamp") != list(stamp):
+            return None
+        if not 0 <= time.time() - data.get("time", 0) < self.ttl:
+            return None
+        return [Session(*row) for row in data.get("sessions", [])]
+
+    def stamp(self) -> Optional[_Stamp]:
+        """Current state to tag a snapshot with; None if no server is running.
+
+        Take it *before* querying tmux, so a change that lands during the
+        query invalidates the snapshot rather than being lost.
+        """
+        try:
+            server = os.stat(self._server or server_socket()).st_ino
+        except OSError:
+            return None
+        try:
+            st = os.stat(self.generation_path)
+            generation = [st.st_ino, st.st_size, st.st_mtime_ns]
+        except OSError:
+            generation = []
+        return server, generation
+
+    def put(self, stamp: _Stamp, sessions: List[Session]) -> None:
+        write_json(
+            self.path,
+            {
+                "version": self.VERSION,
+                "stamp": list(stamp),
+                "time": time.time(),
+                "sessions": [list(s) for s in sessions],
+            },
+        )
 
+    def needs_hooks(self, stamp: _Stamp) -> bool:
+        """True unless the snapshot on disk was taken on this same server."""
+        data = self._read()
+        return data is None or not data.get("stamp") or data["stamp"][0] != stamp[0]
+
+    def hook_command(self) -> str:
+        """tmux command that bumps the generation, for set-hook."""
+        import shlex  # only needed when (re)installing hooks
+
+        # Quoted for the shell, then as one argument for tmux's parser;
+        # run-shell also expands formats, so "#" is doubled.
+        shell = f"printf . >> {shlex.quote(str(self.generation_path))}".replace("#", "##")
+        return f"run-shell -b {quote_arg(shell)}"
+
+    def invalidate(self) -> None:
+        """Bump the generation, for this and every other ytpm process."""
+        self.generation_path.parent.mkdir(parents=True, exist_ok=True)
+        mode = "a"
+        try:
+            if os.stat(self.generation_path).st_size >= self.MAX_GENERATION_BYTES:
+                mode = "w"
+        except OSError:
+            pass
+        with open(self.generation_path, mode) as f:
+            f.write(".")
+
+    def _read(self) -> Optional[Dict[str, Any]]:
+        data = read_json(self.path, default=None)
+        if not isinstance(data, dict) or data.get("version") != self.VERSION:
+            return None
+        return data
 
 
 class Manager:
@@ -25,41 +198,500 @@ class Manager:
 
     This is the "core" API used by CLI and TUI.
     """
-    def __init__(self, adapter: AdapterProtocol | None = None) -> None:
-        if adapter is None:
-            adapter = TmuxAdapter()
-        self.adapter = adapter
+
+    # Operations per tmux invocation in bulk calls; keeps the command line
+    # far below the kernel's argument size limit.
+    BULK_CHUNK = 200
+
+    def __init__(
+        self,
+        adapter: AdapterProtocol | None = None,
+        projects: ProjectIndex | None = None,
+        config: Config | None = None,
+        frecency: FrecencyStore | None = None,
+        cache: SessionCache | None = None,
+        servers: Sequence[str] = (),
+        git: GitStatusCache | None = None,
+        usage: UsageSampler | None = None,
+    ) -> None:
+        # The default tmux adapter comes with a session cache; callers that
+        # bring their own adapter pass a cache too if they want one.
+        if adapter is None and cache is None and not servers:
+            cache = SessionCache()
+        self.cache = cache
+        # Built on first use, so commands that never talk to tmux (scan, or
+        # ls answered from the cache) don't pay for the PATH lookup.
+        self._adapter = adapter
+        # Socket names or paths of the tmux servers to work across; see
+        # on_servers().
+        self.servers = list(servers)
+        self.projects = projects or ProjectIndex()
+        self.frecency = frecency or FrecencyStore()
+        self._config = config
+        self._git = git
+        self._usage = usage
+
+    @property
+    def adapter(self) -> AdapterProtocol:
+        if self._adapter is None:
+            if self.servers:
+                from ytpm.adapters.multi import MultiServerAdapter
+
+                self._adapter = MultiServerAdapter.from_sockets(self.servers)
+            else:
+                self._adapter = TmuxAdapter()
+        return self._adapter
+
+    def on_servers(self, servers: Sequence[str]) -> Manager:
+        """A Manager for several tmux servers (socket names or paths) at once.
+
+        Sessions of every server are listed together as "SERVER:NAME", with
+        Session.server set; the servers are asked concurrently, so listing
+        eight of them takes about as long as listing one. goto, kill and
+        the rest go to the server a name is qualified with, or to the one
+        that has an unqualified name (the first server for new sessions).
+        Projects, visits and config are shared with this Manager.
+        """
+        return Manager(
+            projects=self.projects,
+            config=self._config,
+            frecency=self.frecency,
+            servers=servers,
+            git=self._git,
+            usage=self._usage,
+        )
+
+    @property
+    def config(self) -> Config:
+        """The user's config, read on first use."""
+        if self._config is None:
+            from ytpm.core.config import load_config
+
+            self._config = load_config()
+        return self._config
+
+    @property
+    def git(self) -> GitStatusCache:
+        """Git status of session directories, made on first use."""
+        if self._git is None:
+            from ytpm.core.gitstatus import GitStatusCache
+
+            self._git = GitStatusCache()
+        return self._git
+
+    @property
+    def usage(self) -> UsageSampler:
+        """CPU and memory of session processes, made on first use."""
+        if self._usage is None:
+            from ytpm.core.usage import UsageSampler
+
+            self._usage = UsageSampler()
+        return self._usage
 
     # --- public API ---
-    def list_sessions(self) -> List[str]:
-        """Return a list of existing session names."""
-        return self.adapter.list_sessions()
+    @traced
+    def list_sessions(self) -> List[Session]:
+        """Return a record for every existing session, most frecent first."""
+        return self._ranked(self._sessions())
 
+    @traced
+    def session_exists(self, name: str) -> bool:
+        """Return True if the session exists."""
+        known = self._known_to_exist(name)
+        if known is not None:
+            return known
+        return self.adapter.session_exists(name)
+
+    @traced
     def create_session(self, name: str, cwd: str) -> None:
         """Create a new session, if it doesn't already exist."""
-        if self.adapter.session_exists(name):
-            # For now: no-op if exists (you could log or raise instead)
+        if self._known_to_exist(name):
             return
-        self.adapter.create_session(name, cwd)
+        batch = self.adapter.batch()
+        batch.create_session(name, cwd, exist_ok=True)
+        try:
+            batch.run(check=True)
+        finally:
+            self._invalidate()
+
+    @traced
+    def goto_session(self, name: str, cwd: Optional[str] = None) -> None:
+        """Ensure a session exists and then attach/switch to it.
 
-    def goto_session(self, name: str, cwd: str) -> None:
-        """Ensure a session exists and then attach/switch to it."""
-        if not self.adapter.session_exists(name):
-            self.adapter.create_session(name, cwd)
+        Without an explicit cwd, a new session starts in the directory of
+        the project with the same name (see scan_projects), or else in the
+        current directory.
+        """
+        # Recorded up front: outside tmux, attach only returns on detach.
+        self.frecency.visit(name)
 
+        batch = self.adapter.batch()
+        batch.create_session(name, self._goto_cwd(name, cwd), exist_ok=True)
         if self._inside_tmux():
-            self.adapter.switch_client(name)
+            batch.switch_client(name)
         else:
-            self.adapter.attach(name)
+            batch.attach(name)
+        try:
+            batch.run(check=True)
+        finally:
+            self._invalidate()
 
+    @traced
     def kill_session(self, name: str) -> None:
         """Kill a session if it exists."""
-        if self.adapter.session_exists(name):
-            self.adapter.kill_session(name)
+        if self._known_to_exist(name) is False:
+            return
+        batch = self.adapter.batch()
+        batch.kill_session(name, missing_ok=True)
+        try:
+            batch.run(check=True)
+        finally:
+            self._invalidate()
+
+    @traced
+    def create_sessions(self, sessions: Iterable[Tuple[str, str]]) -> List[ItemResult]:
+        """Create many (name, cwd) sessions at once; existing ones are kept.
+
+        Sessions are sent BULK_CHUNK to a tmux invocation, and one listing
+        afterwards tells which ones really exist.
+        """
+        return self._bulk(
+            list(sessions),
+            lambda batch, name, cwd: batch.create_session(name, cwd, exist_ok=True),
+            present=True,
+        )
+
+    @traced
+    def kill_sessions(self, names: Iterable[str]) -> List[ItemResult]:
+        """Kill many sessions at once; missing ones count as done."""
+        return self._bulk(
+            [(name, "") for name in names],
+            lambda batch, name, _: batch.kill_session(name, missing_ok=True),
+            present=False,
+        )
+
+    @traced
+    def with_real_clients(self, sessions: List[Session]) -> List[Session]:
+        """`sessions` with `attached` counting only clients someone looks at.
+
+        tmux's count includes control-mode clients, such as the ones ytpm's
+        daemon and TUI keep on a session; they would make it look attached
+        for good.
+        """
+        counts = self.adapter.attached_clients()
+        return [s._replace(attached=counts.get(s.id, 0)) for s in sessions]
+
+    @traced
+    def reap_sessions(
+        self, policy: ReapConfig | None = None, dry_run: bool = False
+    ) -> List[Reaped]:
+        """Kill the sessions `policy` (default: the config's [reap]) selects.
+
+        Activity and attached state come from a fresh listing, not the
+        session cache, with control-mode clients not counted as attached
+        (see with_real_clients()); the selected sessions are killed together through
+        kill_sessions(). Sessions of the config's [[sessions]] are never
+        reaped. With `dry_run`, only report what would be killed.
+        """
+        from ytpm.core.reap import select_sessions
+
+        reaped = select_sessions(
+            self.with_real_clients(self.adapter.list_sessions()),
+            policy or self.config.reap,
+            now=time.time(),
+            protected=[s.name for s in self.config.sessions],
+        )
+        if dry_run or not reaped:
+            return reaped
+        results = {r.name: r for r in self.kill_sessions(r.name for r in reaped)}
+        return [r._replace(ok=results[r.name].ok, error=results[r.name].error) for r in reaped]
+
+    def match_sessions(
+        self, patterns: Iterable[str], exclude: Iterable[str] = ()
+    ) -> List[str]:
+        """Names of sessions matching any glob in `patterns` and none in `exclude`."""
+        patterns, exclude = list(patterns), list(exclude)
+        return [
+            s.name
+            for s in self._sessions()
+            if any(fnmatch.fnmatchcase(s.name, p) for p in patterns)
+            and not any(fnmatch.fnmatchcase(s.name, p) for p in exclude)
+        ]
+
+    @traced
+    def apply_workspace(
+        self,
+        sessions: Optional[Iterable[SessionConfig]] = None,
+        prune: bool = False,
+        dry_run: bool = False,
+    ) -> Plan:
+        """Bring tmux in line with the configured sessions and return the plan.
+
+        The live state is read with one tmux call, so applying an unchanged
+        workspace costs nothing more; changes run in batches of BULK_CHUNK
+        operations. See ytpm.core.workspace.plan for what gets changed.
+        """
+        from ytpm.core.workspace import plan
+
+        if sessions is None:
+            sessions = self.config.sessions
+        result = plan(sessions, self.adapter.list_panes(), prune=prune)
+        if not dry_run:
+            self._run_plan(result)
+        return result
+
+    @traced
+    def save_snapshot(
+        self, path: Optional[Path] = None, scrollback: bool = False
+    ) -> List[SavedSession]:
+        """Save every session's windows, panes and layouts; return what was saved.
+
+        The layout comes from one tmux call; with `scrollback`, pane contents
+        are captured BULK_CHUNK panes per call.
+        """
+        from ytpm.core.snapshot import default_snapshot_path, from_panes, write_snapshot
+
+        panes = self.adapter.list_panes()
+        contents: Dict[str, str] = {}
+        if scrollback:
+            for start in range(0, len(panes), self.BULK_CHUNK):
+                chunk = panes[start : start + self.BULK_CHUNK]
+                batch = self.adapter.batch()
+                for pane in chunk:
+                    batch.capture_pane(pane.id, True)
+                # A pane closed since the listing stops the batch; the rest
+                # are saved without contents.
+                for pane, r in zip(chunk, batch.run()):
+                    if r.ok:
+                        contents[pane.id] = r.output
+        sessions = from_panes(panes, contents)
+        write_snapshot(path or default_snapshot_path(), sessions)
+        return sessions
+
+    @traced
+    def restore_snapshot(self, path: Optional[Path] = None, dry_run: bool = False) -> Plan:
+        """Rebuild the saved sessions that don't exist; return the plan.
+
+        Everything is created in batches of BULK_CHUNK operations, so a
+        restore costs a handful of tmux calls however big the snapshot.
+        """
+        from ytpm.core.snapshot import default_snapshot_path, plan_restore, read_snapshot
+
+        saved = read_snapshot(path or default_snapshot_path())
+        existing = [s.name for s in self.adapter.list_sessions()]
+        scratch = None if dry_run else cache_dir() / "scrollback"
+        result = plan_restore(saved, existing, scratch)
+        if not dry_run:
+            self._run_plan(result)
+        return result
+
+    def git_statuses(self, paths: Iterable[str]) -> Iterator[Tuple[str, Optional[GitStatus]]]:
+        """(path, status) of the repository each directory is in, as each
+        becomes known: cached ones at once, others from `git status` run
+        in a thread pool. Directories outside a repository get None."""
+        return self.git.statuses(paths)
+
+    @traced
+    def session_usage(self) -> List[SessionUsage]:
+        """CPU and memory used by each session's processes, from one
+        list-panes call and one pass over /proc. CPU% is over the time since
+        the previous call on this Manager (None on the first)."""
+        return self.usage.sample(self.adapter.list_panes())
+
+    def frecency_scores(self, names: Iterable[str]) -> Dict[str, float]:
+        """How often and how recently each name was visited with goto."""
+        return self.frecency.scores(names)
+
+    def list_projects(self) -> List[Project]:
+        """Return the projects found by the last scan."""
+        return self.projects.projects
+
+    @traced
+    def scan_projects(self, full: bool = False) -> ScanStats:
+        """Look for projects under the configured roots and remember them."""
+        return self.projects.scan(self.config.scan, full=full)
 
     # --- internal helpers ---
 
+    def _run_plan(self, plan: Plan) -> None:
+        """Run a plan's operations in batches of BULK_CHUNK."""
+        if not plan:
+            return
+        try:
+            for start in range(0, len(plan.ops), self.BULK_CHUNK):
+                batch = self.adapter.batch()
+                for op, args in plan.ops[start : start + self.BULK_CHUNK]:
+                    getattr(batch, op)(*args)
+                batch.run(check=True)
+        finally:
+            self._invalidate()
+
+    @traced
+    def _sessions(self) -> List[Session]:
+        """The session list, from the cache when it is still valid."""
+        cache = self.cache
+        if cache is None:
+            return self.adapter.list_sessions()
+        sessions = cache.get()
+        if sessions is not None:
+            return sessions
+
+        stamp = cache.stamp()
+        if stamp is None:
+            # No server, nothing to cache (or hook into).
+            return self.adapter.list_sessions()
+        cacheable = True
+        if cache.needs_hooks(stamp):
+            try:
+                self.adapter.set_hooks(cache.EVENTS, cache.hook_command(), cache.HOOK_INDEX)
+            except TmuxCommandError:
+                cacheable = False
+        sessions = self.adapter.list_sessions()
+        if cacheable:
+            cache.put(stamp, sessions)
+        return sessions
+
+    def _bulk(
+        self,
+        items: List[Tuple[str, str]],
+        queue: Callable[[BatchProtocol, str, str], None],
+        present: bool,
+    ) -> List[ItemResult]:
+        """Run one queued op per (name, cwd) item; ok means the session
+        ends up existing (`present`) or gone (not `present`).
+
+        If tmux stops answering, no more chunks are sent; the listing still
+        tells which items got done, and the others fail with the timeout. If
+        the listing times out too, what tmux reported per op is all there is.
+        """
+        snapshot = self.cache.get() if self.cache is not None else None
+        known = {s.name for s in snapshot} if snapshot is not None else None
+        # Items the snapshot already shows as done cost nothing.
+        pending = [i for i in items if known is None or (i[0] in known) != present]
+        if not pending:
+            return [ItemResult(name, True) for name, _ in items]
+
+        errors: Dict[str, str] = {}
+        # Items done before we started, or by an op tmux reported as ok.
+        done = {name for name, _ in items} - {name for name, _ in pending}
+        # Why items not done yet failed, once tmux timed out.
+        stalled = ""
+        try:
+            while pending:
+                chunk = pending[: self.BULK_CHUNK]
+                batch = self.adapter.batch()
+                for name, cwd in chunk:
+                    queue(batch, name, cwd)
+                try:
+                    results = batch.run()
+                except TmuxTimeoutError as e:
+                    # tmux may have got through part of the chunk.
+                    stalled = e.summary
+                    break
+                # tmux stops at a failing command; the rest go in the next round.
+                skipped = [i for i, r in zip(chunk, results) if r.error == SKIPPED]
+                for (name, _), r in zip(chunk, results):
+                    if r.ok:
+                        done.add(name)
+                    elif r.error != SKIPPED:
+                        errors[name] = r.error
+                if len(skipped) == len(chunk):
+                    break
+                pending = skipped + pending[len(chunk):]
+        finally:
+            self._invalidate()
+
+        # A failure nested in an existence guard is reported on the last op
+        # of its batch, so ask tmux what actually happened.
+        try:
+            existing = {s.name for s in self.adapter.list_sessions()}
+        except TmuxTimeoutError as e:
+            stalled = stalled or e.summary
+            existing = done if present else {name for name, _ in items} - done
+        fallback = "session still exists" if not present else "session was not created"
+        results: List[ItemResult] = []
+        for name, _ in items:
+            if (name in existing) == present:
+                results.append(ItemResult(name, True))
+            else:
+                results.append(ItemResult(name, False, errors.get(name) or stalled or fallback))
+        return results
+
+    def _known_to_exist(self, name: str) -> Optional[bool]:
+        """Answer from a valid cached snapshot; None if there is none."""
+        if self.cache is None:
+            return None
+        sessions = self.cache.get()
+        if sessions is None:
+            return None
+        return any(s.name == name for s in sessions)
+
+    def _invalidate(self) -> None:
+        if self.cache is not None:
+            self.cache.invalidate()
+
+    def _ranked(self, sessions: List[Session]) -> List[Session]:
+        """Most frecent first; unvisited sessions keep the adapter's order."""
+        order = {name: i for i, name in enumerate(self.frecency.rank(s.name for s in sessions))}
+        return sorted(sessions, key=lambda s: order[s.name])
+
+    def _goto_cwd(self, name: str, cwd: Optional[str]) -> str:
+        """Start directory for goto: explicit, else the project's, else here."""
+        if cwd is not None:
+            return cwd
+        # "SERVER:NAME" in multi-server mode; tmux names never contain ":".
+        project = self.projects.find(name.rpartition(":")[2])
+        return project.path if project is not None else os.getcwd()
+
     def _inside_tmux(self) -> bool:
         """Return True if we are currently running inside a tmux session."""
         # tmux sets the TMUX environment variable inside sessions
         return "TMUX" in os.environ
+
+
+class AsyncAdapterProtocol(Protocol):
+    """Interface AsyncManager needs from an asyncio adapter."""
+
+    async def list_sessions(self) -> List[Session]: ...
+    async def session_exists(self, name: str) -> bool: ...
+    async def active_panes(self) -> Dict[str, Tuple[str, int]]: ...
+    async def capture_pane(self, target: str) -> str: ...
+
+
+class AsyncManager:
+    """Non-blocking read side of Manager, for callers on an event loop (TUI).
+
+    Queries don't block the loop and can run concurrently.
+    asyncio is imported on use, so CLI commands never load it.
+    """
+    def __init__(self, adapter: AsyncAdapterProtocol | None = None) -> None:
+        if adapter is None:
+            from ytpm.adapters.aio import AsyncTmuxAdapter
+
+            adapter = AsyncTmuxAdapter()
+        self.adapter = adapter
+
+    # --- public API ---
+    async def list_sessions(self) -> List[Session]:
+        """Return a record for every existing session."""
+        return await self.adapter.list_sessions()
+
+    async def session_exists(self, name: str) -> bool:
+        """Return True if the session exists."""
+        return await self.adapter.session_exists(name)
+
+    async def sessions_exist(self, names: Iterable[str]) -> Dict[str, bool]:
+        """Check several sessions at once; the queries run concurrently."""
+        import asyncio
+
+        names = list(names)
+        found = await asyncio.gather(*(self.adapter.session_exists(n) for n in names))
+        return dict(zip(names, found))
+
+    async def active_panes(self) -> Dict[str, Tuple[str, int]]:
+        """Map session ids to (active pane id, activity timestamp)."""
+        return await self.adapter.active_panes()
+
+    async def capture_pane(self, pane_id: str) -> str:
+        """Return what a pane currently shows."""
+        return await self.adapter.capture_pane(pane_id)
@@ -0,0 +1,203 @@
+# ytpm/core/profile.py
+
+from __future__ import annotations
+
+import sys
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from ytpm.adapters import events
+from ytpm.adapters.events import CommandEvent
+
+# Upper bounds (ms) of the latency histogram buckets; one more bucket
+# collects everything slower.
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+# tmux options that come before the command and take a value.
+_GLOBAL_FLAGS_WITH_VALUE = frozenset({"-L", "-S", "-f", "-c", "-T"})
+
+
+class Stats:
+    """Call count, failures and latency histogram of one command or span."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.bytes_read = 0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, seconds: float, error: bool = False, bytes_read: int = 0) -> None:
+        self.count += 1
+        self.errors += error
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.bytes_read += bytes_read
+        ms = seconds * 1000
+        bucket = 0
+        while bucket < len(BUCKETS_MS) and ms > BUCKETS_MS[bucket]:
+            bucket += 1
+        self.buckets[bucket] += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound (ms) of the bucket holding the q-quantile."""
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS_MS, self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return float(bound)
+        return round(self.max_seconds * 1000, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={b}ms" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": round(self.seconds * 1000, 3),
+            "max_ms": round(self.max_seconds * 1000, 3),
+            "p50_ms": self.quantile(0.5),
+            "p99_ms": self.quantile(0.99),
+            "bytes_read": self.bytes_read,
+            "histogram": {label: n for label, n in zip(labels, self.buckets) if n},
+        }
+
+
+class _Span:
+    """Times the block it guards as one call of a Manager operation."""
+
+    def __init__(self, profiler: Profiler, name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.profiler._stack.append(self.name)
+        self.start = time.perf_counter()
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        seconds = time.perf_counter() - self.start
+        self.profiler._stack.pop()
+        self.profiler.spans.setdefault(self.name, Stats()).add(seconds, exc_type is not None)
+
+
+class Profiler:
+    """Aggregates tmux command events and Manager spans of one ytpm run.
+
+    Commands are grouped by the tmux command(s) on the line; the raw events
+    are kept too (up to MAX_EVENTS), each with the span it ran in.
+    """
+
+    MAX_EVENTS = 10_000
+
+    def __init__(self) -> None:
+        self.commands: Dict[str, Stats] = {}
+        self.spans: Dict[str, Stats] = {}
+        self.events: List[Dict[str, Any]] = []
+        self._stack: List[str] = []
+        self._start = time.perf_counter()
+
+    def record(self, event: CommandEvent) -> None:
+        name = command_name(event.argv)
+        self.commands.setdefault(name, Stats()).add(
+            event.seconds, event.returncode != 0, event.bytes_read
+        )
+        if len(self.events) < self.MAX_EVENTS:
+            self.events.append(
+                {
+                    "at_ms": round((time.perf_counter() - self._start - event.seconds) * 1000, 3),
+                    "command": name,
+                    "argv": event.argv,
+                    "returncode": event.returncode,
+                    "ms": round(event.seconds * 1000, 3),
+                    "bytes_read": event.bytes_read,
+                    "transport": event.transport,
+                    "span": self._stack[-1] if self._stack else None,
+                }
+            )
+
+    def span(self, name: str) -> _Span:
+        return _Span(self, name)
+
+    def to_dict(self) -> Dict[str, Any]:
+        def table(stats: Dict[str, Stats]) -> Dict[str, Any]:
+            ordered = sorted(stats.items(), key=lambda item: -item[1].seconds)
+            return {name: s.to_dict() for name, s in ordered}
+
+        return {
+            "wall_ms": round((time.perf_counter() - self._start) * 1000, 3),
+            "commands": table(self.commands),
+            "spans": table(self.spans),
+            "events": self.events,
+        }
+
+    def dump(self, destination: str) -> None:
+        """Write the report as JSON to a file, or to stderr for "-"."""
+        import json  # only paid for when profiling
+
+        text = json.dumps(self.to_dict(), indent=2) + "\n"
+        if destination == "-":
+            sys.stderr.write(text)
+        else:
+            with open(destination, "w") as f:
+                f.write(text)
+
+
+def command_name(argv: List[str]) -> str:
+    """The tmux commands on a command line, e.g. "if-shell+switch-client".
+
+    Each command is named once, and the display-message markers batches
+    put after each operation are left out (unless that is all there is).
+    """
+    i = 1
+    while i < len(argv) and argv[i].startswith("-"):
+        i += 2 if argv[i] in _GLOBAL_FLAGS_WITH_VALUE else 1
+    names: List[str] = []
+    expect_command = True
+    for arg in argv[i:]:
+        if arg == ";":
+            expect_command = True
+        elif expect_command:
+            if arg not in names:
+                names.append(arg)
+            expect_command = False
+    real = [n for n in names if n != "display-message"]
+    return "+".join(real or names) or "tmux"
+
+
+_active: Optional[Profiler] = None
+
+
+def start() -> Profiler:
+    """Start collecting; tmux commands and traced calls are recorded."""
+    global _active
+    _active = Profiler()
+    events.observer = _active.record
+    return _active
+
+
+def stop() -> Optional[Profiler]:
+    """Stop collecting and return what was collected."""
+    global _active
+    profiler, _active = _active, None
+    events.observer = None
+    return profiler
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def traced(fn: F) -> F:
+    """Record each call of `fn` as a span while profiling is on."""
+    name = fn.__qualname__
+
+    @wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if _active is None:
+            return fn(*args, **kwargs)
+        with _active.span(name):
+            return fn(*args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
@@ -0,0 +1,229 @@
+# ytpm/core/projects.py
+
+from __future__ import annotations
+
+import fnmatch
+import os
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from ytpm.core.storage import cache_dir, read_json, write_json
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from ytpm.core.config import ScanConfig
+
+STATE_VERSION = 1
+
+
+class Project(NamedTuple):
+    """A directory that looks like a project (it has a marker file)."""
+
+    name: str
+    path: str
+
+
+class ScanStats(NamedTuple):
+    projects: int
+    dirs: int
+    # Directories whose mtime changed (or were new), so they were listed again.
+    rescanned: int
+    seconds: float
+
+
+class _DirState(NamedTuple):
+    mtime_ns: int
+    subdirs: List[str]
+    is_project: bool
+
+
+class _Visited(NamedTuple):
+    path: str
+    state: _DirState
+    rescanned: bool
+
+
+class _Chunk(NamedTuple):
+    visited: List[_Visited]
+    # Directories this task didn't get to; they become new tasks.
+    leftover: List[Tuple[str, int]]
+
+
+class ProjectIndex:
+    """Discovered projects, persisted between runs.
+
+    Two files are kept in the cache dir:
+
+    - projects.json: the small name -> path list that lookups read.
+    - scan-state.json: every visited directory with its mtime, its
+      subdirectories and whether it is a project.
+
+    A directory's mtime only changes when entries are added, removed or
+    renamed in it, so a rescan stats every known directory but only lists
+    (scandir) the ones that changed.
+    """
+
+    def __init__(
+        self,
+        projects_path: Optional[Path] = None,
+        state_path: Optional[Path] = None,
+    ) -> None:
+        self.projects_path = projects_path or cache_dir() / "projects.json"
+        self.state_path = state_path or cache_dir() / "scan-state.json"
+        self._projects: Optional[List[Project]] = None
+
+    # --- lookups ---
+
+    @property
+    def projects(self) -> List[Project]:
+        if self._projects is None:
+            raw = read_json(self.projects_path, default=[])
+            self._projects = [Project(name, path) for name, path in raw]
+        return self._projects
+
+    def find(self, name: str) -> Optional[Project]:
+        """Return the project called `name`; the shallowest path wins ties."""
+        matches = [p for p in self.projects if p.name == name]
+        if not matches:
+            return None
+        return min(matches, key=lambda p: (p.path.count(os.sep), p.path))
+
+    # --- scanning ---
+
+    def scan(self, config: ScanConfig, full: bool = False) -> ScanStats:
+        """Walk the configured roots in parallel and persist the result.
+
+        With full=True every directory is listed again, ignoring mtimes.
+        """
+        started = time.monotonic()
+        roots = config.expanded_roots()
+        fingerprint = [
+            roots,
+            config.max_depth,
+            sorted(config.markers),
+            sorted(config.ignore),
+            config.skip_hidden,
+            config.descend_into_projects,
+        ]
+
+        raw = read_json(self.state_path, default={})
+        old: Dict[str, _DirState] = {}
+        if (
+            not full
+            and raw.get("version") == STATE_VERSION
+            and raw.get("config") == fingerprint
+        ):
+            old = {path: _DirState(*entry) for path, entry in raw.get("dirs", {}).items()}
+
+        walker = _Walker(config, old)
+        new = walker.walk(roots)
+
+        projects = sorted(
+            (Project(os.path.basename(path), path) for path, d in new.items() if d.is_project),
+            key=lambda p: (p.name, p.path),
+        )
+        write_json(
+            self.state_path,
+            {
+                "version": STATE_VERSION,
+                "config": fingerprint,
+                "dirs": {path: list(d) for path, d in new.items()},
+            },
+        )
+        write_json(self.projects_path, [list(p) for p in projects])
+        self._projects = projects
+
+        return ScanStats(
+            projects=len(projects),
+            dirs=len(new),
+            rescanned=walker.rescanned,
+            seconds=time.monotonic() - started,
+        )
+
+
+class _Walker:
+    """One parallel walk over the roots.
+
+    Each pool task walks depth-first through up to CHUNK directories and
+    hands whatever is left back to be split into new tasks. That keeps every
+    worker busy without paying for a future per directory.
+    """
+
+    CHUNK = 64
+
+    def __init__(self, config: ScanConfig, old: Dict[str, _DirState]) -> None:
+        self.config = config
+        self.old = old
+        self.markers: Set[str] = set(config.markers)
+        self.rescanned = 0
+
+    def walk(self, roots: List[str]) -> Dict[str, _DirState]:
+        # Only scans need threads; keep them out of every CLI start.
+        from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+        result: Dict[str, _DirState] = {}
+        workers = max(1, self.config.workers)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending: Set[Future[_Chunk]] = {
+                pool.submit(self._walk_chunk, [(root, 0)]) for root in dict.fromkeys(roots)
+            }
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = future.result()
+                    for visited in chunk.visited:
+                        result[visited.path] = visited.state
+                        self.rescanned += visited.rescanned
+                    # Spread the leftovers over the idle workers.
+                    leftover = chunk.leftover
+                    parts = max(1, min(len(leftover), workers - len(pending)))
+                    for i in range(parts):
+                        if leftover[i::parts]:
+                            pending.add(pool.submit(self._walk_chunk, leftover[i::parts]))
+        return result
+
+    def _walk_chunk(self, stack: List[Tuple[str, int]]) -> _Chunk:
+        visited: List[_Visited] = []
+        while stack and len(visited) < self.CHUNK:
+            path, depth = stack.pop()
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+
+            cached = self.old.get(path)
+            if cached is not None and cached.mtime_ns == mtime_ns:
+                state, rescanned = cached, False
+            else:
+                try:
+                    state = self._list(path, mtime_ns)
+                except OSError:
+                    continue
+                rescanned = True
+            visited.append(_Visited(path, state, rescanned))
+
+            if depth < self.config.max_depth and (
+                self.config.descend_into_projects or not state.is_project
+            ):
+                stack.extend((os.path.join(path, name), depth + 1) for name in state.subdirs)
+        return _Chunk(visited, stack)
+
+    def _list(self, path: str, mtime_ns: int) -> _DirState:
+        is_project = False
+        subdirs: List[str] = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                name = entry.name
+                if name in self.markers:
+                    is_project = True
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                if self.config.skip_hidden and name.startswith("."):
+                    continue
+                if any(fnmatch.fnmatchcase(name, pattern) for pattern in self.config.ignore):
+                    continue
+                subdirs.append(name)
+        subdirs.sort()
+        return _DirState(mtime_ns, subdirs, is_project)
@@ -0,0 +1,98 @@
+# ytpm/core/reap.py
+
+from __future__ import annotations
+
+import fnmatch
+from typing import Iterable, List, NamedTuple, Optional
+
+from ytpm.adapters.session import Session
+from ytpm.core.config import ReapConfig
+
+
+class Reaped(NamedTuple):
+    """A session a reap policy selected, why, and whether killing it worked."""
+
+    name: str
+    reason: str
+    ok: bool = True
+    error: str = ""
+
+
+def select_sessions(
+    sessions: Iterable[Session],
+    policy: ReapConfig,
+    now: float,
+    protected: Iterable[str] = (),
+) -> List[Reaped]:
+    """The sessions `policy` reaps, least recently active first.
+
+    A session may be reaped unless it is attached (and the policy leaves
+    attached sessions alone), matches a `protect` pattern or is in
+    `protected`, or doesn't match any of the policy's `patterns`. Sessions
+    listed from several servers ("SERVER:NAME") match by either name. Of
+    those:
+
+    - every one idle for at least `idle` is reaped;
+    - if more than `max_sessions` sessions would still be left, the least
+      recently active of the rest go too, until that many are left or no
+      reapable ones remain.
+    """
+    sessions = list(sessions)
+    keep = set(protected)
+
+    def matches(session: Session, patterns: List[str]) -> bool:
+        return any(fnmatch.fnmatchcase(name, p) for name in _names(session) for p in patterns)
+
+    candidates = [
+        s
+        for s in sessions
+        if keep.isdisjoint(_names(s))
+        and (policy.attached or not s.attached)
+        and not matches(s, policy.protect)
+        and (not policy.patterns or matches(s, policy.patterns))
+    ]
+    candidates.sort(key=lambda s: s.activity)
+
+    reaped: List[Reaped] = []
+    idle: Optional[float] = policy.idle_seconds()
+    if idle is not None:
+        for s in candidates:
+            if now - s.activity >= idle:
+                reaped.append(Reaped(s.name, f"idle for {_age(now - s.activity)}"))
+
+    if policy.max_sessions:
+        left = len(sessions) - len(reaped)
+        chosen = {r.name for r in reaped}
+        for s in candidates:
+            if left <= policy.max_sessions:
+                break
+            if s.name in chosen:
+                continue
+            reaped.append(
+                Reaped(
+                    s.name,
+                    f"least recently active (idle for {_age(now - s.activity)}) "
+                    f"of {len(sessions)} sessions, max {policy.max_sessions}",
+                )
+            )
+            left -= 1
+    return reaped
+
+
+def _names(session: Session) -> List[str]:
+    if not session.server:
+        return [session.name]
+    return [session.name, session.name[len(session.server) + 1 :]]
+
+
+def _age(seconds: float) -> str:
+    """Largest two units, e.g. "2d3h", "45m", "12s"."""
+    seconds = max(0, int(seconds))
+    parts = []
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60), ("s", 1)):
+        if seconds >= size or (unit == "s" and not parts):
+            parts.append(f"{seconds // size}{unit}")
+            seconds %= size
+        if len(parts) == 2:
+            break
+    return "".join(parts)
@@ -0,0 +1,218 @@
+# ytpm/core/snapshot.py
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from ytpm.adapters.session import Pane
+from ytpm.core.storage import state_dir
+from ytpm.core.workspace import Plan
+
+# Bumped when the file format changes incompatibly.
+VERSION = 1
+
+
+class SnapshotError(RuntimeError):
+    """Raised when a snapshot file can't be read."""
+
+
+class SavedPane(NamedTuple):
+    path: str
+    active: bool = False
+    # The pane's screen and history, with colours; "" unless saved with it.
+    scrollback: str = ""
+
+
+class SavedWindow(NamedTuple):
+    name: str
+    layout: str
+    active: bool
+    panes: List[SavedPane]
+
+
+class SavedSession(NamedTuple):
+    name: str
+    windows: List[SavedWindow]
+
+
+def default_snapshot_path() -> Path:
+    return state_dir() / "snapshot.jsonl.gz"
+
+
+def from_panes(
+    panes: Iterable[Pane], scrollback: Optional[Dict[str, str]] = None
+) -> List[SavedSession]:
+    """Group live panes (one list_panes call) into sessions to save.
+
+    `scrollback` maps pane IDs to their captured contents.
+    """
+    scrollback = scrollback or {}
+    sessions: Dict[str, Dict[str, List[Pane]]] = {}
+    for pane in panes:
+        sessions.setdefault(pane.session, {}).setdefault(pane.window_id, []).append(pane)
+
+    result: List[SavedSession] = []
+    for name, windows in sessions.items():
+        saved: List[SavedWindow] = []
+        for window in sorted(windows.values(), key=lambda ps: ps[0].window_index):
+            window.sort(key=lambda p: p.index)
+            first = window[0]
+            saved.append(
+                SavedWindow(
+                    first.window_name,
+                    first.layout,
+                    first.window_active,
+                    [SavedPane(p.path, p.active, scrollback.get(p.id, "")) for p in window],
+                )
+            )
+        result.append(SavedSession(name, saved))
+    return result
+
+
+def write_snapshot(path: Path, sessions: Iterable[SavedSession]) -> int:
+    """Write sessions as gzipped JSON lines, one per session, and return
+    how many were written.
+
+    Sessions are streamed to a temporary file that replaces `path` only
+    once complete, so an interrupted save keeps the previous snapshot.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    count = 0
+    try:
+        with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", compresslevel=6) as f:
+            f.write(_line({"version": VERSION, "created": int(time.time())}))
+            for session in sessions:
+                f.write(_line(_encode(session)))
+                count += 1
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return count
+
+
+def read_snapshot(path: Path) -> List[SavedSession]:
+    """Read a snapshot written by write_snapshot()."""
+    try:
+        with gzip.open(path, "rt") as f:
+            lines = iter(f)
+            header = json.loads(next(lines, "null"))
+            if not isinstance(header, dict) or header.get("version") != VERSION:
+                raise SnapshotError(f"{path}: not a ytpm snapshot (version {VERSION})")
+            return [_decode(json.loads(line)) for line in lines]
+    except FileNotFoundError:
+        raise SnapshotError(f"{path}: no such snapshot; save one with `ytpm save`") from None
+    except (OSError, EOFError, ValueError, KeyError, TypeError) as e:
+        raise SnapshotError(f"{path}: unreadable snapshot: {e}") from None
+
+
+def _line(data: Any) -> str:
+    return json.dumps(data, separators=(",", ":")) + "\n"
+
+
+def _encode(session: SavedSession) -> Dict[str, Any]:
+    # Short keys and only non-default values: hundreds of panes add up.
+    windows = []
+    for w in session.windows:
+        panes = []
+        for p in w.panes:
+            pane: Dict[str, Any] = {"p": p.path}
+            if p.active:
+                pane["a"] = 1
+            if p.scrollback:
+                pane["s"] = p.scrollback
+            panes.append(pane)
+        window: Dict[str, Any] = {"n": w.name, "l": w.layout, "p": panes}
+        if w.active:
+            window["a"] = 1
+        windows.append(window)
+    return {"n": session.name, "w": windows}
+
+
+def _decode(data: Dict[str, Any]) -> SavedSession:
+    return SavedSession(
+        data["n"],
+        [
+            SavedWindow(
+                w["n"],
+                w.get("l", ""),
+                bool(w.get("a")),
+                [SavedPane(p["p"], bool(p.get("a")), p.get("s", "")) for p in w["p"]],
+            )
+            for w in data["w"]
+            if w["p"]
+        ],
+    )
+
+
+def plan_restore(
+    saved: Iterable[SavedSession], existing: Iterable[str], scratch: Optional[Path] = None
+) -> Plan:
+    """Plan the rebuild of every saved session that doesn't exist now.
+
+    Sessions that exist are left alone, whatever they contain. Saved
+    scrollback is written to files in `scratch` and shown in the restored
+    pane by cat-ing it before the shell starts; without `scratch` it is
+    left out.
+    """
+    existing = set(existing)
+    result = Plan()
+    for session in saved:
+        if session.name in existing or not session.windows:
+            continue
+        existing.add(session.name)
+        panes = sum(len(w.panes) for w in session.windows)
+        result.change(
+            "create", "session", session.name, f"{len(session.windows)} windows, {panes} panes"
+        )
+        _plan_session(result, session, scratch)
+    return result
+
+
+def _plan_session(result: Plan, session: SavedSession, scratch: Optional[Path]) -> None:
+    end = f"={session.name}:{{end}}"
+    active_window = 0
+    for position, window in enumerate(session.windows):
+        first = window.panes[0]
+        if position == 0:
+            result.op("create_session", session.name, first.path, False, window.name)
+        else:
+            result.op("new_window", session.name, window.name, first.path)
+        for i, pane in enumerate(window.panes):
+            if i:
+                result.op("split_window", end, pane.path)
+            # The newest pane is the active one, so the window reaches it.
+            if pane.scrollback and scratch is not None:
+                result.op("respawn_pane", end, pane.path, _show_then_shell(pane, scratch))
+        if len(window.panes) > 1 and window.layout:
+            result.op("select_layout", end, window.layout)
+        # Each split made the new (last) pane active; step back to the saved one.
+        active = next((i for i, p in enumerate(window.panes) if p.active), len(window.panes) - 1)
+        back = len(window.panes) - 1 - active
+        if back:
+            result.op("select_pane", f"{end}.-{back}")
+        if window.active:
+            active_window = position
+    # New windows are created in the background, so the first one is current.
+    if active_window:
+        result.op("select_window", f"={session.name}:+{active_window}")
+
+
+def _show_then_shell(pane: SavedPane, scratch: Path) -> str:
+    scratch.mkdir(parents=True, exist_ok=True)
+    fd, name = tempfile.mkstemp(dir=scratch, suffix=".txt")
+    with os.fdopen(fd, "w") as f:
+        f.write(pane.scrollback)
+    quoted = "'" + name.replace("'", "'\\''") + "'"
+    return f'cat -- {quoted}; rm -f -- {quoted}; exec "${{SHELL:-/bin/sh}}"'
+
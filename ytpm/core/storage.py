@@ -0,0 +1,83 @@
+# ytpm/core/storage.py
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+
+def _xdg_dir(env: str, fallback: str) -> Path:
+    base = os.environ.get(env) or os.path.join(os.path.expanduser("~"), fallback)
+    return Path(base) / "ytpm"
+
+
+def config_dir() -> Path:
+    """Where the user's config lives ($XDG_CONFIG_HOME/ytpm)."""
+    return _xdg_dir("XDG_CONFIG_HOME", ".config")
+
+
+def cache_dir() -> Path:
+    """Where rebuildable data lives ($XDG_CACHE_HOME/ytpm)."""
+    return _xdg_dir("XDG_CACHE_HOME", ".cache")
+
+
+def state_dir() -> Path:
+    """Where history worth keeping lives ($XDG_STATE_HOME/ytpm)."""
+    return _xdg_dir("XDG_STATE_HOME", os.path.join(".local", "state"))
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    """Replace `path` with `data` so readers see either the old or new file.
+
+    The data is written to a temporary file in the same directory and then
+    renamed over the target, so a crash mid-write never leaves a torn file.
+    The data is synced before the rename, or a power loss could leave the
+    new name pointing at an empty file, and the directory after it, so the
+    rename itself is on disk.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    _sync_dir(path.parent)
+
+
+def _sync_dir(path: Path) -> None:
+    # Best effort: not every platform or filesystem can sync a directory.
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_json(path: Path, data: Any) -> None:
+    """Atomically write `data` as compact JSON."""
+    atomic_write(path, json.dumps(data, separators=(",", ":")).encode())
+
+
+def read_json(path: Path, default: Any = None) -> Any:
+    """Read JSON from `path`, or return `default` if it's missing or corrupt."""
+    try:
+        with open(path, "rb") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
@@ -0,0 +1,162 @@
+# ytpm/core/usage.py
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from ytpm.adapters.session import Pane
+
+
+class SessionUsage(NamedTuple):
+    """CPU and memory used by the processes running in one session's panes."""
+
+    session: str
+    panes: int = 0
+    # The pane processes and all their descendants.
+    processes: int = 0
+    # Resident memory in bytes. Pages shared between processes (a forked
+    # server's workers, say) count once per process, as in top's RES.
+    rss: int = 0
+    # CPU seconds the live processes have used so far.
+    cpu_time: float = 0.0
+    # Share of one CPU since the previous sample (100.0 is a whole core);
+    # None on the first sample.
+    cpu_percent: Optional[float] = None
+
+
+# What a sample keeps of a process: (ppid, start time in ticks after boot,
+# user + system CPU ticks, resident pages).
+_Proc = Tuple[int, int, int, int]
+
+
+def parse_stat(data: bytes) -> Optional[_Proc]:
+    """Parse /proc/PID/stat; see proc(5)."""
+    # The command name may contain spaces and parentheses: it ends at the
+    # last ")", and field 3 (state) starts two bytes later.
+    fields = data[data.rfind(b")") + 2 :].split()
+    try:
+        return int(fields[1]), int(fields[19]), int(fields[11]) + int(fields[12]), int(fields[21])
+    except (IndexError, ValueError):
+        return None
+
+
+def read_processes(root: str = "/proc") -> Dict[int, _Proc]:
+    """Every process on the machine, from one pass over /proc.
+
+    Only each process's stat file is read: one open and one read per
+    process, which is what makes a sample every second affordable with
+    thousands of them.
+    """
+    processes: Dict[int, _Proc] = {}
+    for name in os.listdir(root):
+        if not name.isdigit():
+            continue
+        try:
+            fd = os.open(f"{root}/{name}/stat", os.O_RDONLY)
+        except OSError:
+            continue  # exited since the listing
+        try:
+            data = os.read(fd, 4096)
+        except OSError:
+            continue
+        finally:
+            os.close(fd)
+        proc = parse_stat(data)
+        if proc is not None:
+            processes[int(name)] = proc
+    return processes
+
+
+class UsageSampler:
+    """Per-session CPU and memory from /proc, cheap enough to take every second.
+
+    A sample reads every process's stat file once and walks down from each
+    pane's process (tmux's #{pane_pid}) through a parent -> children index.
+    That index is kept between samples and rebuilt only when some process's
+    parent changed, i.e. when processes were started, exited or reparented.
+
+    CPU% is how much each process's CPU time grew since the previous
+    sample, over the wall time in between. Processes are told apart by
+    (pid, start time), so a pid reused since then starts from zero.
+    """
+
+    def __init__(
+        self,
+        root: str = "/proc",
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.root = root
+        self.clock = clock
+        self.ticks_per_second = os.sysconf("SC_CLK_TCK")
+        self.page_size = os.sysconf("SC_PAGE_SIZE")
+        self._parents: Dict[int, int] = {}
+        self._children: Dict[int, List[int]] = {}
+        # CPU ticks of each session process, by (pid, start time), at the
+        # previous sample, and when that was.
+        self._ticks: Dict[Tuple[int, int], int] = {}
+        self._time: Optional[float] = None
+
+    def sample(self, panes: Iterable[Pane]) -> List[SessionUsage]:
+        """Usage of each session the panes belong to, in order of appearance."""
+        now = self.clock()
+        processes = read_processes(self.root)
+        self._index(processes)
+
+        roots: Dict[str, List[int]] = {}
+        for pane in panes:
+            roots.setdefault(pane.session, []).append(pane.pid)
+
+        elapsed = now - self._time if self._time is not None else 0.0
+        ticks: Dict[Tuple[int, int], int] = {}
+        usage = []
+        for session, pids in roots.items():
+            tree = self._tree(pids, processes)
+            rss = total = grown = 0
+            for pid in tree:
+                _, start, cpu, pages = processes[pid]
+                key = (pid, start)
+                ticks[key] = cpu
+                rss += pages
+                total += cpu
+                # A process that is new since the last sample used all of
+                # its CPU time after it.
+                grown += cpu - self._ticks.get(key, 0)
+            usage.append(
+                SessionUsage(
+                    session=session,
+                    panes=len(pids),
+                    processes=len(tree),
+                    rss=rss * self.page_size,
+                    cpu_time=total / self.ticks_per_second,
+                    cpu_percent=(
+                        100.0 * grown / self.ticks_per_second / elapsed if elapsed > 0 else None
+                    ),
+                )
+            )
+        self._ticks = ticks
+        self._time = now
+        return usage
+
+    def _index(self, processes: Dict[int, _Proc]) -> None:
+        parents = {pid: proc[0] for pid, proc in processes.items()}
+        if parents == self._parents:
+            return
+        children: Dict[int, List[int]] = {}
+        for pid, ppid in parents.items():
+            children.setdefault(ppid, []).append(pid)
+        self._parents = parents
+        self._children = children
+
+    def _tree(self, pids: List[int], processes: Dict[int, _Proc]) -> List[int]:
+        """The running ones of `pids` and all their descendants."""
+        seen = set()
+        stack = [pid for pid in pids if pid in processes]
+        while stack:
+            pid = stack.pop()
+            if pid in seen:
+                continue
+            seen.add(pid)
+            stack.extend(self._children.get(pid, ()))
+        return list(seen)
@@ -0,0 +1,188 @@
+# ytpm/core/workspace.py
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+from ytpm.adapters.session import Pane
+from ytpm.adapters.tmux import WORKSPACE_OPTION
+from ytpm.core.config import SessionConfig, WindowConfig
+
+
+class Change(NamedTuple):
+    """One line of a plan, as shown to the user."""
+
+    action: str  # "create", "rename" or "kill"
+    kind: str  # "session", "window" or "pane"
+    target: str
+    detail: str = ""
+
+
+# A batch method name and its arguments, e.g. ("kill_window", ("@3",)).
+Op = Tuple[str, Tuple[Any, ...]]
+
+
+class Plan:
+    """What `ytpm apply` will change, and the tmux operations that do it.
+
+    Built from the desired sessions and one snapshot of every pane on the
+    server (see plan()). Operations are in the order they must run: a window
+    is created before panes are split in it.
+    """
+
+    def __init__(self) -> None:
+        self.changes: List[Change] = []
+        self.ops: List[Op] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.ops)
+
+    def change(self, action: str, kind: str, target: str, detail: str = "") -> None:
+        self.changes.append(Change(action, kind, target, detail))
+
+    def op(self, name: str, *args: Any) -> None:
+        self.ops.append((name, args))
+
+
+class _LiveWindow(NamedTuple):
+    id: str
+    index: int
+    name: str
+    panes: List[Pane]
+
+
+def plan(
+    sessions: Iterable[SessionConfig], panes: Iterable[Pane], prune: bool = False
+) -> Plan:
+    """Diff the desired sessions against the live panes.
+
+    Only what is missing is created: existing windows are matched by name
+    (or renamed when a window sits at the desired position under a name the
+    config doesn't use), and commands are only typed into new panes. With
+    `prune`, extra windows and panes of configured sessions are killed, and
+    so are sessions an earlier apply created that are no longer configured.
+    """
+    live = _live_sessions(panes)
+    result = Plan()
+    desired = list(sessions)
+
+    for session in desired:
+        windows = live.get(session.name)
+        if windows is None:
+            _plan_new_session(result, session)
+        elif session.windows:
+            _plan_windows(result, session, windows, prune)
+
+    if prune:
+        configured = {s.name for s in desired}
+        for name, windows in live.items():
+            if name not in configured and windows[0].panes[0].workspace:
+                result.change("kill", "session", name)
+                result.op("kill_session", name)
+    return result
+
+
+def _live_sessions(panes: Iterable[Pane]) -> Dict[str, List[_LiveWindow]]:
+    """Group panes into windows and sessions, in tmux's index order."""
+    by_window: Dict[str, _LiveWindow] = {}
+    sessions: Dict[str, List[_LiveWindow]] = {}
+    for pane in panes:
+        window = by_window.get(pane.window_id)
+        if window is None:
+            window = _LiveWindow(pane.window_id, pane.window_index, pane.window_name, [])
+            by_window[pane.window_id] = window
+            sessions.setdefault(pane.session, []).append(window)
+        window.panes.append(pane)
+    for windows in sessions.values():
+        windows.sort(key=lambda w: w.index)
+        for window in windows:
+            window.panes.sort(key=lambda p: p.index)
+    return sessions
+
+
+def _plan_new_session(result: Plan, session: SessionConfig) -> None:
+    result.change("create", "session", session.name, session.root)
+    if not session.windows:
+        result.op("create_session", session.name, session.expanded_root())
+        result.op("set_option", f"={session.name}:", WORKSPACE_OPTION, "1")
+        return
+
+    first, *rest = session.windows
+    # exist_ok=False: the snapshot said it doesn't exist, and if that
+    # changed since, the rest of the plan doesn't apply.
+    result.op("create_session", session.name, session.window_path(first), False, first.name)
+    result.op("set_option", f"={session.name}:", WORKSPACE_OPTION, "1")
+    _plan_panes(result, session, first, _end(session), [], new_window=True)
+    for window in rest:
+        _plan_new_window(result, session, window)
+
+
+def _plan_new_window(result: Plan, session: SessionConfig, window: WindowConfig) -> None:
+    result.change("create", "window", f"{session.name}:{window.name}")
+    result.op("new_window", session.name, window.name, session.window_path(window))
+    _plan_panes(result, session, window, _end(session), [], new_window=True)
+
+
+def _plan_windows(
+    result: Plan, session: SessionConfig, live: List[_LiveWindow], prune: bool
+) -> None:
+    wanted = {w.name for w in session.windows}
+    unmatched = list(live)
+    for position, window in enumerate(session.windows):
+        match = next((w for w in unmatched if w.name == window.name), None)
+        if match is None and position < len(live):
+            # Same position, under a name the config doesn't use: rename it.
+            candidate = live[position]
+            if candidate in unmatched and candidate.name not in wanted:
+                match = candidate
+                result.change(
+                    "rename", "window", f"{session.name}:{candidate.name}", f"-> {window.name}"
+                )
+                result.op("rename_window", candidate.id, window.name)
+        if match is None:
+            _plan_new_window(result, session, window)
+            continue
+        unmatched.remove(match)
+        _plan_panes(result, session, window, match.id, match.panes, new_window=False)
+        if prune:
+            for pane in match.panes[len(window.panes):]:
+                result.change("kill", "pane", f"{session.name}:{window.name}.{pane.index}")
+                result.op("kill_pane", pane.id)
+
+    if prune:
+        for window in unmatched:
+            result.change("kill", "window", f"{session.name}:{window.name}")
+            result.op("kill_window", window.id)
+
+
+def _plan_panes(
+    result: Plan,
+    session: SessionConfig,
+    window: WindowConfig,
+    target: str,
+    live: List[Pane],
+    new_window: bool,
+) -> None:
+    """Fill `window` up to its configured panes.
+
+    Commands go into new panes only. A new pane is the active one of its
+    window, so `target` (the window) is enough to reach it.
+    """
+    path = session.window_path(window)
+    start = 1 if new_window else len(live)
+    if new_window and window.panes[0]:
+        result.op("send_keys", target, window.panes[0])
+    added = False
+    for command in window.panes[start:]:
+        result.change("create", "pane", f"{session.name}:{window.name}", command)
+        result.op("split_window", target, path)
+        if command:
+            result.op("send_keys", target, command)
+        added = True
+    if window.layout and (added or new_window):
+        result.op("select_layout", target, window.layout)
+
+
+def _end(session: SessionConfig) -> str:
+    """Target of the last window of a session: the one just created."""
+    return f"={session.name}:{{end}}"
@@ -0,0 +1,156 @@
+# ytpm/daemon/client.py
+
+from __future__ import annotations
+
+import os
+import stat
+import sys
+
+from ytpm.adapters.server import server_socket
+
+# `typing` alone costs several ms to import; annotations here are never
+# evaluated, so it is only imported for type checkers.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import List, Optional
+
+# Subcommands the client hands to a running daemon; the rest always run
+# in-process (scan and tui are long-running anyway).
+FORWARDED = frozenset({"ls", "new", "goto", "kill"})
+
+# Connecting is the only step that may fall back to in-process execution;
+# once a request is sent, the daemon may already have acted on it.
+CONNECT_TIMEOUT = 0.2
+REPLY_TIMEOUT = 30.0
+
+
+def runtime_dir() -> str:
+    """$XDG_RUNTIME_DIR, else a directory of our own in /tmp, as tmux does."""
+    return os.environ.get("XDG_RUNTIME_DIR") or f"/tmp/ytpm-{os.getuid()}"
+
+
+def socket_path() -> str:
+    """Where the daemon listens: $YTPM_SOCKET, else the user's runtime dir."""
+    path = os.environ.get("YTPM_SOCKET")
+    if path:
+        return path
+    return os.path.join(runtime_dir(), "ytpm", "daemon.sock")
+
+
+def private_dirs(path: str) -> List[str]:
+    """Directories that must be ours alone for a socket at `path` to be trusted.
+
+    Its own directory, and the runtime directory above it: in /tmp, anyone
+    could have created /tmp/ytpm-UID before us.
+    """
+    directory = os.path.dirname(path)
+    base = runtime_dir()
+    return [base, directory] if os.path.dirname(directory) == base else [directory]
+
+
+def check_private(path: str, directory: bool) -> Optional[str]:
+    """Why `path` isn't ours alone, or None if it is.
+
+    Like tmux's check of its socket directory: not a symlink, a directory
+    (or else a socket), owned by us and without group or other permissions.
+    """
+    try:
+        st = os.lstat(path)
+    except OSError as e:
+        return f"{path}: {e.strerror}"
+    if directory and not stat.S_ISDIR(st.st_mode):
+        return f"{path}: not a directory"
+    if not directory and not stat.S_ISSOCK(st.st_mode):
+        return f"{path}: not a socket"
+    if st.st_uid != os.getuid():
+        return f"{path}: owned by another user"
+    if st.st_mode & 0o077:
+        return f"{path}: accessible to other users (mode {stat.S_IMODE(st.st_mode):o})"
+    return None
+
+
+def check_socket(path: str) -> Optional[str]:
+    """Why the daemon socket at `path` can't be trusted, or None."""
+    for directory in private_dirs(path):
+        problem = check_private(directory, directory=True)
+        if problem is not None:
+            return problem
+    return check_private(path, directory=False)
+
+
+def forward(argv: List[str]) -> Optional[int]:
+    """Run `argv` through a running daemon and return its exit code.
+
+    Returns None when the command should run in-process instead: it isn't
+    one the daemon serves, no daemon is listening, or the daemon declined
+    (another protocol version, or this client sees another tmux server, e.g.
+    from a pane of `tmux -L other`). For goto, the daemon only prepares the
+    session; the final switch-client/attach is exec'd here so it runs in
+    this terminal, with this process's tmux client.
+
+    A socket that isn't ours alone (see check_socket) is never used: its
+    replies decide what this process runs.
+    """
+    if not argv or argv[0] not in FORWARDED or os.environ.get("YTPM_NO_DAEMON"):
+        return None
+    if os.environ.get("YTPM_PROFILE"):
+        # Profiling is about this process's own tmux calls.
+        return None
+    if "-" in argv:
+        # Reads our stdin (`new -`), which the daemon can't see.
+        return None
+    path = socket_path()
+    if not os.path.exists(path):
+        # The usual case without a daemon; skip loading socket and json.
+        return None
+    problem = check_socket(path)
+    if problem is not None:
+        print(f"ytpm: not using the daemon socket: {problem}", file=sys.stderr)
+        return None
+
+    import socket
+
+    from ytpm.daemon import protocol
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(path)
+        except OSError:
+            return None
+        sock.settimeout(REPLY_TIMEOUT)
+        protocol.send(
+            sock,
+            {
+                "version": protocol.PROTOCOL_VERSION,
+                "argv": argv,
+                "cwd": os.getcwd(),
+                "server": server_socket(),
+                "inside_tmux": "TMUX" in os.environ,
+            },
+        )
+        reply = protocol.recv(sock)
+    except (OSError, protocol.ProtocolError) as e:
+        print(f"Error: ytpm daemon: {e}", file=sys.stderr)
+        return 1
+    finally:
+        sock.close()
+
+    if reply.get("fallback"):
+        return None
+    sys.stdout.write(reply.get("stdout", ""))
+    sys.stderr.write(reply.get("stderr", ""))
+    target = reply.get("goto")
+    if target and isinstance(target, str):
+        # Built here: all a reply can make us run is tmux.
+        verb = "switch-client" if "TMUX" in os.environ else "attach-session"
+        exec_args = ["tmux", verb, "-t", f"={target}"]
+        sys.stdout.flush()
+        sys.stderr.flush()
+        try:
+            os.execvp(exec_args[0], exec_args)
+        except OSError as e:
+            print(f"Error: {exec_args[0]}: {e}", file=sys.stderr)
+            return 1
+    return int(reply.get("code", 1))
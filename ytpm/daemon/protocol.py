@@ -0,0 +1,67 @@
+# ytpm/daemon/protocol.py
+#
+# Wire format shared by the daemon and the thin client. The client imports
+# this whenever a daemon socket exists, so it must stay cheap: nothing from
+# the rest of ytpm.
+
+from __future__ import annotations
+
+import json
+import socket
+import struct
+
+TYPE_CHECKING = False  # as in client.py: no typing at run time
+if TYPE_CHECKING:
+    from typing import Any, Dict
+
+# 2: a goto reply names the session instead of a command to exec.
+PROTOCOL_VERSION = 2
+
+# Frames are a 4-byte big-endian length followed by that many bytes of JSON.
+_HEADER = struct.Struct(">I")
+MAX_FRAME = 16 << 20
+
+
+class ProtocolError(RuntimeError):
+    """Raised when the other side sends something that isn't a valid frame."""
+
+
+def encode(message: Dict[str, Any]) -> bytes:
+    payload = json.dumps(message, separators=(",", ":")).encode()
+    return _HEADER.pack(len(payload)) + payload
+
+
+def decode_length(header: bytes) -> int:
+    (length,) = _HEADER.unpack(header)
+    if length > MAX_FRAME:
+        raise ProtocolError(f"frame of {length} bytes is too large")
+    return length
+
+
+def decode(payload: bytes) -> Dict[str, Any]:
+    try:
+        message = json.loads(payload)
+    except ValueError as e:
+        raise ProtocolError(f"invalid frame: {e}") from e
+    if not isinstance(message, dict):
+        raise ProtocolError("frame is not an object")
+    return message
+
+
+def send(sock: socket.socket, message: Dict[str, Any]) -> None:
+    sock.sendall(encode(message))
+
+
+def recv(sock: socket.socket) -> Dict[str, Any]:
+    length = decode_length(_recv_exactly(sock, _HEADER.size))
+    return decode(_recv_exactly(sock, length))
+
+
+def _recv_exactly(sock: socket.socket, n: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ProtocolError("connection closed mid-frame")
+        buf += chunk
+    return bytes(buf)
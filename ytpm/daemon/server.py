@@ -0,0 +1,219 @@
+# ytpm/daemon/server.py
+
+from __future__ import annotations
+
+import asyncio
+import io
+import os
+import signal
+import socket
+import sys
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Any, Dict, List, Optional
+
+from ytpm.adapters.control import TmuxControlAdapter
+from ytpm.adapters.notify import ControlSubscriber
+from ytpm.adapters.server import server_socket
+from ytpm.adapters.session import Session
+from ytpm.core.manager import Manager
+from ytpm.daemon import protocol
+from ytpm.daemon.client import check_private, private_dirs, socket_path
+
+
+class DaemonError(RuntimeError):
+    """Raised when the daemon cannot start."""
+
+
+class DaemonManager(Manager):
+    """Manager as the daemon runs it, on behalf of one client at a time.
+
+    The session list is kept between requests while the notification
+    client is attached (so no change can be missed) and dropped whenever
+    tmux reports a change or we make one ourselves.
+
+    goto creates the session and records the visit, but leaves the
+    switch/attach to the client: it has to run in the client's terminal.
+    """
+
+    def __init__(self, *args: Any, binary: str = "tmux", **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.binary = binary
+        self.subscriber: Optional[ControlSubscriber] = None
+        # Set per request from what the client reports.
+        self.client_inside_tmux = False
+        # Session the client should switch or attach to once the request is done.
+        self.goto: Optional[str] = None
+        self._snapshot: Optional[List[Session]] = None
+
+    def invalidate(self) -> None:
+        self._snapshot = None
+
+    def _invalidate(self) -> None:
+        # Every change we make goes through here, bulk ones included.
+        super()._invalidate()
+        self.invalidate()
+
+    def list_sessions(self) -> List[Session]:
+        sessions = self._snapshot
+        if sessions is None:
+            sessions = self.adapter.list_sessions()
+            if self.subscriber is not None:
+                sessions = self.subscriber.discount(sessions)
+                if self.subscriber.connected:
+                    self._snapshot = sessions
+        return self._ranked(sessions)
+
+    def goto_session(self, name: str, cwd: Optional[str] = None) -> None:
+        self.frecency.visit(name)
+        self.create_session(name, self._goto_cwd(name, cwd))
+        self.goto = name
+
+    def _inside_tmux(self) -> bool:
+        return self.client_inside_tmux
+
+
+class Daemon:
+    """Serves CLI requests over a Unix socket from one warm Manager.
+
+    Requests are handled one at a time on the event loop, the same way the
+    CLI would run them (see ytpm.cli.main.run), with output captured and
+    sent back.
+    """
+
+    def __init__(
+        self,
+        manager: DaemonManager,
+        path: Optional[str] = None,
+        live_updates: bool = True,
+    ) -> None:
+        self.manager = manager
+        self.path = path or socket_path()
+        self.server = server_socket()
+        self._subscriber: Optional[ControlSubscriber] = (
+            ControlSubscriber(on_change=manager.invalidate, binary=manager.binary)
+            if live_updates
+            else None
+        )
+        manager.subscriber = self._subscriber
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._watcher: Optional[asyncio.Task[None]] = None
+        self._stopped = asyncio.Event()
+
+    async def start(self) -> None:
+        self._claim_socket()
+        self._server = await asyncio.start_unix_server(self._handle, self.path)
+        os.chmod(self.path, 0o600)
+        if self._subscriber is not None:
+            self._watcher = asyncio.create_task(self._subscriber.run())
+
+    async def stop(self) -> None:
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        self._stopped.set()
+
+    async def run(self) -> None:
+        """Serve until SIGINT/SIGTERM."""
+        await self.start()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, lambda: asyncio.ensure_future(self.stop()))
+        print(f"ytpm daemon listening on {self.path}", file=sys.stderr)
+        await self._stopped.wait()
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one request and build the reply."""
+        if (
+            request.get("version") != protocol.PROTOCOL_VERSION
+            or request.get("server") != self.server
+        ):
+            return {"fallback": True}
+
+        # Deferred: cli.main is what starts the daemon.
+        from ytpm.cli.main import run
+
+        manager = self.manager
+        manager.client_inside_tmux = bool(request.get("inside_tmux"))
+        manager.goto = None
+        out, err = io.StringIO(), io.StringIO()
+        cwd = os.getcwd()
+        try:
+            # Relative paths and default directories are the client's.
+            os.chdir(request.get("cwd") or cwd)
+            with redirect_stdout(out), redirect_stderr(err):
+                try:
+                    code = run(list(request.get("argv", [])), manager)
+                except SystemExit as e:  # argparse: --help or bad arguments
+                    code = e.code if isinstance(e.code, int) else 2
+        except OSError as e:
+            return {"code": 1, "stdout": "", "stderr": f"Error: {e}\n"}
+        finally:
+            os.chdir(cwd)
+
+        reply: Dict[str, Any] = {"code": code, "stdout": out.getvalue(), "stderr": err.getvalue()}
+        if code == 0 and manager.goto is not None:
+            reply["goto"] = manager.goto
+        return reply
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            header = await reader.readexactly(4)
+            payload = await reader.readexactly(protocol.decode_length(header))
+            reply = self.handle(protocol.decode(payload))
+            writer.write(protocol.encode(reply))
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, protocol.ProtocolError):
+            pass
+        finally:
+            writer.close()
+
+    def _claim_socket(self) -> None:
+        """Remove a stale socket, or fail if another daemon is listening on it.
+
+        The socket's directories are created private, and must be private
+        if they already exist: clients only trust a socket nobody else
+        could have put there (see check_socket).
+        """
+        directories = private_dirs(self.path)
+        os.makedirs(os.path.dirname(directories[0]), exist_ok=True)
+        for directory in directories:
+            try:
+                os.mkdir(directory, 0o700)
+            except FileExistsError:
+                pass
+            problem = check_private(directory, directory=True)
+            if problem is not None:
+                raise DaemonError(f"refusing to listen: {problem}")
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+        except FileNotFoundError:
+            return
+        except OSError:
+            os.unlink(self.path)
+            return
+        finally:
+            probe.close()
+        raise DaemonError(f"a daemon is already listening on {self.path}")
+
+
+def serve() -> None:
+    """Entry point of `ytpm daemon`."""
+    # One control-mode connection, reused by every request.
+    adapter = TmuxControlAdapter()
+    try:
+        asyncio.run(Daemon(DaemonManager(adapter=adapter, binary=adapter.binary)).run())
+    finally:
+        adapter.close()
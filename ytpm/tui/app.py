@@ -1,21 +1,71 @@
 from __future__ import annotations
 
+import math
 import os
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
+from rich.text import Text
 from textual.app import App, ComposeResult
-from textual.widgets import Header, Footer, ListView, ListItem, Label
+from textual.containers import Horizontal
+from textual.timer import Timer
+from textual.widgets import Header, Footer, Input, ListView, ListItem, Label, Static
 from textual.binding import Binding
+from textual.worker import get_current_worker
 
-from ytpm.core.manager import Manager
+from ytpm.adapters.notify import ControlSubscriber
+from ytpm.adapters.session import Session
+from ytpm.adapters.tmux import TmuxCommandError, TmuxTimeoutError
+from ytpm.core.fuzzy import FuzzyIndex
+from ytpm.core.gitstatus import GitStatus
+from ytpm.core.manager import AsyncManager, Manager
+from ytpm.tui.preview import CaptureCache, CaptureKey
+from ytpm.tui.recent import RecentList
+
+
+def session_key(session: Session) -> str:
+    """Stable identity of a row: tmux's session id survives renames."""
+    return session.id or session.name
 
 
 class SessionItem(ListItem):
     """List item representing a single tmux session."""
 
-    def __init__(self, session_name: str) -> None:
-        super().__init__(Label(session_name))
-        self.session_name = session_name
+    def __init__(self, session: Session, git: Optional[GitStatus] = None) -> None:
+        self._label = Label(self.describe(session, git))
+        super().__init__(self._label)
+        self.session = session
+        self.session_name = session.name
+        self.key = session_key(session)
+        self.git = git
+
+    def update_session(self, session: Session, git: Optional[GitStatus] = None) -> None:
+        """Point this row at a fresh record, redrawing only if it changed."""
+        if session == self.session and git == self.git:
+            return
+        self.session = session
+        self.session_name = session.name
+        self.git = git
+        self._label.update(self.describe(session, git))
+
+    @property
+    def is_project(self) -> bool:
+        """True for a scanned project that has no session yet."""
+        return not self.session.id
+
+    def result(self) -> Tuple[str, str]:
+        """The (name, cwd) this row hands to Manager.goto_session."""
+        if self.is_project:
+            return self.session.name, self.session.path
+        return self.session.name, os.getcwd()
+
+    @staticmethod
+    def describe(session: Session, git: Optional[GitStatus] = None) -> str:
+        if not session.id:
+            return f"{session.name}  project  {session.path}"
+        windows = f"{session.windows} window" + ("" if session.windows == 1 else "s")
+        attached = " (attached)" if session.attached else ""
+        branch = f"  {git.describe()}" if git is not None else ""
+        return f"{session.name}  {windows}{attached}{branch}"
 
 
 class YtpmTui(App[Optional[Tuple[str, str]]]):
@@ -26,43 +76,376 @@ class YtpmTui(App[Optional[Tuple[str, str]]]):
     (session_name, cwd).
     """
 
+    # Rows shown for a filter; the index covers every candidate.
+    MAX_RESULTS = 100
+
+    # Filter points per doubling of a name's frecency: enough to break
+    # near-ties between matches, not to outrank a clearly better match.
+    FRECENCY_WEIGHT = 4.0
+
+    # Seconds the cursor has to rest on a row before its pane is captured,
+    # so holding j/k only moves the cursor.
+    PREVIEW_DELAY = 0.15
+
+    # Rows on each side of the cursor whose panes are captured ahead.
+    PREFETCH = 1
+
+    # Start on the list so j/k work right away; "/" moves to the filter.
+    AUTO_FOCUS = "ListView"
+
+    CSS = """
+    #sessions {
+        width: 2fr;
+    }
+    #preview {
+        width: 3fr;
+        height: 1fr;
+        border-left: solid $accent;
+        padding: 0 1;
+        overflow: hidden;
+    }
+    """
+
     BINDINGS = [
         Binding("q", "quit_app", "Quit"),
         Binding("r", "reload_sessions", "Reload"),
         Binding("j", "cursor_down", "Down"),
         Binding("k", "cursor_up", "Up"),
         Binding("enter", "select_session", "Attach/switch"),
+        Binding("slash", "focus_filter", "Filter"),
+        Binding("p", "toggle_preview", "Preview"),
+        Binding("escape", "clear_filter", "Clear filter", show=False),
+        Binding("down", "cursor_down", "Down", show=False),
+        Binding("up", "cursor_up", "Up", show=False),
     ]
 
-    def __init__(self, manager: Optional[Manager] = None) -> None:
+    def __init__(
+        self,
+        manager: Optional[Manager] = None,
+        async_manager: Optional[AsyncManager] = None,
+        live_updates: bool = True,
+        recent: Optional[RecentList] = None,
+    ) -> None:
         super().__init__()
         self.manager = manager or Manager()
+        # Queries made while the app is running go through the async side so
+        # a slow tmux server never blocks key handling or redraws.
+        self.async_manager = async_manager or AsyncManager()
+        # tmux tells us when sessions change, so the list stays current
+        # without polling; "r" remains as a manual fallback.
+        self._subscriber: Optional[ControlSubscriber] = (
+            ControlSubscriber(on_change=self._start_reload) if live_updates else None
+        )
         self._list_view: Optional[ListView] = None
+        self._filter: Optional[Input] = None
+        self._preview: Optional[Static] = None
+        self._captures = CaptureCache()
+        # Last known (active pane, activity) of each session, by session id.
+        self._pane_keys: Dict[str, CaptureKey] = {}
+        self._preview_timer: Optional[Timer] = None
+        # Every known session; the list view shows the filtered subset.
+        self._sessions: List[Session] = []
+        # Scanned projects, as id-less records, for the filter to find.
+        self._projects: List[Session] = []
+        # Filter candidates: sessions, then projects that have no session.
+        self._candidates: List[Session] = []
+        self._index = FuzzyIndex([])
+        self._boosts: Dict[str, float] = {}
+        # Git status of each session's start directory, filled in by a
+        # worker thread after the list is shown.
+        self._git: Dict[str, Optional[GitStatus]] = {}
+        # Last launch's list is shown until tmux answers; see RecentList.
+        self._recent = recent or RecentList()
+        self._live = False
 
     def compose(self) -> ComposeResult:
         yield Header(show_clock=True)
-        self._list_view = ListView()
-        yield self._list_view
+        self._filter = Input(placeholder="/ to filter sessions")
+        yield self._filter
+        self._list_view = ListView(id="sessions")
+        self._preview = Static(id="preview")
+        with Horizontal():
+            yield self._list_view
+            yield self._preview
         yield Footer()
 
     async def on_mount(self) -> None:
-        await self._reload_sessions()
-
+        self._projects = [Session(p.name, path=p.path) for p in self.manager.list_projects()]
+        sessions, git = self._recent.load()
+        if sessions:
+            # Usable right away; the reload below reconciles rows in place.
+            self._git = git
+            self._set_sessions(sessions)
+            await self._apply_sessions(self._visible_rows())
+            self.sub_title = "refreshing…"
+        self._start_reload()
+        if self._subscriber is not None:
+            self.run_worker(self._subscriber.run(), group="notify")
+
+    def on_unmount(self) -> None:
+        # By now the git statuses of this run have come in too.
+        if self._live:
+            self._recent.save(self._sessions, self._git)
+
+    def _start_reload(self) -> None:
+        """Reload in a worker; a newer reload cancels one still in flight."""
+        self.run_worker(self._reload_sessions(), group="reload", exclusive=True)
 
     async def _reload_sessions(self) -> None:
         assert self._list_view is not None
-        self._list_view.clear()
 
-        sessions: List[str] = self.manager.list_sessions()
-        for name in sessions:
-            self._list_view.append(SessionItem(name))
+        try:
+            sessions: List[Session] = await self.async_manager.list_sessions()
+        except (TmuxCommandError, TmuxTimeoutError) as e:
+            self.notify(str(e), title="Could not list sessions", severity="error")
+            if not self._live and self._sessions:
+                self.sub_title = "last known sessions"
+            return
+
+        if self._subscriber is not None:
+            sessions = self._subscriber.discount(sessions)
+
+        self._set_sessions(sessions)
+        await self._apply_sessions(self._visible_rows())
+        self._live = True
+        self.sub_title = ""
+        self._recent.save(self._sessions, self._git)
+        self._start_git()
 
         if sessions:
-            self._list_view.focus()  # ← no await here
+            if self._filter is None or not self._filter.has_focus:
+                self._list_view.focus()  # ← no await here
         else:
             # No sessions yet; you can still select a name via CLI later
             pass
-        # --- Actions (bound to keys via BINDINGS) ---
+        # Something changed in tmux; the highlighted pane may have too.
+        self._schedule_preview()
+
+    def _set_sessions(self, sessions: List[Session]) -> None:
+        """Remember the full list, most frecent first.
+
+        The filter index is rebuilt only if names or their ranking changed.
+        """
+        running = {s.name for s in sessions}
+        projects = [p for p in self._projects if p.name not in running]
+        scores = self.manager.frecency_scores([s.name for s in sessions + projects])
+        # Stable sorts: unvisited names keep tmux's (or the scan's) order.
+        sessions = sorted(sessions, key=lambda s: -scores[s.name])
+        candidates = sessions + sorted(projects, key=lambda p: -scores[p.name])
+        names = [c.name for c in candidates]
+        boosts = {
+            name: self.FRECENCY_WEIGHT * math.log2(1 + score)
+            for name, score in scores.items()
+            if score
+        }
+        if names != self._index.candidates or boosts != self._boosts:
+            self._index = FuzzyIndex(names, boosts)
+            self._boosts = boosts
+        self._sessions = sessions
+        self._candidates = candidates
+
+    def _visible_rows(self) -> List[Session]:
+        """Sessions when there's no filter, otherwise the best matches."""
+        query = self._filter.value if self._filter is not None else ""
+        if not query:
+            return self._sessions
+        hits = self._index.search(query)[: self.MAX_RESULTS]
+        return [self._candidates[i] for i, _ in hits]
+
+    async def on_input_changed(self, event: Input.Changed) -> None:
+        """Re-filter on every keystroke; the best match gets the cursor."""
+        assert self._list_view is not None
+        visible = self._visible_rows()
+        await self._apply_sessions(visible)
+        if visible:
+            self._list_view.index = 0
+
+    async def on_input_submitted(self, event: Input.Submitted) -> None:
+        """Enter in the filter picks the highlighted session."""
+        await self.action_select_session()
+
+    async def _apply_sessions(self, sessions: List[Session]) -> None:
+        """Bring the list in line with `sessions`, touching only changed rows.
+
+        Rows are matched by session key, so existing widgets (and the
+        highlighted row) survive a reload; only added, removed, moved or
+        changed sessions cost any DOM work.
+        """
+        list_view = self._list_view
+        assert list_view is not None
+        items = [child for child in list_view.children if isinstance(child, SessionItem)]
+
+        # Fast path: nothing changed at all.
+        if len(items) == len(sessions) and all(
+            item.session == session and item.git == self._row_git(session)
+            for item, session in zip(items, sessions)
+        ):
+            return
+
+        highlighted = list_view.highlighted_child
+        selected_key = highlighted.key if isinstance(highlighted, SessionItem) else None
+        old_index = list_view.index
+
+        wanted = {session_key(s) for s in sessions}
+        stale = [i for i, item in enumerate(items) if item.key not in wanted]
+        if stale:
+            await list_view.remove_items(stale)
+        existing = {item.key: item for item in items if item.key in wanted}
+
+        # Walk the new order; consecutive new sessions are mounted together.
+        pending: List[SessionItem] = []
+        for index, session in enumerate(sessions):
+            item = existing.get(session_key(session))
+            git = self._row_git(session)
+            if item is None:
+                pending.append(SessionItem(session, git))
+                continue
+            if pending:
+                await list_view.insert(index - len(pending), pending)
+                pending = []
+            item.update_session(session, git)
+            if list_view.children[index] is not item:
+                list_view.move_child(item, before=index)
+        if pending:
+            await list_view.extend(pending)
+
+        # Keep the cursor on the same session, or as close as possible.
+        keys = [session_key(s) for s in sessions]
+        if selected_key in existing:
+            list_view.index = keys.index(selected_key)
+        elif sessions:
+            list_view.index = min(old_index or 0, len(sessions) - 1)
+
+    # --- Git status ---
+
+    def _start_git(self) -> None:
+        """Look up git status of every session's directory in the background.
+
+        Rows are shown at once and gain their branch as each status comes
+        in; a newer reload cancels a lookup still in flight.
+        """
+        paths = [s.path for s in self._sessions if s.path]
+        if paths:
+            self.run_worker(
+                lambda: self._load_git(paths), group="git", exclusive=True, thread=True
+            )
+
+    def _load_git(self, paths: List[str]) -> None:
+        worker = get_current_worker()
+        for path, status in self.manager.git_statuses(paths):
+            if worker.is_cancelled:
+                return
+            self.call_from_thread(self._show_git, path, status)
+
+    def _row_git(self, session: Session) -> Optional[GitStatus]:
+        return self._git.get(session.path) if session.id else None
+
+    def _show_git(self, path: str, status: Optional[GitStatus]) -> None:
+        if self._git.get(path, False) == status:
+            return
+        self._git[path] = status
+        if self._list_view is None:
+            return
+        for child in self._list_view.children:
+            if isinstance(child, SessionItem) and child.session.path == path:
+                child.update_session(child.session, self._row_git(child.session))
+
+    # --- Preview ---
+
+    def on_list_view_highlighted(self, event: ListView.Highlighted) -> None:
+        self._show_cached_preview()
+        self._schedule_preview()
+
+    def _highlighted(self) -> Optional[SessionItem]:
+        if self._list_view is None:
+            return None
+        item = self._list_view.highlighted_child
+        return item if isinstance(item, SessionItem) else None
+
+    def _show_cached_preview(self) -> None:
+        """Show what is already known about the highlighted row, right away."""
+        preview = self._preview
+        if preview is None or not preview.display:
+            return
+        item = self._highlighted()
+        if item is None:
+            preview.update("")
+        elif item.is_project:
+            preview.update(Text(f"{item.session.path}\n\nNo session yet.", style="dim"))
+        else:
+            key = self._pane_keys.get(item.key)
+            text = self._captures.get(key) if key is not None else None
+            preview.update(Text.from_ansi(text) if text is not None else Text("…", style="dim"))
+
+    def _schedule_preview(self) -> None:
+        """(Re)start the countdown to capturing the highlighted pane."""
+        if self._preview is None or not self._preview.display:
+            return
+        if self._preview_timer is not None:
+            self._preview_timer.stop()
+        self._preview_timer = self.set_timer(self.PREVIEW_DELAY, self._start_preview)
+
+    def _start_preview(self) -> None:
+        self._preview_timer = None
+        # A capture still in flight for a row we already left is cancelled.
+        self.run_worker(self._refresh_preview(), group="preview", exclusive=True)
+
+    async def _refresh_preview(self) -> None:
+        """Capture the highlighted session's pane, then its neighbours'.
+
+        One tmux call tells every session's active pane and its last
+        activity; a pane whose activity hasn't changed is served from the
+        cache instead of being captured again.
+        """
+        item = self._highlighted()
+        if item is None or item.is_project:
+            return
+        try:
+            self._pane_keys = await self.async_manager.active_panes()
+            key = self._pane_keys.get(item.key)
+            if key is None:
+                return
+            text = await self._capture(key)
+        except (TmuxCommandError, TmuxTimeoutError) as e:
+            if self._preview is not None:
+                self._preview.update(Text(str(e), style="red"))
+            return
+        if self._preview is not None and self._highlighted() is item:
+            self._preview.update(Text.from_ansi(text))
+
+        for neighbour in self._neighbours():
+            key = self._pane_keys.get(neighbour.key)
+            if key is None:
+                continue
+            try:
+                await self._capture(key)
+            except (TmuxCommandError, TmuxTimeoutError):
+                pass  # e.g. the session just closed; nothing to show anyway
+
+    async def _capture(self, key: CaptureKey) -> str:
+        text = self._captures.get(key)
+        if text is None:
+            text = await self.async_manager.capture_pane(key[0])
+            self._captures.put(key, text)
+        return text
+
+    def _neighbours(self) -> List[SessionItem]:
+        """Session rows within PREFETCH of the cursor, nearest first."""
+        assert self._list_view is not None
+        index = self._list_view.index
+        if index is None:
+            return []
+        children = self._list_view.children
+        rows = []
+        for distance in range(1, self.PREFETCH + 1):
+            for i in (index + distance, index - distance):
+                if 0 <= i < len(children):
+                    item = children[i]
+                    if isinstance(item, SessionItem) and not item.is_project:
+                        rows.append(item)
+        return rows
+
+    # --- Actions (bound to keys via BINDINGS) ---
 
     async def action_quit_app(self) -> None:
         """Quit without selecting a session."""
@@ -70,7 +453,7 @@ class YtpmTui(App[Optional[Tuple[str, str]]]):
 
     async def action_reload_sessions(self) -> None:
         """Reload the list of sessions."""
-        await self._reload_sessions()
+        self._start_reload()
 
     async def action_select_session(self) -> None:
         """Confirm the currently selected session and exit with its name."""
@@ -83,11 +466,29 @@ class YtpmTui(App[Optional[Tuple[str, str]]]):
         if not isinstance(item, SessionItem):
             return
 
-        session_name = item.session_name
-        cwd = os.getcwd()
         # Exit the app and return (name, cwd) to the caller of app.run()
-        self.exit((session_name, cwd))
+        self.exit(item.result())
+
 
+    async def action_toggle_preview(self) -> None:
+        """Show or hide the preview panel."""
+        if self._preview is None:
+            return
+        self._preview.display = not self._preview.display
+        self._show_cached_preview()
+        self._schedule_preview()
+
+    async def action_focus_filter(self) -> None:
+        """Start typing a filter (vim-style '/')."""
+        if self._filter is not None:
+            self._filter.focus()
+
+    async def action_clear_filter(self) -> None:
+        """Drop the filter and go back to the list."""
+        if self._filter is not None:
+            self._filter.value = ""
+        if self._list_view is not None:
+            self._list_view.focus()
 
     async def action_cursor_down(self) -> None:
         """Move selection down in the session list (vim-style 'j')."""
@@ -107,10 +508,8 @@ class YtpmTui(App[Optional[Tuple[str, str]]]):
         if not isinstance(item, SessionItem):
             return
 
-        session_name = item.session_name
-        cwd = os.getcwd()
         # Exit the TUI and return (session_name, cwd) to run_tui()
-        self.exit((session_name, cwd))
+        self.exit(item.result())
 
 
 def run_tui(manager: Optional[Manager] = None) -> None:
@@ -120,8 +519,13 @@ def run_tui(manager: Optional[Manager] = None) -> None:
     - If the user cancels (q), do nothing.
     - If the user selects a session, we call manager.goto_session(name, cwd).
     """
-    mgr = manager or Manager()
-    app = YtpmTui(manager=mgr)
+    # The TUI's tmux queries go through its AsyncManager; this one only
+    # reads projects, visits and git status, and runs the final goto, which
+    # a plain tmux call serves best.
+    if manager is None:
+        manager = Manager()
+
+    app = YtpmTui(manager=manager)
     result = app.run()
 
     if result is None:
@@ -129,4 +533,4 @@ def run_tui(manager: Optional[Manager] = None) -> None:
         return
 
     session_name, cwd = result
-    mgr.goto_session(session_name, cwd)
+    manager.goto_session(session_name, cwd)
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+# (pane id, window activity): a pane's contents can only have changed if
+# its window saw activity since.
+CaptureKey = Tuple[str, int]
+
+
+class CaptureCache:
+    """Least-recently-used store of pane captures, bounded by total size.
+
+    Keys carry tmux's activity timestamp, so a lookup with a current key
+    never returns stale contents; storing a newer capture of a pane drops
+    the older ones.
+    """
+
+    def __init__(self, max_chars: int = 4_000_000, max_entries: int = 64) -> None:
+        self.max_chars = max_chars
+        self.max_entries = max_entries
+        self._entries: OrderedDict[CaptureKey, str] = OrderedDict()
+        self._by_pane: Dict[str, CaptureKey] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def get(self, key: CaptureKey) -> Optional[str]:
+        text = self._entries.get(key)
+        if text is not None:
+            self._entries.move_to_end(key)
+        return text
+
+    def put(self, key: CaptureKey, text: str) -> None:
+        older = self._by_pane.get(key[0])
+        if older is not None:
+            self._drop(older)
+        self._entries[key] = text
+        self._by_pane[key[0]] = key
+        self._size += len(text)
+        while self._entries and (
+            self._size > self.max_chars or len(self._entries) > self.max_entries
+        ):
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: CaptureKey) -> None:
+        text = self._entries.pop(key, None)
+        if text is None:
+            return
+        self._size -= len(text)
+        if self._by_pane.get(key[0]) == key:
+            del self._by_pane[key[0]]
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ytpm.adapters.session import Session
+from ytpm.core.gitstatus import GitStatus
+from ytpm.core.storage import cache_dir, read_json, write_json
+
+
+class RecentList:
+    """The session list the TUI last showed, for the next launch to start from.
+
+    It is shown as is while the live list is fetched, so the first frame
+    doesn't wait for tmux; rows are then reconciled in place. It holds the
+    sessions in the order they were ranked and the git status of their
+    directories.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path or cache_dir() / "tui-sessions.json"
+
+    def load(self) -> Tuple[List[Session], Dict[str, Optional[GitStatus]]]:
+        """Last saved (sessions, git statuses by path); empty if there are none."""
+        data = read_json(self.path, default=None)
+        if not isinstance(data, dict) or data.get("version") != self.VERSION:
+            return [], {}
+        try:
+            sessions = [Session(*row) for row in data.get("sessions", [])]
+            git = {
+                path: GitStatus(*status) if status else None
+                for path, status in data.get("git", {}).items()
+            }
+        except TypeError:
+            return [], {}
+        return sessions, git
+
+    def save(self, sessions: List[Session], git: Dict[str, Optional[GitStatus]]) -> None:
+        paths = {s.path for s in sessions}
+        try:
+            write_json(
+                self.path,
+                {
+                    "version": self.VERSION,
+                    "sessions": [list(s) for s in sessions],
+                    "git": {
+                        path: list(status) if status else None
+                        for path, status in git.items()
+                        if path in paths
+                    },
+                },
+            )
+        except OSError:
+            pass  # only a head start for the next launch